@@ -1,37 +1,233 @@
-# client_app/ai_bridge.py
 import sys
 import os
-import joblib
+import csv
+import json
+import time
+import argparse
 import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 # Suppress warnings to keep output clean
 warnings.filterwarnings("ignore")
 
-def predict_level(description):
+# Paths relative to this file, so bulk runs work from any directory
+_HERE = os.path.dirname(os.path.abspath(__file__))
+if _HERE not in sys.path:
+    sys.path.insert(0, _HERE)
+
+import model_cache
+import tracing
+
+MODEL_PATH = os.path.abspath(os.path.join(_HERE, "..", "data_engine", "ticket_classifier.pkl"))
+VEC_PATH   = os.path.abspath(os.path.join(_HERE, "..", "data_engine", "vectorizer.pkl"))
+COMPILED_PATH = os.path.abspath(os.path.join(_HERE, "..", "data_engine", "forest_model.npz"))
+
+_compiled = None
+
+
+def _compiled_forest():
+    """NumPy-only scorer (see data_engine/export_forest.py); no sklearn import."""
+    global _compiled
+    if _compiled is None:
+        from compiled_forest import CompiledForest
+        _compiled = CompiledForest.load(COMPILED_PATH)
+    return _compiled
+
+
+def _bundle_forest():
+    """CompiledForest over the memory-mapped CURRENT bundle (see model_bundle.py)."""
+    import model_bundle
+    return model_bundle.get_cache().get().forest
+
+
+def predict_level(description, engine="sklearn"):
     try:
-        # Paths relative to client_app folder
-        model_path = os.path.join("..", "data_engine", "ticket_classifier.pkl")
-        vec_path = os.path.join("..", "data_engine", "vectorizer.pkl")
-        
-        if not os.path.exists(model_path):
+        if engine == "compiled":
+            return _compiled_forest().predict([description])[0]
+        if engine == "bundle":
+            return _bundle_forest().predict([description])[0]
+        if not os.path.exists(MODEL_PATH):
             return "Error: Model file not found"
 
-        # Load model (Takes ~0.5s)
-        clf = joblib.load(model_path)
-        vec = joblib.load(vec_path)
-        
-        # Predict
-        vec_desc = vec.transform([description])
-        prediction = clf.predict(vec_desc)[0]
-        return prediction
+        # Loaded once per process (see the model.load span), then kept resident
+        return model_cache.get_cache(MODEL_PATH, VEC_PATH).predict(description)
     except Exception as e:
         return "Unknown"
 
+
+# ----------------------------------------------------------------------
+# BULK MODE
+# ----------------------------------------------------------------------
+
+def _iter_rows(stream, fmt, column):
+    """Yield descriptions one at a time from a CSV or JSONL stream."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        if reader.fieldnames and column not in reader.fieldnames:
+            raise SystemExit(f"Column '{column}' not found in CSV header: {reader.fieldnames}")
+        for row in reader:
+            yield row.get(column) or ""
+    else:
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            obj = json.loads(line)
+            if isinstance(obj, str):
+                yield obj
+            else:
+                yield obj.get(column) or obj.get("description") or ""
+
+
+def _chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def classify_chunk(descriptions, engine="sklearn"):
+    """Vectorize + predict a whole chunk in one call.
+
+    Returns ``(classes, levels, probabilities)``.
+    """
+    if engine in ("compiled", "bundle"):
+        forest = _compiled_forest() if engine == "compiled" else _bundle_forest()
+        with tracing.span("compiled.predict", rows=len(descriptions)):
+            proba, classes = forest.predict_proba(descriptions), forest.classes
+    else:
+        # Repeated tickets are answered from the normalised-text LRU.
+        classes, levels, proba = model_cache.get_cache(MODEL_PATH, VEC_PATH).classify(descriptions)
+        return classes, levels, [[round(p, 4) for p in row] for row in proba]
+    levels = [classes[i] for i in proba.argmax(axis=1)]
+    return classes, levels, proba.round(4).tolist()
+
+
+def _init_worker(engine):
+    # Each pool process loads the model once, up front.
+    if engine == "compiled":
+        _compiled_forest()
+    elif engine == "bundle":
+        _bundle_forest()
+    else:
+        model_cache.get_cache(MODEL_PATH, VEC_PATH).get()
+
+
+def _classified_chunks(chunks, workers, engine="sklearn"):
+    """Yield chunk results in input order, keeping memory bounded.
+
+    With ``workers > 1`` at most ``2 * workers`` chunks are in flight.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield chunk, classify_chunk(chunk, engine)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(engine,)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, pool.submit(classify_chunk, chunk, engine)))
+            if len(pending) >= 2 * workers:
+                chunk, fut = pending.popleft()
+                yield chunk, fut.result()
+        while pending:
+            chunk, fut = pending.popleft()
+            yield chunk, fut.result()
+
+
+def _detect_format(path, fmt):
+    if fmt != "auto":
+        return fmt
+    if path and path != "-" and path.lower().endswith(".csv"):
+        return "csv"
+    return "jsonl"
+
+
+def run_bulk(src, dst, in_fmt="auto", out_fmt="auto", column="Description",
+             chunk_size=1000, workers=1, engine="sklearn"):
+    """Stream ``src`` through the classifier into ``dst``; returns rows processed."""
+    in_fmt  = _detect_format(src, in_fmt)
+    out_fmt = _detect_format(dst, out_fmt)
+
+    fin  = sys.stdin  if src in (None, "-") else open(src, newline="", encoding="utf-8")
+    fout = sys.stdout if dst in (None, "-") else open(dst, "w", newline="", encoding="utf-8")
+
+    start = time.perf_counter()
+    rows  = 0
+    writer = None
+    try:
+        chunks = _chunked(_iter_rows(fin, in_fmt, column), chunk_size)
+        for chunk, (classes, levels, proba) in _classified_chunks(chunks, workers, engine):
+            if out_fmt == "csv" and writer is None:
+                writer = csv.writer(fout)
+                writer.writerow(["row", "description", "level"] + [f"p_{c}" for c in classes])
+            for desc, level, p in zip(chunk, levels, proba):
+                if writer is not None:
+                    writer.writerow([rows, desc, level] + p)
+                else:
+                    fout.write(json.dumps({
+                        "row": rows,
+                        "description": desc,
+                        "level": level,
+                        "probabilities": dict(zip(classes, p)),
+                    }) + "\n")
+                rows += 1
+    finally:
+        if fin is not sys.stdin:
+            fin.close()
+        if fout is not sys.stdout:
+            fout.close()
+        else:
+            fout.flush()
+
+    elapsed = time.perf_counter() - start
+    rate = rows / elapsed if elapsed > 0 else 0.0
+    print(f"[bulk] {rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec, "
+          f"chunk={chunk_size}, workers={workers}, engine={engine})", file=sys.stderr)
+    if engine == "sklearn" and workers <= 1:
+        cached = model_cache.get_cache(MODEL_PATH, VEC_PATH).predictions.stats()
+        print(f"[bulk] prediction cache hit rate {cached['hit_rate']:.1%} "
+              f"({cached['entries']} distinct tickets)", file=sys.stderr)
+    return rows
+
+
+def _parse_args(argv):
+    p = argparse.ArgumentParser(
+        description="Classify a ticket description (L1/L2/L3), or a whole backlog with --bulk."
+    )
+    p.add_argument("description", nargs="*", help="Description to classify (single mode)")
+    p.add_argument("--bulk", metavar="FILE",
+                   help="CSV/JSONL file of tickets to classify ('-' for stdin)")
+    p.add_argument("--output", "-o", default="-", help="Output file (default: stdout)")
+    p.add_argument("--format", dest="in_fmt", choices=["auto", "csv", "jsonl"], default="auto",
+                   help="Input format (default: from file extension, JSONL for stdin)")
+    p.add_argument("--output-format", dest="out_fmt", choices=["auto", "csv", "jsonl"],
+                   default="auto")
+    p.add_argument("--column", default="Description",
+                   help="CSV column / JSON key holding the description")
+    p.add_argument("--chunk-size", type=int, default=1000)
+    p.add_argument("--workers", type=int, default=1,
+                   help="Fan chunks out across this many processes")
+    p.add_argument("--engine", choices=["sklearn", "compiled", "bundle"], default="sklearn",
+                   help="'compiled' scores data_engine/forest_model.npz without importing sklearn; "
+                        "'bundle' maps data_engine/bundles/CURRENT, shared by all worker processes")
+    return p.parse_args(argv)
+
+
 if __name__ == "__main__":
-    # Read argument from command line
-    if len(sys.argv) > 1:
+    args = _parse_args(sys.argv[1:])
+    if args.bulk:
+        run_bulk(args.bulk, args.output, args.in_fmt, args.out_fmt,
+                 args.column, max(1, args.chunk_size), max(1, args.workers), args.engine)
+    elif args.description:
         # Join arguments in case of spaces
-        desc = " ".join(sys.argv[1:])
-        print(predict_level(desc))
+        desc = " ".join(args.description)
+        print(predict_level(desc, args.engine))
     else:
-        print("Unknown")
\ No newline at end of file
+        print("Unknown")
@@ -0,0 +1,17 @@
+"""
+Where the client keeps its local state (caches, stores, logs).
+
+Defaults to ``~/.systemss_plus``; set ``SYSTEMSS_DATA_DIR`` to override
+(e.g. for a portable install or a throwaway benchmark run).
+"""
+import os
+
+APP_DATA_DIR = os.environ.get("SYSTEMSS_DATA_DIR") or os.path.join(
+    os.path.expanduser("~"), ".systemss_plus"
+)
+
+
+def data_path(name: str) -> str:
+    """Absolute path of ``name`` inside the data dir, creating the dir if needed."""
+    os.makedirs(APP_DATA_DIR, exist_ok=True)
+    return os.path.join(APP_DATA_DIR, name)
@@ -0,0 +1,104 @@
+"""
+Array-backed runtime for the exported ticket classifier.
+
+Scores the RandomForest written by ``data_engine/export_forest.py`` using
+nothing but NumPy: the TF-IDF step is re-implemented from the exported
+vocabulary/idf, and all trees are walked together, one level per step,
+over flat ``feature`` / ``threshold`` / ``left`` / ``right`` / ``value``
+arrays.
+Importing this module does NOT import scikit-learn.
+"""
+import re
+
+import numpy as np
+
+# Rows scored per traversal pass; bounds the dense feature matrix size.
+_BATCH = 512
+
+
+class CompiledForest:
+    """Drop-in scorer for the TF-IDF + RandomForest pair."""
+
+    def __init__(self, arrays):
+        self.classes   = [str(c) for c in arrays["classes"]]
+        self.feature   = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left      = arrays["left"]
+        self.right     = arrays["right"]
+        self.value     = arrays["value"]
+        self.roots     = arrays["roots"]
+        self.idf       = arrays["idf"]
+        self.lowercase = bool(arrays["lowercase"])
+        self.vocabulary = {str(t): i for i, t in enumerate(arrays["terms"])}
+        self._token_re  = re.compile(str(arrays["token_pattern"]))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as z:
+            return cls({k: z[k] for k in z.files})
+
+    # ------------------------------------------------------------------
+    # FEATURES
+    # ------------------------------------------------------------------
+
+    def transform(self, texts):
+        """TF-IDF (l2-normalised) as a dense float32 matrix, like sklearn feeds the trees."""
+        X = np.zeros((len(texts), len(self.idf)), dtype=np.float64)
+        vocab = self.vocabulary
+        for row, text in enumerate(texts):
+            if self.lowercase:
+                text = text.lower()
+            for tok in self._token_re.findall(text):
+                col = vocab.get(tok)
+                if col is not None:
+                    X[row, col] += 1.0
+        X *= self.idf
+        norms = np.sqrt((X * X).sum(axis=1))
+        norms[norms == 0.0] = 1.0
+        X /= norms[:, None]
+        return X.astype(np.float32)
+
+    # ------------------------------------------------------------------
+    # SCORING
+    # ------------------------------------------------------------------
+
+    def _proba_dense(self, X):
+        n, n_trees = X.shape[0], len(self.roots)
+        feature, threshold, left, right = self.feature, self.threshold, self.left, self.right
+
+        # One cursor per (sample, tree).  Each step moves every unfinished
+        # cursor one level down; cursors that land on a leaf (which points
+        # at itself) are written out and dropped from the working set.
+        Xf    = X.ravel()
+        leaf  = np.empty(n * n_trees, dtype=np.int32)
+        pos   = np.arange(n * n_trees)
+        cur   = np.tile(self.roots, n)
+        xbase = np.repeat(np.arange(n) * X.shape[1], n_trees)
+        while pos.size:
+            go_left = Xf.take(xbase + feature.take(cur)) <= threshold.take(cur)
+            cur = np.where(go_left, left.take(cur), right.take(cur))
+            done = left.take(cur) == cur
+            if done.any():
+                leaf[pos[done]] = cur[done]
+                keep = ~done
+                pos, cur, xbase = pos[keep], cur[keep], xbase[keep]
+        nodes = leaf.reshape(n, n_trees)
+
+        # Accumulate tree by tree, in estimator order, exactly as sklearn does.
+        proba = np.zeros((n, self.value.shape[1]), dtype=np.float64)
+        for t in range(nodes.shape[1]):
+            proba += self.value[nodes[:, t]]
+        proba /= nodes.shape[1]
+        return proba
+
+    def predict_proba(self, texts):
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, len(self.classes)))
+        parts = [self._proba_dense(self.transform(texts[i:i + _BATCH]))
+                 for i in range(0, len(texts), _BATCH)]
+        return np.vstack(parts)
+
+    def predict(self, texts):
+        proba = self.predict_proba(texts)
+        return [self.classes[i] for i in proba.argmax(axis=1)]
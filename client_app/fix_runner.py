@@ -0,0 +1,117 @@
+"""
+Asynchronous runner for the auto-fix scripts in ``system_utils.FIX_SCRIPTS``.
+
+Each script runs on its own background thread with an asyncio loop, so the
+Tk event loop never blocks on ``ipconfig`` / ``taskkill``.  Output is
+streamed line-by-line, every command is bounded by a timeout (stragglers are
+killed), and progress is reported as steps actually complete.
+
+Events are plain dicts handed to ``on_event`` (normally ``msg_queue.put``):
+
+    {"action": "fix_line",     "content": "<one line of output>"}
+    {"action": "fix_progress", "value": 0.0 … 1.0}
+    {"action": "fix_done",     "content": "<summary>", "ok": bool}
+"""
+import asyncio
+import locale
+import subprocess
+import threading
+
+import system_utils
+import tracing
+
+
+class FixRunner:
+    def __init__(self, on_event, timeout=None):
+        self.on_event = on_event
+        self.timeout  = timeout or system_utils.FIX_TIMEOUT
+        self._thread  = None
+
+    def start(self, action_type):
+        self._thread = threading.Thread(
+            target=lambda: asyncio.run(self._run(action_type)),
+            name=f"fix-{action_type}", daemon=True,
+        )
+        self._thread.start()
+        return self._thread
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # ------------------------------------------------------------------
+
+    def _emit(self, action, **fields):
+        self.on_event({"action": action, **fields})
+
+    async def _run(self, action_type):
+        with tracing.span("fix.run", action=action_type, runner="async"):
+            await self._run_steps(action_type)
+
+    async def _run_steps(self, action_type):
+        steps = system_utils.FIX_SCRIPTS.get(action_type, [])
+        summary = []
+        ok = bool(steps)
+        if not steps:
+            summary.append(f"❌ No script registered for '{action_type}'.")
+            self._emit("fix_line", content=summary[-1])
+
+        for i, step in enumerate(steps):
+            step_ok = await self._run_step(step, summary)
+            self._emit("fix_progress", value=(i + 1) / len(steps))
+            if not step_ok:
+                ok = False
+                break
+
+        self._emit("fix_done", content="\n".join(summary), ok=ok)
+
+    async def _run_step(self, step, summary):
+        self._emit("fix_line", content=f"$ {step.label}")
+        try:
+            if step.detach:
+                subprocess.Popen(step.cmd)
+                rc = 0
+            else:
+                rc = await self._exec(step)
+        except asyncio.TimeoutError:
+            summary.append(f"❌ Timed out after {self.timeout}s: {step.label}")
+            self._emit("fix_line", content=summary[-1])
+            return False
+        except Exception as exc:  # noqa: BLE001
+            summary.append(f"❌ Failed: {exc}")
+            self._emit("fix_line", content=summary[-1])
+            return False
+
+        if rc != 0 and step.check:
+            summary.append(f"❌ Failed: {step.label} exited with code {rc}")
+            self._emit("fix_line", content=summary[-1])
+            return False
+
+        summary.append(f"✅ Executed: {step.label}")
+        if step.ok_message:
+            summary.append(f"✅ {step.ok_message}")
+        self._emit("fix_line", content="\n".join(summary[-2 if step.ok_message else -1:]))
+        return True
+
+    async def _exec(self, step):
+        """Run one command, streaming its output; kill it on timeout."""
+        proc = await asyncio.create_subprocess_exec(
+            *step.cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        encoding = locale.getpreferredencoding(False)
+
+        async def pump():
+            async for raw in proc.stdout:
+                line = raw.decode(encoding, errors="replace").rstrip()
+                if line:
+                    self._emit("fix_line", content=f"  {line}")
+            return await proc.wait()
+
+        try:
+            return await asyncio.wait_for(pump(), self.timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
@@ -0,0 +1,136 @@
+"""
+Load generator for intake_service.py.
+
+Opens --concurrency keep-alive connections and fires --requests requests at
+one endpoint as fast as the service answers, then reports requests/sec and
+latency percentiles (plus the service's batching stats).
+
+    python intake_service.py &
+    python intake_loadgen.py --endpoint classify --concurrency 64 --requests 20000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+_DATA_ENGINE = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                            "..", "data_engine"))
+
+
+def _corpus(n, seed):
+    """Synthetic ticket descriptions from data_engine/train_model.py."""
+    if _DATA_ENGINE not in sys.path:
+        sys.path.insert(0, _DATA_ENGINE)
+    from train_model import synthesize_arrays
+
+    descriptions, _ = synthesize_arrays(n, np.random.default_rng(seed))
+    return [str(d) for d in descriptions]
+
+
+async def _request(reader, writer, host, method, path, payload):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length)) if length else None
+
+
+def _payload(endpoint, description, i):
+    if endpoint == "prioritize":
+        return {"urgency": i % 3 + 1, "impact": (i // 3) % 3 + 1}
+    if endpoint == "submit":
+        return {"description": description, "urgency": i % 3 + 1, "impact": (i // 3) % 3 + 1,
+                "username": f"loadgen{i % 50}"}
+    return {"description": description}
+
+
+async def run_load(host, port, endpoint, concurrency, total, corpus):
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def client():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for i in counter:
+                t0 = time.perf_counter()
+                status, _ = await _request(reader, writer, host, "POST", f"/{endpoint}",
+                                           _payload(endpoint, corpus[i % len(corpus)], i))
+                latencies.append(time.perf_counter() - t0)
+                if status != 200:
+                    errors += 1
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    reader, writer = await asyncio.open_connection(host, port)
+    _, stats = await _request(reader, writer, host, "GET", "/stats", None)
+    writer.close()
+
+    lat_ms = np.array(latencies) * 1000
+    return {
+        "endpoint": endpoint, "concurrency": concurrency, "requests": len(latencies),
+        "errors": errors, "seconds": elapsed, "rps": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(lat_ms, 50)), "p90_ms": float(np.percentile(lat_ms, 90)),
+        "p99_ms": float(np.percentile(lat_ms, 99)), "max_ms": float(lat_ms.max()),
+        "service": stats,
+    }
+
+
+def main():
+    p = argparse.ArgumentParser(description="Load-test the ticket intake service.")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--endpoint", choices=["classify", "prioritize", "submit"], default="classify")
+    p.add_argument("--concurrency", type=int, default=64)
+    p.add_argument("--requests", type=int, default=10_000)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = p.parse_args()
+
+    corpus = _corpus(min(args.requests, 5000), args.seed)
+    report = asyncio.run(run_load(args.host, args.port, args.endpoint,
+                                  max(1, args.concurrency), args.requests, corpus))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    batching = report["service"]["batching"]
+    print(f"{report['requests']} × /{report['endpoint']} at concurrency {report['concurrency']}: "
+          f"{report['rps']:,.0f} req/s, p50 {report['p50_ms']:.1f} ms, "
+          f"p99 {report['p99_ms']:.1f} ms, max {report['max_ms']:.1f} ms, "
+          f"{report['errors']} errors")
+    print(f"service batching: {batching['batches']} batches, "
+          f"mean {batching['mean_batch']:.1f}, largest {batching['largest_batch']}")
+    cached = report["service"].get("prediction_cache")
+    if cached:
+        print(f"prediction cache: {cached['hit_rate']:.1%} hit rate, {cached['entries']} entries, "
+              f"{cached['bytes'] / 1024:.0f} KiB")
+    fast = report["service"].get("fast_path")
+    if fast:
+        agreement = "n/a" if fast["agreement"] is None else f"{fast['agreement']:.1%}"
+        print(f"keyword fast path: {fast['hit_rate']:.1%} hit rate, "
+              f"{agreement} agreement with the model on {fast['checked']} checked hits")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+Headless ticket intake: the GUI's classify → prioritize → submit pipeline
+over HTTP, for the helpdesk portal.
+
+    python intake_service.py                    # http://127.0.0.1:8765
+    python intake_service.py --port 9000 --window-ms 5 --max-batch 64
+
+Endpoints (JSON in, JSON out):
+
+    POST /classify    {"description": "..."}           -> {"level": "L2"}
+    POST /prioritize  {"urgency": 1, "impact": 2}      -> {"priority": "High"}
+    POST /submit      {"description", "urgency", "impact",
+                       "username"?, "computer"?, "ip"?, "logs"?}
+                      -> {"id", "level", "priority", "ticket"}
+    GET  /health
+    GET  /stats
+
+Concurrent /classify and /submit requests are micro-batched: the first one
+opens a short window (--window-ms) and everything arriving inside it (up to
+--max-batch) is classified by one ``vectorizer.transform`` + ``predict``
+call on a worker thread.  --max-concurrency bounds how many requests are
+processed at once; the rest wait for a slot.  Submitted tickets go to the
+same local ticket store as the GUI's.
+
+Load-test it with intake_loadgen.py.
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import os
+import sys
+import time
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+if _HERE not in sys.path:
+    sys.path.insert(0, _HERE)
+
+import model_cache
+import ticket_pipeline
+import ticket_store
+
+MODEL_PATH = os.path.abspath(os.path.join(_HERE, "..", "data_engine", "ticket_classifier.pkl"))
+VEC_PATH   = os.path.abspath(os.path.join(_HERE, "..", "data_engine", "vectorizer.pkl"))
+
+MAX_BODY = 1 << 20
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class MicroBatcher:
+    """Collects single classifications into batched ``predict_many`` calls."""
+
+    def __init__(self, predict_many, window=0.005, max_batch=64):
+        self.predict_many = predict_many
+        self.window = window
+        self.max_batch = max_batch
+
+        self.batches = 0
+        self.items = 0
+        self.largest = 0
+
+        self._pending = []
+        self._timer = None
+        self._busy = False
+        # One batch at a time: while it is predicting, the next one fills up.
+        self._executor = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix="classify")
+
+    async def classify(self, description):
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((description, fut))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await fut
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._busy or not self._pending:
+            return    # _run picks the pending requests up when it finishes
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        self._busy = True
+        asyncio.get_running_loop().create_task(self._run(batch))
+
+    async def _run(self, batch):
+        try:
+            await self._predict(batch)
+        finally:
+            self._busy = False
+            self._flush()
+
+    async def _predict(self, batch):
+        self.batches += 1
+        self.items += len(batch)
+        self.largest = max(self.largest, len(batch))
+        loop = asyncio.get_running_loop()
+        try:
+            levels = await loop.run_in_executor(self._executor, self.predict_many,
+                                                [d for d, _ in batch])
+        except Exception as exc:  # noqa: BLE001
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+        for (_, fut), level in zip(batch, levels):
+            if not fut.done():
+                fut.set_result(level)
+
+    def stats(self):
+        return {"batches": self.batches, "items": self.items, "largest_batch": self.largest,
+                "mean_batch": self.items / self.batches if self.batches else 0.0}
+
+
+class _HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class IntakeService:
+    def __init__(self, cache, store, window=0.005, max_batch=64, max_concurrency=256):
+        self.cache = cache
+        self.store = store
+        self.batcher = MicroBatcher(lambda descs: ticket_pipeline.classify(cache, descs),
+                                    window, max_batch)
+        self.max_concurrency = max_concurrency
+        self.requests = {}
+        self._slots = None
+        self._started = time.monotonic()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        server = await asyncio.start_server(self._handle_connection, host, port, backlog=1024)
+        print(f"[Intake] Listening on http://{host}:{port}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY:
+                    status, payload = 413, {"error": "request body too large"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    async with self._slots:
+                        status, payload = await self._dispatch(method, path.split("?", 1)[0], body)
+                    keep_alive = headers.get("connection", "").lower() != "close"
+
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, body):
+        routes = {
+            ("POST", "/classify"): self.classify,
+            ("POST", "/prioritize"): self.prioritize,
+            ("POST", "/submit"): self.submit,
+            ("GET", "/health"): self.health,
+            ("GET", "/stats"): self.stats,
+        }
+        handler = routes.get((method, path))
+        if handler is None:
+            known = any(p == path for _, p in routes)
+            return (405, {"error": "method not allowed"}) if known else (404, {"error": "not found"})
+        self.requests[path] = self.requests.get(path, 0) + 1
+        try:
+            data = json.loads(body) if body else {}
+            if not isinstance(data, dict):
+                raise _HttpError(400, "expected a JSON object")
+            return 200, await handler(data)
+        except json.JSONDecodeError:
+            return 400, {"error": "invalid JSON"}
+        except _HttpError as exc:
+            return exc.status, {"error": str(exc)}
+        except Exception as exc:  # noqa: BLE001
+            print(f"[Intake] {path} failed: {exc}", file=sys.stderr)
+            return 500, {"error": str(exc)}
+
+    # ------------------------------------------------------------------
+    # ENDPOINTS
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _description(data):
+        description = data.get("description")
+        if not isinstance(description, str) or not description.strip():
+            raise _HttpError(400, "'description' must be a non-empty string")
+        return description.strip()
+
+    async def classify(self, data):
+        return {"level": await self.batcher.classify(self._description(data))}
+
+    async def prioritize(self, data):
+        return {"priority": ticket_pipeline.prioritize(data.get("urgency"), data.get("impact"))}
+
+    async def submit(self, data):
+        description = self._description(data)
+        urgency = ticket_pipeline.parse_scale(data.get("urgency"))
+        impact = ticket_pipeline.parse_scale(data.get("impact"))
+        priority = ticket_pipeline.prioritize(urgency, impact)
+        level = await self.batcher.classify(description)
+
+        sys_info = {"Username": data.get("username"), "Computer Name": data.get("computer"),
+                    "IP Address": data.get("ip")}
+        logs = data.get("logs") if isinstance(data.get("logs"), list) else []
+        record = ticket_store.make_record(sys_info, description, level, priority,
+                                          urgency, impact, logs)
+
+        loop = asyncio.get_running_loop()
+        saved = loop.create_future()
+        self.store.submit(
+            record,
+            on_saved=lambda ticket_id: loop.call_soon_threadsafe(saved.set_result, ticket_id),
+            on_error=lambda exc: loop.call_soon_threadsafe(saved.set_exception, exc))
+        try:
+            ticket_id = await saved
+        except Exception as exc:  # noqa: BLE001 — whatever the writer reported
+            print(f"[Intake] Ticket not saved: {exc}", file=sys.stderr)
+            raise _HttpError(500, "ticket could not be saved") from exc
+        return {"id": ticket_id, "level": level, "priority": priority,
+                "ticket": ticket_pipeline.format_ticket(sys_info, description, logs,
+                                                        level, priority)}
+
+    async def health(self, _data):
+        return {"status": "ok", "model_loaded": self.cache.is_loaded()}
+
+    async def stats(self, _data):
+        return {"uptime_s": time.monotonic() - self._started, "requests": self.requests,
+                "batching": self.batcher.stats(), "tickets_written": self.store.written,
+                "prediction_cache": self.cache.predictions.stats(),
+                "fast_path": fp.stats() if (fp := ticket_pipeline.fast_path()) else None}
+
+
+def _parse_args(argv):
+    p = argparse.ArgumentParser(description="Headless ticket intake service.")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--window-ms", type=float, default=5.0,
+                   help="How long the first request of a batch waits for company")
+    p.add_argument("--max-batch", type=int, default=64)
+    p.add_argument("--max-concurrency", type=int, default=256,
+                   help="Requests processed at once; the rest wait")
+    p.add_argument("--db", default=None, help="Ticket store path (default: app data dir)")
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    cache = model_cache.get_cache(MODEL_PATH, VEC_PATH)
+    cache.get()   # load before accepting traffic
+    service = IntakeService(cache, ticket_store.TicketStore(args.db),
+                            window=args.window_ms / 1000, max_batch=max(1, args.max_batch),
+                            max_concurrency=max(1, args.max_concurrency))
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.store.close()
+
+
+if __name__ == "__main__":
+    main()
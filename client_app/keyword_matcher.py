@@ -0,0 +1,187 @@
+"""
+Keyword-lexicon fast path ahead of the TF-IDF + RandomForest model.
+
+The training data is built from fixed L1/L2/L3 phrases (exported by
+data_engine/train_model.py to ``keyword_lexicon.json``), and many real
+tickets contain one of them verbatim.  ``KeywordMatcher`` compiles the
+phrases into an Aho-Corasick automaton, so one pass over the lower-cased
+description finds every phrase it contains (whole words only).  If all the
+phrases found belong to one level, that level is the answer; descriptions
+with no phrase, or phrases from several levels, are left to the model.
+
+``FastPath`` wraps a matcher with hit/ambiguous/miss counters and a sampled
+agreement check against the model.
+
+    python keyword_matcher.py --check     # hit rate, agreement, µs per call
+"""
+import json
+import os
+import random
+import sys
+import threading
+from collections import deque
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+LEXICON_PATH = os.path.abspath(os.path.join(_HERE, "..", "data_engine", "keyword_lexicon.json"))
+
+
+class KeywordMatcher:
+    def __init__(self, lexicon):
+        """``lexicon`` maps level -> list of phrases."""
+        self._goto = [{}]      # state -> {char: next state}
+        self._fail = [0]
+        self._out = [()]       # state -> ((phrase length, level), ...)
+        for level, phrases in lexicon.items():
+            for phrase in phrases:
+                self._add(" ".join(phrase.lower().split()), level)
+        self._link()
+
+    @classmethod
+    def load(cls, path=LEXICON_PATH):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f)["levels"])
+
+    def _add(self, phrase, level):
+        state = 0
+        for ch in phrase:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] += ((len(phrase), level),)
+
+    def _link(self):
+        """Breadth-first failure links; outputs inherit along them."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def levels_in(self, text):
+        """Set of levels whose phrases occur in ``text`` as whole words."""
+        text = " ".join(text.lower().split())
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, level in out[state]:
+                start, end = i - length + 1, i + 1
+                if (start == 0 or not text[start - 1].isalnum()) and \
+                        (end == len(text) or not text[end].isalnum()):
+                    found.add(level)
+        return found
+
+    def classify(self, text):
+        """The level if every matched phrase agrees on one, else None."""
+        levels = self.levels_in(text)
+        return next(iter(levels)) if len(levels) == 1 else None
+
+
+class FastPath:
+    """A matcher plus counters; ``check_rate`` of hits are re-checked by the model."""
+
+    def __init__(self, matcher, check_rate=0.02):
+        self.matcher = matcher
+        self.check_rate = check_rate
+        self.hits = self.ambiguous = self.misses = 0
+        self.checked = self.agreed = 0
+        self._lock = threading.Lock()
+
+    def classify(self, text):
+        levels = self.matcher.levels_in(text)
+        with self._lock:
+            if len(levels) == 1:
+                self.hits += 1
+                return next(iter(levels))
+            if levels:
+                self.ambiguous += 1
+            else:
+                self.misses += 1
+        return None
+
+    def should_check(self):
+        return self.check_rate > 0 and random.random() < self.check_rate
+
+    def record_check(self, text, fast_level, model_level):
+        with self._lock:
+            self.checked += 1
+            self.agreed += fast_level == model_level
+        if fast_level != model_level:
+            print(f"[AI] Fast path said {fast_level}, model said {model_level}: {text[:80]!r}",
+                  file=sys.stderr)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.ambiguous + self.misses
+            return {"hits": self.hits, "ambiguous": self.ambiguous, "misses": self.misses,
+                    "hit_rate": self.hits / total if total else 0.0,
+                    "checked": self.checked,
+                    "agreement": self.agreed / self.checked if self.checked else None}
+
+
+def _check(rows):
+    """Hit rate, agreement with the pickled model and per-call time on synthetic tickets."""
+    import time
+    import warnings
+
+    import numpy as np
+
+    warnings.filterwarnings("ignore")
+    sys.path.insert(0, os.path.join(_HERE, "..", "data_engine"))
+    from train_model import synthesize_arrays
+    import model_cache
+
+    descriptions, _ = synthesize_arrays(rows, np.random.default_rng(0))
+    descriptions = [str(d) for d in descriptions]
+    # Real tickets aren't all verbatim phrases: add some free text too.
+    descriptions += ["my laptop makes a weird noise", "outlook and the vpn both fail after update",
+                     "printer paper jam and server 500 error"] * (rows // 30)
+
+    matcher = KeywordMatcher.load()
+    t0 = time.perf_counter()
+    fast = [matcher.classify(d) for d in descriptions]
+    per_call = (time.perf_counter() - t0) / len(descriptions)
+
+    cache = model_cache.get_cache(os.path.join(_HERE, "..", "data_engine", "ticket_classifier.pkl"),
+                                  os.path.join(_HERE, "..", "data_engine", "vectorizer.pkl"))
+    clf, vec = cache.get()
+    hit_idx = [i for i, level in enumerate(fast) if level is not None]
+    model = clf.predict(vec.transform([descriptions[i] for i in hit_idx]))
+    agree = sum(fast[i] == m for i, m in zip(hit_idx, model))
+
+    t0 = time.perf_counter()
+    for d in descriptions[:200]:
+        clf.predict(vec.transform([d]))
+    model_per_call = (time.perf_counter() - t0) / 200
+
+    print(f"fast path: {len(hit_idx)}/{len(descriptions)} hits ({len(hit_idx) / len(descriptions):.1%}), "
+          f"{per_call * 1e6:.1f} µs per description")
+    print(f"agreement with model on hits: {agree}/{len(hit_idx)} ({agree / max(1, len(hit_idx)):.2%})")
+    print(f"model: {model_per_call * 1e3:.2f} ms per description")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    p = argparse.ArgumentParser(description="Keyword fast-path classifier.")
+    p.add_argument("description", nargs="*")
+    p.add_argument("--check", action="store_true", help="Evaluate against the pickled model")
+    p.add_argument("--rows", type=int, default=20_000)
+    args = p.parse_args()
+    if args.check:
+        _check(args.rows)
+    else:
+        print(KeywordMatcher.load().classify(" ".join(args.description)) or "no fast-path match")
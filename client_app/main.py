@@ -2,9 +2,19 @@
 Systemss Plus | AI Support Bot
 Run via:  ./run.sh          (Linux/macOS — sets XCB-safe env vars first)
           uv run main.py    (Windows — no XCB issues there)
+
+Pass --profile-startup to print time-to-first-window and a per-module
+import breakdown (before the first window and during warm-up) to stderr.
+Pass --debug-ui (or set SYSTEMSS_DEBUG_UI=1) to overlay how long each screen
+transition took and how often the Tk loop woke up with nothing to do.
 """
 import os
 import sys
+import time
+
+_T_START = time.perf_counter()
+PROFILE_STARTUP = "--profile-startup" in sys.argv
+DEBUG_UI = "--debug-ui" in sys.argv or os.environ.get("SYSTEMSS_DEBUG_UI") == "1"
 
 # Numeric thread limits — safe to set here on all platforms.
 # On Linux these are also set by run.sh before Python starts, which is
@@ -21,18 +31,45 @@ _HERE = os.path.dirname(os.path.abspath(__file__))
 if _HERE not in sys.path:
     sys.path.insert(0, _HERE)
 
+import startup
+import message_bridge
+_import_profiler = startup.ImportProfiler().install() if PROFILE_STARTUP else None
+
+# Only the GUI toolkit is imported before the start screen is drawn.
 import customtkinter as ctk
 import threading
-import requests
-import joblib
-import queue
-import system_utils
+
+# Everything else is imported on first use, or by the warm-up thread that
+# starts once the first window is on screen (see TicketBotApp._warm_up).
+requests       = startup.lazy("requests")
+system_utils   = startup.lazy("system_utils")
+model_cache    = startup.lazy("model_cache")
+ollama_client  = startup.lazy("ollama_client")
+ollama_scheduler = startup.lazy("ollama_scheduler")
+response_cache = startup.lazy("response_cache")
+fix_runner     = startup.lazy("fix_runner")
+online_learning = startup.lazy("online_learning")
+ticket_store   = startup.lazy("ticket_store")
+similar_tickets = startup.lazy("similar_tickets")
+ticket_pipeline = startup.lazy("ticket_pipeline")
+telemetry      = startup.lazy("telemetry")
+
+WARM_UP_MODULES = ("system_utils", "fix_runner", "ollama_client", "ollama_scheduler",
+                   "response_cache", "model_cache", "online_learning", "ticket_store",
+                   "similar_tickets", "ticket_pipeline", "telemetry")
+# Reported by --profile-startup if any of these sneak in before the window.
+HEAVY_MODULES = ("requests", "joblib", "numpy", "scipy", "sklearn", "psutil", "sqlite3", "asyncio")
 
 # FIX #2: Resolve the model path relative to THIS file, not the CWD.
 _DATA_ENGINE = os.path.join(_HERE, "..", "data_engine")
 MODEL_PATH = os.path.abspath(os.path.join(_DATA_ENGINE, "ticket_classifier.pkl"))
 VEC_PATH   = os.path.abspath(os.path.join(_DATA_ENGINE, "vectorizer.pkl"))
 
+# Stream llama3 tokens into the response box as they arrive (False = wait
+# for the whole answer, as before).
+OLLAMA_STREAM = True
+CLOSE_FLUSH_TIMEOUT = 5.0   # seconds to wait for queued tickets on window close
+
 # Configuration
 ctk.set_appearance_mode("Dark")
 ctk.set_default_color_theme("blue")
@@ -49,56 +86,263 @@ class TicketBotApp(ctk.CTk):
         self.selected_issue    = ctk.StringVar()
         self.ticket_log        = []
 
-        # AI loaded lazily (Just-In-Time) to prevent startup crashes
-        self.ai_model   = None
-        self.vectorizer = None
-
-        # Queue for Ollama background thread → main thread communication
-        self.msg_queue = queue.Queue()
-        self.monitor_queue()
+        # Worker threads → Tk thread: post() wakes the Tk loop only when a
+        # message arrives (see message_bridge).
+        self.messages   = message_bridge.MessageBridge(self, self.handle_messages)
+        self.post       = self.messages.post
+        self.generation = None   # in-flight ollama_client.Generation, if any
+        self._asked     = None   # prompt of self.generation
+
+        self._ai_cache      = None
+        self._lazy_lock     = threading.Lock()
+        self._learner       = None
+        self._tickets       = None
+        self._closing       = False
+        self._similar       = None
+        self._similar_after = None   # pending debounced similar-ticket lookup
+        self._feedback_for  = None   # (description, predicted level) awaiting confirmation
+
+        self._screens        = {}    # name -> frame, see show_screen
+        self._current_screen = None
+        if DEBUG_UI:
+            self._debug_overlay = ctk.CTkLabel(self, text="", font=("Courier", 10),
+                                               text_color="gray")
+            self._debug_overlay.place(relx=1.0, rely=1.0, anchor="se", x=-6, y=-4)
 
         # Build UI
         self.start_screen()
 
+        # Heavy work waits until the first window is on screen.
+        self.after(0, self._on_first_window)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
     # ------------------------------------------------------------------
-    # QUEUE MONITOR
+    # STARTUP / WARM-UP
     # ------------------------------------------------------------------
 
-    def monitor_queue(self):
-        """Drain the inter-thread message queue safely on the main thread."""
+    @property
+    def classifier(self):
+        """Process-wide classifier cache (pickles loaded once, see model_cache)."""
+        return model_cache.get_cache(MODEL_PATH, VEC_PATH)
+
+    @property
+    def ai_cache(self):
+        """Answers to previous (or near-identical) questions, kept on disk.
+
+        Near-duplicate matching reuses the ticket classifier's TF-IDF.
+        """
+        with self._lazy_lock:
+            if self._ai_cache is None:
+                self._ai_cache = response_cache.ResponseCache(
+                    vectorizer_loader=lambda: self.classifier.get()[1]
+                )
+            return self._ai_cache
+
+    @property
+    def learner(self):
+        """Background learner fed by confirmed ticket levels (see online_learning)."""
+        with self._lazy_lock:
+            if self._learner is None:
+                self._learner = online_learning.OnlineLearner(self.classifier).start()
+            return self._learner
+
+    @property
+    def tickets(self):
+        """Local SQLite ticket history, written by a background batching writer."""
+        with self._lazy_lock:
+            if self._tickets is None:
+                self._tickets = ticket_store.TicketStore()
+            return self._tickets
+
+    @property
+    def similar(self):
+        """Inverted index of past tickets for "looks like ticket #N" hints."""
+        with self._lazy_lock:
+            if self._similar is None:
+                self._similar = similar_tickets.SimilarTicketIndex(self.classifier.get()[1])
+            return self._similar
+
+    def _on_ticket_saved(self, ticket_id, record):
+        """Runs on the ticket store's writer thread."""
+        self.post({"action": "ticket_saved", "content": ticket_id})
+        if self._similar is not None:
+            self._similar.add(ticket_id, record["description"], record["fix_action"],
+                              record["predicted_level"])
+
+    def _similar_worker(self, text, target):
+        """Look up similar past tickets off the Tk thread; result goes to ``target``."""
         try:
-            while True:
-                msg = self.msg_queue.get_nowait()
-                if msg["action"] == "log_ai":
-                    if hasattr(self, "ai_response"):
-                        self.ai_response.delete("1.0", "end")
-                        self.ai_response.insert("end", msg["content"])
-                elif msg["action"] == "error_ai":
-                    if hasattr(self, "ai_response"):
-                        self.ai_response.delete("1.0", "end")   # FIX #3: clear first
-                        self.ai_response.insert("end", f"⚠ {msg['content']}")
-        except queue.Empty:
-            pass
-        self.after(100, self.monitor_queue)
+            matches = self.similar.query(text) if self._similar is not None else []
+        except Exception as exc:  # noqa: BLE001
+            print(f"[AI] Similar-ticket lookup skipped: {exc}")
+            matches = []
+        hint = "\n".join(similar_tickets.describe_match(m) for m in matches[:2])
+        self.post({"action": "similar", "target": target, "content": hint})
+
+    def _on_close(self):
+        if self._closing:
+            return
+        self._closing = True
+        self.messages.close()   # later worker posts are dropped
+        # Don't lose tickets still sitting in the writer's queue.  Wait off
+        # the Tk thread and keep servicing Tk meanwhile: a writer callback
+        # already inside event_generate only returns once this loop runs.
+        if self._tickets is not None:
+            flushed = []
+            flusher = threading.Thread(
+                target=lambda: flushed.append(self._tickets.flush(CLOSE_FLUSH_TIMEOUT)),
+                name="ticket-flush", daemon=True)
+            flusher.start()
+            while flusher.is_alive():
+                self.update()
+                flusher.join(0.02)
+            if flushed != [True]:
+                print("[Store] Closing with tickets still unsaved.", file=sys.stderr)
+        if DEBUG_UI:
+            stats = self.messages.stats()
+            print(f"[UI] {stats['messages']} worker messages in {stats['batches']} redraws; "
+                  f"wakeups {stats['wakeups_per_sec']:.2f}/s, "
+                  f"idle {stats['idle_wakeups_per_sec']:.2f}/s", file=sys.stderr)
+            cached = self.classifier.predictions.stats()
+            print(f"[AI] Prediction cache: {cached['hits']} hits / {cached['misses']} misses, "
+                  f"{cached['entries']} entries, {cached['bytes'] / 1024:.0f} KiB", file=sys.stderr)
+        self.destroy()
+
+    def _on_first_window(self):
+        self.update_idletasks()
+        if PROFILE_STARTUP:
+            ttfw = (time.perf_counter() - _T_START) * 1000
+            heavy = [m for m in HEAVY_MODULES if m in sys.modules]
+            print(f"[startup] time to first window: {ttfw:.1f} ms", file=sys.stderr)
+            print(f"[startup] heavy modules loaded before first window: "
+                  f"{', '.join(heavy) or 'none'}", file=sys.stderr)
+            _import_profiler.report("startup")
+            _import_profiler.mark("warm-up")
+        threading.Thread(target=self._warm_up, name="warm-up", daemon=True).start()
+
+    def _warm_up(self):
+        """Import the heavy modules and preload data while the user reads the start screen."""
+        t0 = time.perf_counter()
+        startup.warm_up(WARM_UP_MODULES)
+
+        # Snapshot hostname/IP/boot time off the Tk thread, so the
+        # escalation screen never waits on slow DNS.
+        system_utils.SYSTEM_INFO.refresh_async()
+        self.tickets      # opens (and if needed creates) the ticket store
+        # What the machine was doing before a ticket gets filed (see telemetry).
+        telemetry.get_sampler().start()
+
+        # Load llama3 now, so the first question doesn't wait for it.
+        ollama_scheduler.get_scheduler().warm_up()
+
+        # Warm the classifier while the user is picking a category.
+        if os.path.exists(MODEL_PATH) and os.path.exists(VEC_PATH):
+            self.classifier.preload().join()
+            self.learner.start()   # restores the online model, if one was saved
+            self.similar.build_from(self.tickets)
+
+        if PROFILE_STARTUP:
+            print(f"[startup] warm-up finished in {(time.perf_counter() - t0) * 1000:.1f} ms",
+                  file=sys.stderr)
+            _import_profiler.report("warm-up")
 
     # ------------------------------------------------------------------
-    # UI HELPERS
+    # WORKER MESSAGES
     # ------------------------------------------------------------------
 
-    def clear_frame(self):
-        for widget in self.winfo_children():
-            widget.destroy()
+    def handle_messages(self, batch):
+        """Apply one frame's worth of (coalesced) worker messages on the Tk thread."""
+        for msg in batch:
+            # Drop output from generations that have since been replaced.
+            if "gen" in msg and (self.generation is None or msg["gen"] != self.generation.id):
+                continue
+            if msg["action"] == "log_ai":
+                if hasattr(self, "ai_response"):
+                    self.ai_response.delete("1.0", "end")
+                    self.ai_response.insert("end", msg["content"])
+            elif msg["action"] == "stream_ai":
+                if hasattr(self, "ai_response"):
+                    if msg.get("first"):
+                        self.ai_response.delete("1.0", "end")
+                    self.ai_response.insert("end", msg["content"])
+                    self.ai_response.see("end")
+            elif msg["action"] == "status_ai":
+                if hasattr(self, "ai_status"):
+                    self.ai_status.configure(text=msg["content"])
+            elif msg["action"] == "fix_line":
+                self.log_box.insert("end", msg["content"] + "\n")
+                self.log_box.see("end")
+            elif msg["action"] == "fix_progress":
+                # 0.1 → 0.9 tracks completed steps; 1.0 is set on finish.
+                self.progress.set(0.1 + 0.8 * msg["value"])
+            elif msg["action"] == "fix_done":
+                self.ticket_log.append(f"AutoFix: {self._fix_key} → {msg['content']}")
+                self.step_3_finish()
+            elif msg["action"] == "diag_done":
+                for line in system_utils.format_diagnostics(msg["content"]):
+                    self.log_box.insert("end", line + "\n")
+                self.ticket_log.append({"diagnostics": msg["content"]})
+                self.step_3_finish()
+            elif msg["action"] == "ticket_saved":
+                if hasattr(self, "saved_label"):
+                    self.saved_label.configure(
+                        text=f"💾 Saved locally as ticket #{msg['content']}.")
+            elif msg["action"] == "similar":
+                label = getattr(self, msg["target"], None)
+                if label is not None and label.winfo_exists():
+                    label.configure(text=msg["content"])
+            elif msg["action"] == "error_ai":
+                if hasattr(self, "ai_response"):
+                    self.ai_response.delete("1.0", "end")   # FIX #3: clear first
+                    self.ai_response.insert("end", f"⚠ {msg['content']}")
 
     # ------------------------------------------------------------------
-    # START SCREEN
+    # SCREENS
     # ------------------------------------------------------------------
+    # Each screen is built once into its own frame (``_build_<name>_screen``)
+    # the first time it is shown; navigating just swaps frames and resets
+    # the widgets' contents.
+
+    def _screen(self, name):
+        frame = self._screens.get(name)
+        if frame is None:
+            frame = ctk.CTkFrame(self, fg_color="transparent")
+            getattr(self, f"_build_{name}_screen")(frame)
+            self._screens[name] = frame
+        return frame
+
+    def show_screen(self, name, reset=None):
+        """Hide the current screen, then reset and show ``name``."""
+        t0 = time.perf_counter()
+        built = name not in self._screens
+        frame = self._screen(name)
+        if reset is not None:
+            reset()
+        if self._current_screen != name:
+            if self._current_screen == "ai":
+                # Nobody is left to read the answer; free the Ollama slot.
+                self.cancel_ollama()
+            if self._current_screen is not None:
+                self._screens[self._current_screen].pack_forget()
+            frame.pack(fill="both", expand=True)
+            self._current_screen = name
+
+        if DEBUG_UI:
+            self.update_idletasks()   # include layout in the measurement
+            ms = (time.perf_counter() - t0) * 1000
+            note = " (first build)" if built else ""
+            idle = self.messages.stats()["idle_wakeups_per_sec"]
+            self._debug_overlay.configure(text=f"{name}: {ms:.1f} ms{note} · idle wakeups {idle:.2f}/s")
+            self._debug_overlay.lift()
+            print(f"[UI] → {name} in {ms:.1f} ms{note}", file=sys.stderr)
 
-    def start_screen(self):
-        self.clear_frame()
-        self.ticket_log = []  # reset log on returning home
+    # ------------------------------------------------------------------
+    # START SCREEN
+    # ------------------------------------------------------------------
 
-        ctk.CTkLabel(self, text="Systemss Plus Support",   font=("Arial", 24, "bold")).pack(pady=20)
-        ctk.CTkLabel(self, text="Automated IT Assistant",  font=("Arial", 14)).pack(pady=5)
+    def _build_start_screen(self, f):
+        ctk.CTkLabel(f, text="Systemss Plus Support",   font=("Arial", 24, "bold")).pack(pady=20)
+        ctk.CTkLabel(f, text="Automated IT Assistant",  font=("Arial", 14)).pack(pady=5)
 
         # FIX #4: Complete category → issues mapping (added "Peripheral")
         self._issue_map = {
@@ -112,18 +356,29 @@ class TicketBotApp(ctk.CTk):
         categories = list(self._issue_map.keys())
 
         self.cat_menu = ctk.CTkOptionMenu(
-            self, values=categories, command=self.update_issues, width=300
+            f, values=categories, command=self.update_issues, width=300
         )
-        self.cat_menu.set("Select Category")
         self.cat_menu.pack(pady=10)
 
-        # FIX #5: Populate issue menu with first category's issues by default
-        # so it's never empty when the user hasn't touched it yet.
-        self.issue_menu = ctk.CTkOptionMenu(self, values=["— select a category first —"], width=300)
-        self.issue_menu.set("— select a category first —")
+        self.issue_menu = ctk.CTkOptionMenu(f, values=["— select a category first —"], width=300)
         self.issue_menu.pack(pady=10)
 
-        ctk.CTkButton(self, text="Start Diagnosis", command=self.process_selection).pack(pady=30)
+        ctk.CTkButton(f, text="Start Diagnosis", command=self.process_selection).pack(pady=30)
+
+        self.start_warning = ctk.CTkLabel(f, text="", text_color="orange", font=("Arial", 12))
+        self.start_warning.pack(pady=4)
+
+    def start_screen(self):
+        self.show_screen("start", self._reset_start_screen)
+
+    def _reset_start_screen(self):
+        self.ticket_log = []  # reset log on returning home
+        self.cat_menu.set("Select Category")
+        # FIX #5: Placeholder in the issue menu so it's never empty when the
+        # user hasn't touched the category menu yet.
+        self.issue_menu.configure(values=["— select a category first —"])
+        self.issue_menu.set("— select a category first —")
+        self.start_warning.configure(text="")
 
     def update_issues(self, choice):
         options = self._issue_map.get(choice, [])
@@ -153,34 +408,49 @@ class TicketBotApp(ctk.CTk):
 
     def _show_warning(self, message: str):
         """Display a non-blocking warning label under the buttons."""
-        # Remove any pre-existing warning
-        for w in self.winfo_children():
-            if getattr(w, "_is_warning", False):
-                w.destroy()
-        lbl = ctk.CTkLabel(self, text=f"⚠  {message}", text_color="orange", font=("Arial", 12))
-        lbl._is_warning = True
-        lbl.pack(pady=4)
+        self.start_warning.configure(text=f"⚠  {message}")
 
     # ------------------------------------------------------------------
     # AUTO-FIX FLOW
     # ------------------------------------------------------------------
 
-    def run_fix_screen(self, category, issue):
-        self.clear_frame()
-        ctk.CTkLabel(self, text=f"Running Auto-Fix: {issue}", font=("Arial", 18)).pack(pady=20)
+    def _build_fix_screen(self, f):
+        self.fix_title = ctk.CTkLabel(f, text="", font=("Arial", 18))
+        self.fix_title.pack(pady=20)
 
-        self.progress = ctk.CTkProgressBar(self)
+        self.progress = ctk.CTkProgressBar(f)
         self.progress.pack(pady=20)
-        self.progress.set(0)
 
-        self.log_box = ctk.CTkTextbox(self, width=500, height=150)
+        self.log_box = ctk.CTkTextbox(f, width=500, height=150)
         self.log_box.pack(pady=10)
-        self.log_box.insert("end", "Initialising diagnostics…\n")
 
-        self.after(1000, lambda: self.step_2_execute(category, issue))
+        # Shown by verification_screen once the fix has finished.
+        self.verify_frame = ctk.CTkFrame(f, fg_color="transparent")
+        ctk.CTkLabel(
+            self.verify_frame, text="Please test now. Is it working?",
+            font=("Arial", 16, "bold"), text_color="yellow"
+        ).pack(pady=10)
+
+        btn_frame = ctk.CTkFrame(self.verify_frame)
+        btn_frame.pack(pady=10)
+        ctk.CTkButton(btn_frame, text="YES – Fixed",        fg_color="green",
+                      command=self.close_success).pack(side="left", padx=10)
+        ctk.CTkButton(btn_frame, text="NO – Still Broken",  fg_color="red",
+                      command=self.create_ticket_screen).pack(side="left", padx=10)
+
+    def run_fix_screen(self, category, issue):
+        self.show_screen("fix", lambda: self._reset_fix_screen(issue))
+        self.after_idle(lambda: self.step_2_execute(category, issue))
+
+    def _reset_fix_screen(self, issue):
+        self.fix_title.configure(text=f"Running Auto-Fix: {issue}")
+        self.progress.set(0)
+        self.log_box.delete("1.0", "end")
+        self.log_box.insert("end", "Initialising diagnostics…\n")
+        self.verify_frame.pack_forget()
 
     def step_2_execute(self, category, issue):
-        self.progress.set(0.5)
+        self.progress.set(0.1)
 
         # FIX #7: Extended action map to cover all mapped issues
         action_map = {
@@ -198,15 +468,20 @@ class TicketBotApp(ctk.CTk):
         script_key = action_map.get(issue)
 
         if script_key:
+            # Runs off the Tk thread; output, progress and completion come
+            # back through post() (fix_line / fix_progress / fix_done).
             self.log_box.insert("end", f"Executing script: {script_key}…\n")
-            result = system_utils.run_fix(script_key)
-            self.log_box.insert("end", result + "\n")
-            self.ticket_log.append(f"AutoFix: {script_key} → {result}")
+            self._fix_key = script_key
+            fix_runner.FixRunner(self.post).start(script_key)
         else:
             self.log_box.insert("end", "No specific script available. Collecting diagnostics…\n")
             self.ticket_log.append("No AutoFix available.")
-
-        self.after(1000, self.step_3_finish)
+            threading.Thread(
+                target=lambda: self.post(
+                    {"action": "diag_done", "content": system_utils.run_diagnostics()}
+                ),
+                daemon=True,
+            ).start()
 
     def step_3_finish(self):
         self.progress.set(1.0)
@@ -214,46 +489,60 @@ class TicketBotApp(ctk.CTk):
         self.verification_screen()
 
     def verification_screen(self):
-        ctk.CTkLabel(
-            self, text="Please test now. Is it working?",
-            font=("Arial", 16, "bold"), text_color="yellow"
-        ).pack(pady=10)
+        self.verify_frame.pack()
 
-        btn_frame = ctk.CTkFrame(self)
-        btn_frame.pack(pady=10)
-        ctk.CTkButton(btn_frame, text="YES – Fixed",        fg_color="green",
-                      command=self.close_success).pack(side="left", padx=10)
-        ctk.CTkButton(btn_frame, text="NO – Still Broken",  fg_color="red",
-                      command=self.create_ticket_screen).pack(side="left", padx=10)
+    def _build_success_screen(self, f):
+        ctk.CTkLabel(f, text="Awesome!\nTicket closed automatically.",
+                     font=("Arial", 20), text_color="green").pack(pady=50)
+        ctk.CTkButton(f, text="Home", command=self.start_screen).pack(pady=20)
 
     def close_success(self):
-        self.clear_frame()
-        ctk.CTkLabel(self, text="Awesome!\nTicket closed automatically.",
-                     font=("Arial", 20), text_color="green").pack(pady=50)
-        ctk.CTkButton(self, text="Home", command=self.start_screen).pack(pady=20)
+        self.show_screen("success")
 
     # ------------------------------------------------------------------
     # AI / OLLAMA CHAT
     # ------------------------------------------------------------------
 
-    def ask_ai_screen(self):
-        self.clear_frame()
-        ctk.CTkLabel(self, text="Describe your issue for the AI Agent:",
+    def _build_ai_screen(self, f):
+        ctk.CTkLabel(f, text="Describe your issue for the AI Agent:",
                      font=("Arial", 16)).pack(pady=10)
 
-        self.ai_input = ctk.CTkTextbox(self, width=500, height=100)
+        self.ai_input = ctk.CTkTextbox(f, width=500, height=100)
         self.ai_input.pack(pady=10)
 
-        ctk.CTkButton(self, text="Ask AI", command=self.trigger_ollama).pack(pady=10)
+        ai_btns = ctk.CTkFrame(f)
+        ai_btns.pack(pady=10)
+        ctk.CTkButton(ai_btns, text="Ask AI", command=self.trigger_ollama).pack(side="left", padx=5)
+        ctk.CTkButton(ai_btns, text="Stop", fg_color="gray", width=80,
+                      command=self.cancel_ollama).pack(side="left", padx=5)
 
-        self.ai_response = ctk.CTkTextbox(self, width=500, height=200)
+        self.ai_response = ctk.CTkTextbox(f, width=500, height=200)
         self.ai_response.pack(pady=10)
 
+        self.ai_status = ctk.CTkLabel(f, text="", font=("Arial", 11), text_color="gray")
+        self.ai_status.pack()
+
+        self.ai_similar = ctk.CTkLabel(f, text="", font=("Arial", 11), text_color="#7fb3ff",
+                                       justify="left")
+        self.ai_similar.pack()
+
         ctk.CTkButton(
-            self, text="Result Didn't Help? Create Ticket",
+            f, text="Result Didn't Help? Create Ticket",
             fg_color="red", command=self.create_ticket_screen
         ).pack(pady=10)
 
+    def ask_ai_screen(self):
+        self.show_screen("ai", self._reset_ai_screen)
+
+    def _reset_ai_screen(self):
+        # Leaving the screen cancelled any question (show_screen); this also
+        # covers a reset while already on it.
+        self.cancel_ollama()
+        self.ai_input.delete("1.0", "end")
+        self.ai_response.delete("1.0", "end")
+        self.ai_status.configure(text="")
+        self.ai_similar.configure(text="")
+
     def trigger_ollama(self):
         # FIX #8: Strip whitespace/newlines from the prompt
         prompt = self.ai_input.get("1.0", "end").strip()
@@ -262,98 +551,190 @@ class TicketBotApp(ctk.CTk):
             self.ai_response.insert("end", "⚠ Please describe your issue before clicking Ask AI.")
             return
 
+        # Clicking again while the same question is being answered is a no-op.
+        if self.generation is not None and not self.generation.cancelled and \
+                prompt == self._asked:
+            self.ai_status.configure(text="Still answering this question…")
+            return
+
+        # A new question supersedes whatever is still generating.
+        self.cancel_ollama()
+        self.generation = ollama_client.Generation()
+        self._asked = prompt
+
         self.ai_response.delete("1.0", "end")
         self.ai_response.insert("end", "Thinking (Local LLM)… Please wait.\n")
-        threading.Thread(target=self.ollama_worker, args=(prompt,), daemon=True).start()
+        self.ai_status.configure(text="")
+        self.ai_similar.configure(text="")
+        threading.Thread(target=self._similar_worker, args=(prompt, "ai_similar"),
+                         daemon=True).start()
+        threading.Thread(target=self.ollama_worker, args=(prompt, self.generation),
+                         daemon=True).start()
+
+    def cancel_ollama(self):
+        """Cancel the in-flight generation (closes its HTTP connection)."""
+        if self.generation is not None and not self.generation.cancelled:
+            self.generation.cancel()
+            if hasattr(self, "ai_status"):
+                self.ai_status.configure(text="Generation cancelled.")
+
+    def ollama_worker(self, prompt: str, generation, priority=None):
+        """Answer from the cache, or queue the question on the Ollama scheduler.
+
+        ``priority`` defaults to the one implied by the question's predicted level.
+        """
+        gen_id = generation.id
+        started = time.perf_counter()
+        first = [True]
+
+        def on_token(token):
+            self.post({"action": "stream_ai", "gen": gen_id,
+                                "content": token, "first": first[0]})
+            if first[0]:
+                first[0] = False
+                ttft = time.perf_counter() - started
+                print(f"[AI] Ollama time to first token: {ttft:.2f}s")
+                self.post({"action": "status_ai", "gen": gen_id,
+                                    "content": f"First token after {ttft:.2f}s…"})
+
+        cached = self.ai_cache.get(prompt)
+        if cached is not None:
+            elapsed = (time.perf_counter() - started) * 1000
+            stats = self.ai_cache.stats()
+            print(f"[AI] Answered from cache in {elapsed:.1f} ms "
+                  f"(hits={stats['hits']} near={stats['near_hits']} misses={stats['misses']})")
+            self.post({"action": "log_ai", "gen": gen_id, "content": cached})
+            self.post({"action": "status_ai", "gen": gen_id,
+                                "content": f"Answered from cache in {elapsed:.0f} ms"})
+            self.ticket_log.append(f"AI (cached): {cached[:50]}…")
+            self._answered(generation)
+            return
+
+        if priority is None:
+            priority = ticket_pipeline.question_priority(self.classifier, prompt)
+        # At most one llama3 generation at a time; a question that is already
+        # being answered (e.g. a second window) shares that generation.
+        ollama_scheduler.get_scheduler().submit(
+            prompt, on_token if OLLAMA_STREAM else None, priority, generation,
+            on_done=lambda request: self._ollama_done(request, prompt, started),
+        )
 
-    def ollama_worker(self, prompt: str):
+    def _ollama_done(self, request, prompt, started):
+        """Runs on the scheduler thread once the (possibly shared) generation ends."""
+        gen_id = request.generation.id
         # FIX #9: Specific exception handling instead of bare except
         try:
-            url  = "http://localhost:11434/api/generate"
-            data = {
-                "model":  "llama3",
-                "prompt": f"Tech Support: Provide 3 steps to fix: {prompt}",
-                "stream": False,
-            }
-            response = requests.post(url, json=data, timeout=60)
-            if response.status_code == 200:
-                ans = response.json().get("response", "").strip()
-                self.msg_queue.put({"action": "log_ai", "content": ans})
-                self.ticket_log.append(f"AI: {ans[:50]}…")
+            ans, ttft = request.result()
+            if OLLAMA_STREAM:
+                total = time.perf_counter() - started
+                status = (f"First token after {ttft:.2f}s · done in {total:.2f}s"
+                          if ttft is not None else f"Empty answer after {total:.2f}s")
+                print(f"[AI] Ollama generation finished in {total:.2f}s")
+                self.post({"action": "status_ai", "gen": gen_id, "content": status})
             else:
-                self.msg_queue.put({
-                    "action":  "error_ai",
-                    "content": f"Ollama returned HTTP {response.status_code}.",
-                })
+                self.post({"action": "log_ai", "gen": gen_id, "content": ans})
+            self.ai_cache.put(prompt, ans)
+            self.ticket_log.append(f"AI: {ans[:50]}…")
+        except ollama_client.GenerationCancelled:
+            print("[AI] Ollama generation cancelled.")
+        except ollama_client.OllamaError as exc:
+            self.post({"action": "error_ai", "gen": gen_id, "content": str(exc)})
         except requests.exceptions.ConnectionError:
-            self.msg_queue.put({
+            self.post({
                 "action":  "error_ai",
+                "gen":     gen_id,
                 "content": "Cannot reach Ollama. Is it running? (ollama serve)",
             })
         except requests.exceptions.Timeout:
-            self.msg_queue.put({
+            self.post({
                 "action":  "error_ai",
+                "gen":     gen_id,
                 "content": "Ollama timed out. The model may still be loading.",
             })
         except Exception as exc:  # noqa: BLE001
-            self.msg_queue.put({"action": "error_ai", "content": f"Unexpected error: {exc}"})
+            self.post({"action": "error_ai", "gen": gen_id,
+                                "content": f"Unexpected error: {exc}"})
+        finally:
+            self._answered(request.generation)
+
+    def _answered(self, generation):
+        # Asking the same question again now starts a new answer.
+        if self.generation is generation:
+            self._asked = None
 
     # ------------------------------------------------------------------
     # TICKET CREATION
     # ------------------------------------------------------------------
 
-    def create_ticket_screen(self):
-        self.clear_frame()
-        ctk.CTkLabel(self, text="Escalating to IT Support",
+    def _build_ticket_screen(self, f):
+        ctk.CTkLabel(f, text="Escalating to IT Support",
                      font=("Arial", 20, "bold")).pack(pady=10)
 
-        sys_info = system_utils.get_system_info()
-
-        self.desc_entry = ctk.CTkTextbox(self, width=500, height=100)
-        self.desc_entry.insert("1.0", "Describe the error…")
+        self.desc_entry = ctk.CTkTextbox(f, width=500, height=100)
         self.desc_entry.pack(pady=5)
+        self.desc_entry.bind("<KeyRelease>", self._schedule_similar_lookup)
+
+        self.ticket_similar = ctk.CTkLabel(f, text="", font=("Arial", 11),
+                                           text_color="#7fb3ff", justify="left")
+        self.ticket_similar.pack()
 
-        grid = ctk.CTkFrame(self)
+        grid = ctk.CTkFrame(f)
         grid.pack(pady=5)
 
         ctk.CTkLabel(grid, text="Urgency (1=High):").pack(side="left")
-        # FIX #10: Set a safe default value so int() never receives an empty string
         self.urg_var = ctk.CTkComboBox(grid, values=["1", "2", "3"])
-        self.urg_var.set("2")
         self.urg_var.pack(side="left", padx=5)
 
         ctk.CTkLabel(grid, text="Impact (1=High):").pack(side="left")
         self.imp_var = ctk.CTkComboBox(grid, values=["1", "2", "3"])
-        self.imp_var.set("2")
         self.imp_var.pack(side="left", padx=5)
 
         ctk.CTkButton(
-            self, text="Submit Ticket",
-            command=lambda: self.submit_ticket(sys_info)
+            f, text="Submit Ticket",
+            command=lambda: self.submit_ticket(system_utils.SYSTEM_INFO.get())
         ).pack(pady=20)
 
+    def create_ticket_screen(self):
+        self.show_screen("ticket", self._reset_ticket_screen)
+
+    def _reset_ticket_screen(self):
+        if self._similar_after is not None:
+            self.after_cancel(self._similar_after)
+            self._similar_after = None
+        self.desc_entry.delete("1.0", "end")
+        self.desc_entry.insert("1.0", "Describe the error…")
+        self.ticket_similar.configure(text="")
+        # FIX #10: Set a safe default value so int() never receives an empty string
+        self.urg_var.set("2")
+        self.imp_var.set("2")
+
+    def _schedule_similar_lookup(self, _event=None):
+        # Debounced: look up once the user pauses typing.
+        if self._similar_after is not None:
+            self.after_cancel(self._similar_after)
+        self._similar_after = self.after(400, self._lookup_similar_for_ticket)
+
+    def _lookup_similar_for_ticket(self):
+        self._similar_after = None
+        if self._current_screen != "ticket":
+            return
+        text = self.desc_entry.get("1.0", "end").strip()
+        threading.Thread(target=self._similar_worker, args=(text, "ticket_similar"),
+                         daemon=True).start()
+
     def submit_ticket(self, sys_info: dict):
         description = self.desc_entry.get("1.0", "end").strip()
 
         # FIX #11: Safely parse urgency/impact with a fallback
-        try:
-            urgency = int(self.urg_var.get())
-        except ValueError:
-            urgency = 2
-        try:
-            impact = int(self.imp_var.get())
-        except ValueError:
-            impact = 2
-
-        priority = system_utils.calculate_priority(urgency, impact)
+        urgency = ticket_pipeline.parse_scale(self.urg_var.get())
+        impact  = ticket_pipeline.parse_scale(self.imp_var.get())
+        priority = ticket_pipeline.prioritize(urgency, impact)
 
-        # --- LAZY LOADING AI (PREVENTS CRASH) ---
+        # --- CACHED AI (loaded once, reloaded only if the .pkl files change) ---
         predicted_level = "Unknown"
         try:
             if os.path.exists(MODEL_PATH) and os.path.exists(VEC_PATH):
-                clf = joblib.load(MODEL_PATH)
-                vec = joblib.load(VEC_PATH)
-                predicted_level = clf.predict(vec.transform([description]))[0]
+                predicted_level = ticket_pipeline.classify(self.classifier, [description])[0]
             else:
                 predicted_level = "Model not found – run data_engine/train_model.py first"
         except Exception as exc:
@@ -361,36 +742,75 @@ class TicketBotApp(ctk.CTk):
             print(f"[AI] Prediction skipped: {exc}")
         # ----------------------------------------
 
-        ticket_data = (
-            "\n*** SYSTEMSS PLUS TICKET ***\n"
-            "---------------------------\n"
-            f"User : {sys_info.get('Username')}  |  IP: {sys_info.get('IP Address')}\n"
-            f"Desc : {description}\n"
-            f"Logs : {self.ticket_log}\n"
-            "---------------------------\n"
-            "[AI ANALYSIS]\n"
-            f"Predicted Level : {predicted_level}\n"
-            f"Priority        : {priority}\n"
-            "---------------------------\n"
-        )
+        machine = telemetry.get_sampler().summary(telemetry.SUMMARY_MINUTES)
 
-        self.clear_frame()
-        ctk.CTkLabel(self, text="Ticket Submitted Successfully!",
-                     font=("Arial", 20), text_color="green").pack(pady=10)
+        ticket_data = ticket_pipeline.format_ticket(sys_info, description, self.ticket_log,
+                                                    predicted_level, priority, machine)
 
-        res_box = ctk.CTkTextbox(self, width=550, height=400)
-        res_box.insert("1.0", ticket_data)
-        res_box.pack(pady=10)
+        self.show_screen("result", lambda: self._reset_result_screen(ticket_data, description,
+                                                                      predicted_level))
 
         # FIX #12: Give visible feedback that the ticket was copied to clipboard
         self.clipboard_clear()
         self.clipboard_append(ticket_data)
-        ctk.CTkLabel(self, text="📋 Ticket details copied to clipboard.",
+
+        # Persist to the local ticket store; the writer thread reports the id.
+        record = ticket_store.make_record(sys_info, description, predicted_level, priority,
+                                          urgency, impact, self.ticket_log, machine)
+        self.tickets.submit(record, on_saved=lambda ticket_id: self._on_ticket_saved(ticket_id, record))
+
+    def _build_result_screen(self, f):
+        ctk.CTkLabel(f, text="Ticket Submitted Successfully!",
+                     font=("Arial", 20), text_color="green").pack(pady=10)
+
+        self.res_box = ctk.CTkTextbox(f, width=550, height=400)
+        self.res_box.pack(pady=10)
+
+        ctk.CTkLabel(f, text="📋 Ticket details copied to clipboard.",
                      font=("Arial", 11), text_color="gray").pack(pady=2)
+        self.saved_label = ctk.CTkLabel(f, text="", font=("Arial", 11), text_color="gray")
+        self.saved_label.pack(pady=2)
+
+        # Confirmed levels feed the online learner; packed only for L1–L3.
+        self.fb_frame = ctk.CTkFrame(f)
+        self.fb_prompt = ctk.CTkLabel(self.fb_frame, text="Confirm support level:")
+        self.level_menu = ctk.CTkOptionMenu(self.fb_frame, values=online_learning.LEVELS, width=80)
+        self.fb_confirm = ctk.CTkButton(self.fb_frame, text="Confirm", width=80,
+                                        command=self.confirm_level)
+        self.fb_thanks = ctk.CTkLabel(self.fb_frame, text="", text_color="green")
+
+        self.result_home = ctk.CTkButton(f, text="🏠 Home", command=self.start_screen)
+        self.result_home.pack(pady=10)
+
+    def _reset_result_screen(self, ticket_data, description, predicted_level):
+        self.res_box.delete("1.0", "end")
+        self.res_box.insert("1.0", ticket_data)
+        self.saved_label.configure(text="💾 Saving locally…")
+
+        if predicted_level in online_learning.LEVELS:
+            self._feedback_for = (description, predicted_level)
+            self.fb_thanks.pack_forget()
+            for w in (self.fb_prompt, self.level_menu, self.fb_confirm):
+                w.pack(side="left", padx=5)
+            self.level_menu.set(predicted_level)
+            self.fb_frame.pack(pady=5, before=self.result_home)
+        else:
+            self._feedback_for = None
+            self.fb_frame.pack_forget()
 
-        ctk.CTkButton(self, text="🏠 Home", command=self.start_screen).pack(pady=10)
+    def confirm_level(self):
+        if self._feedback_for is None:
+            return
+        description, predicted = self._feedback_for
+        confirmed = self.level_menu.get()
+        self._feedback_for = None
+        self.learner.submit_feedback(description, predicted, confirmed)
+        for w in (self.fb_prompt, self.level_menu, self.fb_confirm):
+            w.pack_forget()
+        self.fb_thanks.configure(text=f"✔ Thanks — level {confirmed} recorded.")
+        self.fb_thanks.pack(padx=10)
 
 
 if __name__ == "__main__":
     app = TicketBotApp()
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
@@ -0,0 +1,266 @@
+"""
+Versioned, memory-mapped model bundles.
+
+A bundle is one directory holding the compiled forest + TF-IDF arrays (see
+data_engine/export_forest.py) as plain ``.npy`` files and a
+``manifest.json`` with their dtype, shape, size and SHA-256, the small
+scalar settings, and a bundle digest over all array checksums::
+
+    data_engine/bundles/
+        CURRENT                         <- name of the live version
+        20261017-031500-1a2b3c4d/
+            manifest.json
+            feature.npy  threshold.npy  left.npy  right.npy  value.npy ...
+
+Arrays are opened with ``np.load(mmap_mode="r")``: loading takes
+milliseconds, the pages come from the OS page cache, and every process on
+the host that opens the same version shares one physical copy.
+
+Publishing writes the new version into a temporary directory, renames it
+into place and then swaps ``CURRENT`` with ``os.replace``, so readers see
+either the old or the new version, never a half-written one.
+``BundleCache.get()`` notices the swap (one ``os.stat`` per call) and
+opens the new version; the old mappings go away with their last user.
+
+    python model_bundle.py                  # show the current bundle
+    python model_bundle.py --verify         # re-hash every array
+"""
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+
+import numpy as np
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+BUNDLE_ROOT = os.path.abspath(os.path.join(_HERE, "..", "data_engine", "bundles"))
+FORMAT = 1
+
+# Small values kept in the manifest instead of their own .npy files.
+_SCALARS = ("max_depth", "classes", "token_pattern", "lowercase")
+
+
+class BundleError(Exception):
+    """Missing, incomplete or corrupted bundle."""
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# ----------------------------------------------------------------------
+# WRITING
+# ----------------------------------------------------------------------
+
+def write_bundle(arrays, root=BUNDLE_ROOT, source=None, publish=True, keep=3):
+    """Write ``arrays`` as a new bundle version under ``root``; returns its path.
+
+    ``source`` is recorded in the manifest (e.g. checksums of the pickles
+    it was exported from).  With ``publish`` the new version becomes
+    CURRENT and all but the newest ``keep`` versions are removed.
+    """
+    os.makedirs(root, exist_ok=True)
+    tmp = os.path.join(root, f".tmp-{os.getpid()}-{time.time_ns()}")
+    os.makedirs(tmp)
+    try:
+        entries = {}
+        for name, value in arrays.items():
+            if name in _SCALARS:
+                continue
+            value = np.ascontiguousarray(value)
+            path = os.path.join(tmp, f"{name}.npy")
+            np.save(path, value, allow_pickle=False)
+            entries[name] = {"file": f"{name}.npy", "dtype": value.dtype.str,
+                             "shape": list(value.shape), "bytes": os.path.getsize(path),
+                             "sha256": _sha256(path)}
+
+        digest = hashlib.sha256("".join(e["sha256"] for _, e in sorted(entries.items()))
+                                .encode()).hexdigest()
+        version = f"{time.strftime('%Y%m%d-%H%M%S')}-{digest[:8]}"
+        manifest = {
+            "format": FORMAT,
+            "version": version,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "digest": digest,
+            "scalars": {name: np.asarray(arrays[name]).tolist() for name in _SCALARS},
+            "arrays": entries,
+            "source": source or {},
+        }
+        with open(os.path.join(tmp, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+        final = os.path.join(root, version)
+        if os.path.isdir(final):
+            shutil.rmtree(tmp)        # identical arrays exported twice in one second
+        else:
+            os.rename(tmp, final)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    if publish:
+        publish_version(version, root, keep)
+    return final
+
+
+def publish_version(version, root=BUNDLE_ROOT, keep=3):
+    """Atomically point CURRENT at ``version`` and prune old versions."""
+    if not os.path.isfile(os.path.join(root, version, "manifest.json")):
+        raise BundleError(f"No bundle {version!r} in {root}")
+    tmp = os.path.join(root, f"CURRENT.tmp-{os.getpid()}")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(version + "\n")
+    os.replace(tmp, os.path.join(root, "CURRENT"))
+
+    versions = sorted(v for v in os.listdir(root)
+                      if not v.startswith((".", "CURRENT")) and os.path.isdir(os.path.join(root, v)))
+    for old in versions[:-keep] if keep else []:
+        if old != version:
+            # Processes that still map it keep their pages (POSIX); on
+            # Windows the delete fails and is retried on the next publish.
+            shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+
+
+# ----------------------------------------------------------------------
+# READING
+# ----------------------------------------------------------------------
+
+def current_version(root=BUNDLE_ROOT):
+    try:
+        with open(os.path.join(root, "CURRENT"), encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        raise BundleError(f"No published bundle in {root}") from None
+
+
+class ModelBundle:
+    def __init__(self, path, manifest, arrays):
+        self.path = path
+        self.manifest = manifest
+        self.version = manifest["version"]
+        self.arrays = arrays          # name -> read-only np.memmap / ndarray
+        self._forest = None
+
+    @classmethod
+    def open(cls, root=BUNDLE_ROOT, version=None, verify=False):
+        """Map a bundle (CURRENT by default).
+
+        File sizes are always checked against the manifest; ``verify``
+        also re-hashes every array file.
+        """
+        version = version or current_version(root)
+        path = os.path.join(root, version)
+        try:
+            with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as exc:
+            raise BundleError(f"Unreadable manifest for {version!r}: {exc}") from None
+        if manifest.get("format") != FORMAT:
+            raise BundleError(f"Unsupported bundle format {manifest.get('format')!r}")
+
+        arrays = {}
+        for name, entry in manifest["arrays"].items():
+            file = os.path.join(path, entry["file"])
+            try:
+                size = os.path.getsize(file)
+            except OSError:
+                raise BundleError(f"{version}: missing {entry['file']}") from None
+            if size != entry["bytes"]:
+                raise BundleError(f"{version}: {entry['file']} is {size} bytes, "
+                                  f"manifest says {entry['bytes']}")
+            if verify and _sha256(file) != entry["sha256"]:
+                raise BundleError(f"{version}: checksum mismatch in {entry['file']}")
+            arr = np.load(file, mmap_mode="r", allow_pickle=False)
+            if arr.dtype.str != entry["dtype"] or list(arr.shape) != entry["shape"]:
+                raise BundleError(f"{version}: {entry['file']} does not match the manifest")
+            arrays[name] = arr
+        for name, value in manifest["scalars"].items():
+            arrays[name] = np.asarray(value)
+        return cls(path, manifest, arrays)
+
+    @property
+    def forest(self):
+        """``CompiledForest`` scoring straight from the mapped arrays."""
+        if self._forest is None:
+            from compiled_forest import CompiledForest
+            self._forest = CompiledForest(self.arrays)
+        return self._forest
+
+    def predict(self, descriptions):
+        return self.forest.predict(descriptions)
+
+
+class BundleCache:
+    """Process-wide handle on CURRENT that follows atomic swaps."""
+
+    def __init__(self, root=BUNDLE_ROOT):
+        self.root = root
+        self.swaps = 0
+        self._lock = threading.Lock()
+        self._bundle = None
+        self._stamp = None
+
+    def _current_stamp(self):
+        st = os.stat(os.path.join(self.root, "CURRENT"))
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def get(self):
+        """The live ``ModelBundle``; re-opened when CURRENT has been swapped."""
+        with self._lock:
+            try:
+                stamp = self._current_stamp()
+            except FileNotFoundError:
+                if self._bundle is None:
+                    raise BundleError(f"No published bundle in {self.root}") from None
+                return self._bundle
+            if self._bundle is None or stamp != self._stamp:
+                version = current_version(self.root)
+                if self._bundle is None or version != self._bundle.version:
+                    self._bundle = ModelBundle.open(self.root, version)
+                    self.swaps += 1
+                    print(f"[AI] Model bundle {version} mapped.", file=sys.stderr)
+                self._stamp = stamp
+            return self._bundle
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(root=BUNDLE_ROOT):
+    key = os.path.abspath(root)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = BundleCache(key)
+        return cache
+
+
+if __name__ == "__main__":
+    import argparse
+
+    p = argparse.ArgumentParser(description="Inspect or verify the model bundle.")
+    p.add_argument("--root", default=BUNDLE_ROOT)
+    p.add_argument("--version", default=None, help="Default: CURRENT")
+    p.add_argument("--verify", action="store_true", help="Re-hash every array file")
+    p.add_argument("--publish", metavar="VERSION", help="Make VERSION the current bundle")
+    args = p.parse_args()
+
+    if args.publish:
+        publish_version(args.publish, args.root)
+        print(f"CURRENT -> {args.publish}")
+    t0 = time.perf_counter()
+    bundle = ModelBundle.open(args.root, args.version, verify=args.verify)
+    bundle.forest
+    elapsed = (time.perf_counter() - t0) * 1000
+    total = sum(e["bytes"] for e in bundle.manifest["arrays"].values())
+    print(f"{bundle.version}: {len(bundle.arrays)} arrays, {total / 1024:.0f} KiB mapped, "
+          f"opened{' and verified' if args.verify else ''} in {elapsed:.1f} ms")
+    print(f"digest {bundle.manifest['digest']}")
@@ -0,0 +1,197 @@
+"""
+Process-wide cache for the ticket classifier.
+
+The RandomForest + TF-IDF pickles are unpickled once and kept resident, so a
+ticket submission only pays for ``transform`` + ``predict``.  Every access
+does a cheap ``os.stat`` of both files; the pickles are only re-read when the
+mtime/size changed AND the content checksum differs from the loaded copy.
+
+``swap_classifier`` lets a background learner atomically replace the served
+classifier (see online_learning); a pickle reload discards the swap, since
+the new vectorizer's features may not match.  ``add_corrections`` pins the
+confirmed level of individual descriptions (by normalised text), on top of
+whichever classifier is served; those survive reloads.
+
+Results go through a normalised-text LRU (see prediction_cache); entries
+from an older ``generation`` are treated as misses.
+"""
+import hashlib
+import os
+import sys
+import threading
+
+import prediction_cache
+import tracing
+
+
+def _file_digest(path):
+    """SHA-256 of a file, read in 1 MiB blocks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ClassifierCache:
+    """Holds one (classifier, vectorizer) pair and reloads it on change."""
+
+    def __init__(self, model_path, vec_path, max_cached=4096):
+        self.model_path = model_path
+        self.vec_path   = vec_path
+        self.load_count = 0
+        self.generation = 0   # bumped whenever the served model changes
+        self.predictions = prediction_cache.PredictionCache(max_cached)
+
+        self._lock   = threading.Lock()
+        self._clf    = None
+        self._vec    = None
+        self._stamp  = None   # (mtime_ns, size) of both files at last check
+        self._digest = None   # checksum of both files at last load
+        self._override = None  # classifier swapped in by swap_classifier()
+        self._corrections = {}  # normalised description -> confirmed level (copy-on-write)
+
+    # ------------------------------------------------------------------
+    # LOADING
+    # ------------------------------------------------------------------
+
+    def _current_stamp(self):
+        stamp = []
+        for path in (self.model_path, self.vec_path):
+            st = os.stat(path)
+            stamp.append((st.st_mtime_ns, st.st_size))
+        return tuple(stamp)
+
+    def _current_digest(self):
+        return (_file_digest(self.model_path), _file_digest(self.vec_path))
+
+    def _load(self, digest):
+        import joblib  # heavy (numpy/scipy/sklearn) — only pulled in here
+
+        with tracing.span("model.load"):
+            clf = joblib.load(self.model_path)
+            vec = joblib.load(self.vec_path)
+        self._clf, self._vec, self._digest = clf, vec, digest
+        self._override = None
+        self.load_count += 1
+        self.generation += 1
+        print(f"[AI] Classifier loaded (load #{self.load_count}).", file=sys.stderr)
+
+    def _snapshot(self):
+        """``(classifier, vectorizer, generation)``, consistent with each other."""
+        with self._lock:
+            stamp = self._current_stamp()
+            if self._clf is None or stamp != self._stamp:
+                digest = self._current_digest()
+                if self._clf is None or digest != self._digest:
+                    self._load(digest)
+                self._stamp = stamp
+            clf = self._override if self._override is not None else self._clf
+            return clf, self._vec, self.generation
+
+    def get(self):
+        """Return ``(classifier, vectorizer)``, loading or reloading if needed.
+
+        Raises ``FileNotFoundError`` if either pickle is missing.
+        """
+        return self._snapshot()[:2]
+
+    @property
+    def vectorizer_digest(self):
+        """Checksum of the loaded vectorizer.pkl (None until loaded)."""
+        return self._digest[1] if self._digest else None
+
+    def swap_classifier(self, clf, vectorizer_digest):
+        """Serve ``clf`` instead of the pickled classifier.
+
+        ``vectorizer_digest`` must match the loaded vectorizer; returns False
+        (and changes nothing) if the pickles were reloaded in the meantime.
+        """
+        with self._lock:
+            if vectorizer_digest != self.vectorizer_digest:
+                return False
+            self._override = clf
+            self.generation += 1
+            return True
+
+    def add_corrections(self, pairs):
+        """Answer each ``(description, level)`` with ``level`` from now on."""
+        with self._lock:
+            corrections = dict(self._corrections)
+            for description, level in pairs:
+                corrections[prediction_cache.normalize_description(description)] = str(level)
+            self._corrections = corrections
+
+    def is_loaded(self):
+        return self._clf is not None
+
+    def is_overridden(self):
+        """True while a ``swap_classifier`` model or any correction is served."""
+        return self._override is not None or bool(self._corrections)
+
+    def preload(self):
+        """Load the pickles on a daemon thread so the first submit is fast."""
+        def _worker():
+            try:
+                self.get()
+            except Exception as exc:  # noqa: BLE001
+                print(f"[AI] Preload skipped: {exc}", file=sys.stderr)
+
+        t = threading.Thread(target=_worker, name="classifier-preload", daemon=True)
+        t.start()
+        return t
+
+    # ------------------------------------------------------------------
+    # INFERENCE
+    # ------------------------------------------------------------------
+
+    def classify(self, descriptions):
+        """Levels and class probabilities for a batch of descriptions.
+
+        Returns ``(classes, levels, probabilities)``.  Corrected
+        descriptions, and those whose normalised text is cached for the
+        current model, skip the model; the rest (one per distinct key)
+        share a single transform/predict.
+        """
+        clf, vec, generation = self._snapshot()
+        classes = [str(c) for c in clf.classes_]
+        corrections = self._corrections
+        keys = [prediction_cache.normalize_description(d) for d in descriptions]
+        results = [(corrections[key], tuple(float(c == corrections[key]) for c in classes))
+                   if key in corrections else self.predictions.get(key, generation)
+                   for key in keys]
+
+        todo = {}   # key -> index of its first uncached description
+        for i, (key, result) in enumerate(zip(keys, results)):
+            if result is None:
+                todo.setdefault(key, i)
+        if todo:
+            with tracing.span("model.transform", rows=len(todo)):
+                X = vec.transform([descriptions[i] for i in todo.values()])
+            with tracing.span("model.predict", rows=len(todo)):
+                proba = clf.predict_proba(X)
+            fresh = {}
+            for key, row in zip(todo, proba):
+                fresh[key] = (classes[int(row.argmax())], tuple(float(p) for p in row))
+                self.predictions.put(key, generation, *fresh[key])
+            results = [fresh[key] if result is None else result
+                       for key, result in zip(keys, results)]
+        return classes, [r[0] for r in results], [list(r[1]) for r in results]
+
+    def predict(self, description):
+        """Predict the support level (L1/L2/L3) for a single description."""
+        return self.classify([description])[1][0]
+
+
+_caches      = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(model_path, vec_path):
+    """Return the process-wide cache for this pair of pickle paths."""
+    key = (os.path.abspath(model_path), os.path.abspath(vec_path))
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = ClassifierCache(*key)
+        return cache
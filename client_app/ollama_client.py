@@ -0,0 +1,186 @@
+"""
+Client for the local Ollama ``/api/generate`` endpoint.
+
+``stream_generate`` consumes the NDJSON chunk stream incrementally and hands
+each piece of text to a callback as soon as it arrives.  A ``Generation``
+handle lets another thread cancel an in-flight request; cancelling closes the
+HTTP connection so Ollama stops generating for us.
+
+All requests share one connection-pooled ``requests.Session`` so repeated
+questions reuse the same keep-alive socket to Ollama.  Every request asks
+Ollama to keep the model loaded for ``KEEP_ALIVE``; ``warm_up`` loads it
+without generating anything.  ``SYSTEMSS_OLLAMA_URL`` points the client at
+another server (e.g. ollama_stub.py).
+"""
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import tracing
+
+OLLAMA_URL   = os.environ.get("SYSTEMSS_OLLAMA_URL", "http://localhost:11434/api/generate")
+OLLAMA_MODEL = "llama3"
+KEEP_ALIVE   = "30m"
+
+_session      = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Process-wide keep-alive session for talking to Ollama."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            _session = s
+        return _session
+
+
+class OllamaError(Exception):
+    """Ollama answered, but not with a usable response."""
+
+
+class GenerationCancelled(Exception):
+    """The generation was cancelled before Ollama finished."""
+
+
+def build_prompt(prompt: str) -> str:
+    return f"Tech Support: Provide 3 steps to fix: {prompt}"
+
+
+class Generation:
+    """Cancellable handle for one streaming request."""
+
+    _ids = 0
+    _ids_lock = threading.Lock()
+
+    def __init__(self):
+        with Generation._ids_lock:
+            Generation._ids += 1
+            self.id = Generation._ids
+        self._cancelled = threading.Event()
+        self._response  = None
+        self._callbacks = []
+        self._callbacks_lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def on_cancel(self, callback):
+        """Call ``callback(generation)`` once, when (or if already) cancelled."""
+        with self._callbacks_lock:
+            if not self._cancelled.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def cancel(self):
+        """Stop the generation and drop the connection (safe from any thread)."""
+        with self._callbacks_lock:
+            first = not self._cancelled.is_set()
+            self._cancelled.set()
+            callbacks, self._callbacks = self._callbacks, []
+        if first:
+            for callback in callbacks:
+                callback(self)
+        resp = self._response
+        if resp is not None:
+            try:
+                resp.close()
+            except Exception:  # noqa: BLE001 — best effort, reader thread handles fallout
+                pass
+
+
+@tracing.traced("ollama.generate")
+def generate(prompt: str, timeout: float = 60) -> str:
+    """Non-streaming request; returns the full answer."""
+    data = {"model": OLLAMA_MODEL, "prompt": build_prompt(prompt), "stream": False,
+            "keep_alive": KEEP_ALIVE}
+    response = get_session().post(OLLAMA_URL, json=data, timeout=timeout)
+    if response.status_code != 200:
+        raise OllamaError(f"Ollama returned HTTP {response.status_code}.")
+    return response.json().get("response", "").strip()
+
+
+@tracing.traced("ollama.stream")
+def stream_generate(prompt: str, on_token, generation: Generation = None,
+                    connect_timeout: float = 5, read_timeout: float = 60):
+    """Stream an answer, calling ``on_token(text)`` for every chunk.
+
+    Returns ``(full_text, time_to_first_token_seconds)``.  Raises
+    ``GenerationCancelled`` if ``generation`` is cancelled mid-stream;
+    ``read_timeout`` applies between chunks, not to the whole answer.
+    """
+    generation = generation or Generation()
+    data  = {"model": OLLAMA_MODEL, "prompt": build_prompt(prompt), "stream": True,
+             "keep_alive": KEEP_ALIVE}
+    start = time.perf_counter()
+    ttft  = None
+    parts = []
+
+    if generation.cancelled:
+        raise GenerationCancelled()
+    response = get_session().post(OLLAMA_URL, json=data, stream=True,
+                                  timeout=(connect_timeout, read_timeout))
+    generation._response = response
+    try:
+        # cancel() during the blocking post() found no response to close.
+        if generation.cancelled:
+            raise GenerationCancelled()
+        if response.status_code != 200:
+            raise OllamaError(f"Ollama returned HTTP {response.status_code}.")
+        # chunk_size=None: hand over bytes as they arrive instead of
+        # blocking until a 512-byte buffer fills.
+        for line in response.iter_lines(chunk_size=None):
+            if generation.cancelled:
+                raise GenerationCancelled()
+            if not line:
+                continue
+            chunk = json.loads(line)
+            if chunk.get("error"):
+                raise OllamaError(chunk["error"])
+            token = chunk.get("response", "")
+            if token:
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                    tracing.record("ollama.ttft", ttft)
+                parts.append(token)
+                on_token(token)
+            if chunk.get("done"):
+                break
+    except GenerationCancelled:
+        raise
+    except Exception:
+        # Closing the socket from cancel() surfaces as a read error here.
+        if generation.cancelled:
+            raise GenerationCancelled() from None
+        raise
+    finally:
+        response.close()
+
+    if generation.cancelled:
+        raise GenerationCancelled()
+    return "".join(parts).strip(), ttft
+
+
+@tracing.traced("ollama.warm_up")
+def warm_up(timeout: float = 120) -> float:
+    """Load the model into memory without generating; returns seconds taken.
+
+    A request without a prompt makes Ollama load the model and keep it for
+    ``KEEP_ALIVE``, so the first real question doesn't pay for the load.
+    """
+    start = time.perf_counter()
+    data = {"model": OLLAMA_MODEL, "keep_alive": KEEP_ALIVE, "stream": False}
+    response = get_session().post(OLLAMA_URL, json=data, timeout=(5, timeout))
+    if response.status_code != 200:
+        raise OllamaError(f"Ollama returned HTTP {response.status_code}.")
+    return time.perf_counter() - start
@@ -0,0 +1,295 @@
+"""
+Priority queue in front of ollama_client.stream_generate.
+
+Local llama3 runs on the user's CPU, so generations must not pile up:
+
+* at most ``max_concurrent`` generations run at once (one by default);
+  everything else waits in a heap ordered by ticket priority
+  (``system_utils.calculate_priority``: Urgent < High < Medium < Low),
+  first come first served within a priority;
+* a prompt that is already queued or generating (same text, ignoring case
+  and whitespace) joins that request instead of starting another one: the
+  new caller is sent the tokens streamed so far, then the rest live, and
+  the queued request takes the higher of the two priorities;
+* each caller cancels with its own ``ollama_client.Generation``; the
+  shared request is only dropped (or its connection closed) when every
+  caller has cancelled;
+* ``warm_up()`` loads the model in the background at app start.
+
+    python ollama_scheduler.py --check     # against ollama_stub.py
+"""
+import heapq
+import itertools
+import sys
+import threading
+import time
+
+import ollama_client
+
+PRIORITY_RANK = {"Urgent": 0, "High": 1, "Medium": 2, "Low": 3}
+
+
+def _key(prompt):
+    return " ".join(prompt.casefold().split())
+
+
+class _Job:
+    """One generation on Ollama, shared by every caller asking the same thing."""
+
+    def __init__(self, key, prompt, rank):
+        self.key = key
+        self.prompt = prompt
+        self.rank = rank
+        self.generation = ollama_client.Generation()
+        self.requests = []
+        self.tokens = []
+        self.started = False
+        self.dropped = False
+        self.ttft = None
+
+
+class Request:
+    """A caller's view of a (possibly shared) generation."""
+
+    def __init__(self, job, on_token, generation, on_done):
+        self.generation = generation or ollama_client.Generation()
+        self.coalesced = False
+        self.text = None
+        self.ttft = None
+        self.error = None
+        self._job = job
+        self._on_token = on_token
+        self._on_done = on_done
+        self._sent = 0
+        self._feed_lock = threading.Lock()
+        self._done = threading.Event()
+
+    def _catch_up(self):
+        """Send this caller the job's tokens it hasn't seen yet, in order."""
+        with self._feed_lock:
+            tokens = self._job.tokens[self._sent:]
+            self._sent += len(tokens)
+            if self._on_token is not None and not self.generation.cancelled:
+                for token in tokens:
+                    self._on_token(token)
+
+    def _finish(self, text, ttft, error):
+        if self.generation.cancelled:
+            error = ollama_client.GenerationCancelled()
+        self.text, self.ttft, self.error = text, ttft, error
+        self._done.set()
+        if self._on_done is not None:
+            self._on_done(self)
+
+    def done(self):
+        return self._done.is_set()
+
+    def result(self, timeout=None):
+        """``(full_text, time_to_first_token)``; re-raises the request's error."""
+        if not self._done.wait(timeout):
+            raise TimeoutError("Ollama request still running")
+        if self.error is not None:
+            raise self.error
+        return self.text, self.ttft
+
+
+class OllamaScheduler:
+    def __init__(self, max_concurrent=1, generate=None):
+        self.max_concurrent = max_concurrent
+        self._generate = generate or ollama_client.stream_generate
+        self._cond = threading.Condition()
+        self._heap = []           # (rank, seq, job); stale entries skipped on pop
+        self._jobs = {}           # key -> queued or running job
+        self._seq = itertools.count()
+        self._workers = []
+        self.submitted = self.coalesced = self.generations = self.dropped = 0
+        self.running = self.max_running = 0
+
+    # ------------------------------------------------------------------
+    # SUBMITTING
+    # ------------------------------------------------------------------
+
+    def submit(self, prompt, on_token=None, priority="Medium", generation=None, on_done=None):
+        """Queue ``prompt``; returns a ``Request``.
+
+        ``on_token(text)`` and ``on_done(request)`` are called on a
+        scheduler thread.  ``priority`` is a ``calculate_priority`` label.
+        """
+        rank = PRIORITY_RANK.get(priority, PRIORITY_RANK["Medium"])
+        key = _key(prompt)
+        with self._cond:
+            self.submitted += 1
+            job = self._jobs.get(key)
+            if job is None:
+                job = self._jobs[key] = _Job(key, prompt, rank)
+                heapq.heappush(self._heap, (rank, next(self._seq), job))
+                self._start_workers()
+                self._cond.notify()
+                request = Request(job, on_token, generation, on_done)
+            else:
+                self.coalesced += 1
+                request = Request(job, on_token, generation, on_done)
+                request.coalesced = True
+                if not job.started and rank < job.rank:
+                    job.rank = rank
+                    heapq.heappush(self._heap, (rank, next(self._seq), job))
+            job.requests.append(request)
+        request._catch_up()
+        request.generation.on_cancel(lambda _gen: self._unsubscribe(request))
+        return request
+
+    def _unsubscribe(self, request):
+        job = request._job
+        with self._cond:
+            if request not in job.requests:
+                return              # already finished
+            job.requests.remove(request)
+            drop = not job.requests
+            if drop:
+                job.dropped = True
+                self.dropped += 1
+                if self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+        if drop and job.started:
+            job.generation.cancel()     # closes the HTTP connection
+        request._finish(None, None, None)
+
+    # ------------------------------------------------------------------
+    # RUNNING
+    # ------------------------------------------------------------------
+
+    def _start_workers(self):
+        while len(self._workers) < self.max_concurrent:
+            t = threading.Thread(target=self._worker, name=f"ollama-{len(self._workers)}",
+                                 daemon=True)
+            self._workers.append(t)
+            t.start()
+
+    def _next_job(self):
+        with self._cond:
+            while True:
+                while not self._heap:
+                    self._cond.wait()
+                _, _, job = heapq.heappop(self._heap)
+                if job.started or job.dropped:
+                    continue
+                job.started = True
+                self.generations += 1
+                self.running += 1
+                self.max_running = max(self.max_running, self.running)
+                return job
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            text = error = None
+            started = time.perf_counter()
+
+            def on_token(token, job=job):
+                with self._cond:
+                    if job.ttft is None:
+                        job.ttft = time.perf_counter() - started
+                    job.tokens.append(token)
+                    requests = list(job.requests)
+                for request in requests:
+                    request._catch_up()
+
+            try:
+                text, _ = self._generate(job.prompt, on_token, job.generation)
+            except Exception as exc:  # noqa: BLE001 — handed to every caller
+                error = exc
+            with self._cond:
+                self.running -= 1
+                if self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+                requests, job.requests = list(job.requests), []
+            for request in requests:
+                request._catch_up()
+                request._finish(text, job.ttft, error)
+
+    # ------------------------------------------------------------------
+    # WARM-UP / STATS
+    # ------------------------------------------------------------------
+
+    def warm_up(self):
+        """Load the model on a daemon thread; failures (Ollama not running) are only logged."""
+        def _worker():
+            try:
+                elapsed = ollama_client.warm_up()
+                print(f"[AI] Ollama model warm in {elapsed:.2f}s "
+                      f"(kept loaded for {ollama_client.KEEP_ALIVE}).", file=sys.stderr)
+            except Exception as exc:  # noqa: BLE001
+                print(f"[AI] Ollama warm-up skipped: {exc}", file=sys.stderr)
+
+        t = threading.Thread(target=_worker, name="ollama-warm-up", daemon=True)
+        t.start()
+        return t
+
+    def stats(self):
+        with self._cond:
+            return {"submitted": self.submitted, "coalesced": self.coalesced,
+                    "generations": self.generations, "dropped": self.dropped,
+                    "running": self.running, "max_running": self.max_running,
+                    "queued": sum(1 for *_, job in self._heap
+                                  if not (job.started or job.dropped))}
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """The process-wide scheduler (one generation at a time)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = OllamaScheduler()
+        return _scheduler
+
+
+def _check():
+    """Drive the scheduler against a local stub and print what Ollama saw."""
+    from ollama_stub import StubOllama
+
+    stub = StubOllama(token_delay=0.01, load_delay=0.5, tokens=20).start()
+    ollama_client.OLLAMA_URL = stub.url
+    scheduler = OllamaScheduler(max_concurrent=1)
+
+    t0 = time.perf_counter()
+    scheduler.warm_up().join()
+    print(f"warm-up: {(time.perf_counter() - t0) * 1000:.0f} ms (model load)")
+
+    # The first question occupies the only slot; the rest queue up behind it.
+    first = scheduler.submit("outlook keeps crashing", priority="Low")
+    time.sleep(0.05)
+    low = scheduler.submit("printer offline", priority="Low")
+    urgent = scheduler.submit("server 500 error", priority="Urgent")
+    clicks = [scheduler.submit("VPN not connecting", priority="Medium") for _ in range(5)]
+    clicks.append(scheduler.submit("  vpn NOT connecting ", priority="High"))
+    cancelled = scheduler.submit("wifi drops", priority="High")
+    cancelled.generation.cancel()
+
+    for request in [first, low, urgent] + clicks:
+        request.result(timeout=30)
+    answers = {request.text for request in clicks}
+    stats, seen = scheduler.stats(), stub.stats
+    print(f"first token of a warm model: {first.ttft * 1000:.0f} ms")
+    print(f"{stats['submitted']} submitted, {stats['coalesced']} coalesced, "
+          f"{stats['dropped']} dropped, {stats['generations']} generations, "
+          f"peak {stats['max_running']} running")
+    print(f"stub: {seen['generations']} generations, peak {seen['max_active']} concurrent")
+    print("order served: " + " → ".join(p.rsplit("fix: ", 1)[-1] for p in seen["prompts"]))
+    print(f"duplicate clicks got {len(answers)} distinct answer(s)")
+    stub.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    p = argparse.ArgumentParser(description="Ollama request scheduler.")
+    p.add_argument("--check", action="store_true", help="Exercise the scheduler against ollama_stub.py")
+    args = p.parse_args()
+    if args.check:
+        _check()
+    else:
+        p.print_help()
@@ -0,0 +1,159 @@
+"""
+Stand-in for a local Ollama server, for exercising ollama_client.py and
+ollama_scheduler.py without llama3.
+
+Speaks just enough of ``POST /api/generate``: a request without a prompt
+loads the model, ``"stream": true`` answers with chunked NDJSON (one
+token per line, ``--token-delay`` apart), ``"stream": false`` with a single
+JSON object.  The first request pays ``--load-delay``, like a cold model.
+``GET /stats`` reports request counts and the peak number of concurrent
+generations.
+
+    python ollama_stub.py --port 11435 &
+    SYSTEMSS_OLLAMA_URL=http://127.0.0.1:11435/api/generate python main.py
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients drop keep-alive sockets (and cancelled streams) mid-read.
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+class StubOllama:
+    def __init__(self, host="127.0.0.1", port=0, token_delay=0.02, load_delay=1.0, tokens=40):
+        self.token_delay = token_delay
+        self.load_delay = load_delay
+        self.tokens = tokens
+        self.stats = {"requests": 0, "warm_ups": 0, "generations": 0, "completed": 0,
+                      "disconnected": 0, "active": 0, "max_active": 0, "prompts": []}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loaded = False
+        self._server = _Server((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/generate"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="ollama-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _load(self):
+        with self._load_lock:
+            if not self._loaded:
+                time.sleep(self.load_delay)
+                self._loaded = True
+
+    def _answer(self, prompt):
+        words = f"1. Restart the device. 2. Check the cable. 3. Escalate: {prompt}".split()
+        return [words[i % len(words)] + " " for i in range(self.tokens)]
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _json(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path != "/stats":
+                    return self._json(404, {"error": "not found"})
+                with stub._lock:
+                    return self._json(200, dict(stub.stats))
+
+            def do_POST(self):
+                if self.path != "/api/generate":
+                    return self._json(404, {"error": "not found"})
+                data = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                prompt = data.get("prompt")
+                with stub._lock:
+                    stub.stats["requests"] += 1
+                    stub.stats["warm_ups" if not prompt else "generations"] += 1
+                stub._load()
+                if not prompt:
+                    return self._json(200, {"model": data.get("model"), "response": "",
+                                            "done": True, "done_reason": "load"})
+
+                with stub._lock:
+                    stub.stats["prompts"].append(prompt)
+                    stub.stats["active"] += 1
+                    stub.stats["max_active"] = max(stub.stats["max_active"], stub.stats["active"])
+                try:
+                    self._generate(data, prompt)
+                    key = "completed"
+                except (BrokenPipeError, ConnectionResetError):
+                    key = "disconnected"
+                    self.close_connection = True
+                finally:
+                    with stub._lock:
+                        stub.stats["active"] -= 1
+                with stub._lock:
+                    stub.stats[key] += 1
+
+            def _generate(self, data, prompt):
+                tokens = stub._answer(prompt)
+                if not data.get("stream", True):
+                    time.sleep(stub.token_delay * len(tokens))
+                    return self._json(200, {"model": data.get("model"),
+                                            "response": "".join(tokens), "done": True})
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for i, token in enumerate(tokens + [""]):
+                    if token:
+                        time.sleep(stub.token_delay)
+                    line = json.dumps({"model": data.get("model"), "response": token,
+                                       "done": i == len(tokens)}).encode() + b"\n"
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Minimal Ollama /api/generate stand-in.")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=11435)
+    p.add_argument("--token-delay", type=float, default=0.02, help="Seconds between tokens")
+    p.add_argument("--load-delay", type=float, default=1.0, help="Cold model load, first request only")
+    p.add_argument("--tokens", type=int, default=40)
+    args = p.parse_args()
+
+    stub = StubOllama(args.host, args.port, args.token_delay, args.load_delay, args.tokens)
+    print(f"[Stub] Fake Ollama on {stub.url}")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
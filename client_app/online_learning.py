@@ -0,0 +1,239 @@
+"""
+Feedback loop: learn from confirmed support levels of submitted tickets.
+
+* ``FeedbackStore`` appends every confirmation to a local JSONL file.
+* ``OnlineLearner`` runs on a background thread; ``submit_feedback`` only
+  queues the row, so the UI never touches the disk.  Every confirmation is
+  stored and pinned in the ``ClassifierCache`` as a correction for that
+  exact (normalised) description.  Small batches of new feedback are
+  applied with ``partial_fit`` to a copy of the current online model, which
+  is then swapped into the process-wide ``ClassifierCache`` in one step, so
+  the UI never waits and never sees a half-updated model.
+* Periodically (every ``compact_every`` confirmations, or after
+  ``compact_interval`` seconds with pending feedback) the learner does a full
+  retrain on the synthetic base corpus plus all stored feedback and persists
+  the result — the "compaction" that keeps incremental drift in check.
+
+The RandomForest itself cannot be updated incrementally, so the online model
+is a linear ``SGDClassifier`` over the same (frozen) TF-IDF features.  It is
+fitted mostly on synthetic rows and is worse than the forest until real
+feedback outweighs them, so the first compaction waits for
+``min_feedback`` stored confirmations; until then the pickled RandomForest
+keeps serving, with the corrections on top.
+"""
+import copy
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+from app_paths import data_path
+
+LEVELS = ["L1", "L2", "L3"]
+
+_DATA_ENGINE = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                            "..", "data_engine"))
+
+
+class FeedbackStore:
+    """Append-only JSONL log of (description, predicted, confirmed) rows."""
+
+    def __init__(self, path=None):
+        self.path = path or data_path("feedback.jsonl")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def row(description, predicted, confirmed):
+        return {"ts": time.time(), "description": description,
+                "predicted": predicted, "confirmed": confirmed}
+
+    def append(self, rows):
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(row) + "\n" for row in rows)
+
+    def read_all(self):
+        if not os.path.exists(self.path):
+            return []
+        rows = []
+        with self._lock, open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    rows.append(json.loads(line))
+        return rows
+
+
+class OnlineLearner:
+    # Synthetic rows from data_engine/train_model.py used as the base corpus
+    # for compaction, and how much more a confirmed ticket counts.
+    BASE_ROWS = 20_000
+    FEEDBACK_WEIGHT = 5.0
+
+    def __init__(self, cache, store=None, model_path=None, batch_size=16,
+                 compact_every=200, compact_interval=6 * 3600, min_feedback=200):
+        self.cache = cache
+        self.store = store or FeedbackStore()
+        self.model_path = model_path or data_path("online_classifier.pkl")
+        self.batch_size = batch_size
+        self.compact_every = compact_every
+        self.compact_interval = compact_interval
+        self.min_feedback = min_feedback
+
+        self.updates = 0          # incremental partial_fit swaps
+        self.compactions = 0
+
+        self._queue = queue.Queue()
+        self._model = None
+        self._since_compaction = 0
+        self._stored = 0          # feedback rows on disk
+        self._last_compaction = time.monotonic()
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # PUBLIC API
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="online-learner", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit_feedback(self, description, predicted, confirmed):
+        """Queue a confirmed level; stored and applied on the learner thread."""
+        if confirmed not in LEVELS or not description:
+            return
+        self._queue.put(FeedbackStore.row(description, predicted, confirmed))
+
+    # ------------------------------------------------------------------
+    # WORKER
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        try:
+            self._restore()
+        except Exception as exc:  # noqa: BLE001
+            print(f"[AI] Online model not restored: {exc}", file=sys.stderr)
+
+        while True:
+            batch = self._next_batch()
+            try:
+                self._step(batch)
+            except Exception as exc:  # noqa: BLE001 — keep learning on the next batch
+                print(f"[AI] Online update failed: {exc}", file=sys.stderr)
+
+    def _step(self, batch):
+        """Store and apply one batch (empty after an idle ``compact_interval``)."""
+        if batch:
+            self.store.append(batch)
+            self._stored += len(batch)
+            self.cache.add_corrections((r["description"], r["confirmed"]) for r in batch)
+        self._since_compaction += len(batch)
+        if self._model is None:
+            # Not enough real feedback to beat the forest yet.
+            if self._stored >= self.min_feedback:
+                self.compact()
+            return
+        if not self._since_compaction:
+            return
+        due = (self._since_compaction >= self.compact_every or
+               time.monotonic() - self._last_compaction >= self.compact_interval)
+        if due:
+            self.compact()
+        elif batch:
+            self._partial_update(batch)
+
+    def _next_batch(self):
+        """Block for the first row, then gather up to batch_size more briefly."""
+        try:
+            batch = [self._queue.get(timeout=self.compact_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + 2.0
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        return batch
+
+    def _restore(self):
+        feedback = self.store.read_all()
+        self._stored = len(feedback)
+        self.cache.add_corrections((r["description"], r["confirmed"]) for r in feedback)
+        if not os.path.exists(self.model_path):
+            return
+        import joblib
+
+        saved = joblib.load(self.model_path)
+        self.cache.get()
+        if saved.get("vectorizer_digest") != self.cache.vectorizer_digest:
+            print("[AI] Online model ignored: vectorizer.pkl changed since it was trained.",
+                  file=sys.stderr)
+            return
+        if self.cache.swap_classifier(saved["model"], saved["vectorizer_digest"]):
+            self._model = saved["model"]
+
+    def _partial_update(self, batch):
+        import numpy as np
+
+        _, vec = self.cache.get()
+        digest = self.cache.vectorizer_digest
+        model = copy.deepcopy(self._model)
+        X = vec.transform([r["description"] for r in batch])
+        y = np.array([r["confirmed"] for r in batch])
+        model.partial_fit(X, y, classes=LEVELS,
+                          sample_weight=np.full(len(batch), self.FEEDBACK_WEIGHT))
+        if self.cache.swap_classifier(model, digest):
+            self._model = model
+            self.updates += 1
+        else:
+            self._model = None    # pickles changed under us: retrain from scratch
+
+    def compact(self):
+        """Full retrain on base corpus + all feedback; persist and swap atomically.
+
+        Returns False (and leaves the served model alone) when no feedback
+        has been stored yet: an SGD model fitted on synthetic rows alone is
+        strictly worse than the RandomForest it would replace.
+        """
+        feedback = self.store.read_all()
+        if not feedback:
+            self._since_compaction = 0
+            return False
+
+        import joblib
+        import numpy as np
+        from sklearn.linear_model import SGDClassifier
+
+        if _DATA_ENGINE not in sys.path:
+            sys.path.insert(0, _DATA_ENGINE)
+        from train_model import synthesize_arrays
+
+        _, vec = self.cache.get()
+        digest = self.cache.vectorizer_digest
+
+        base_desc, base_y = synthesize_arrays(self.BASE_ROWS, np.random.default_rng(0))
+        texts = list(base_desc) + [r["description"] for r in feedback]
+        y = np.concatenate([base_y, np.array([r["confirmed"] for r in feedback], dtype=base_y.dtype)])
+        weights = np.concatenate([np.ones(len(base_desc)),
+                                  np.full(len(feedback), self.FEEDBACK_WEIGHT)])
+
+        model = SGDClassifier(loss="log_loss", alpha=1e-5, random_state=0)
+        model.fit(vec.transform(texts), y, sample_weight=weights)
+
+        tmp = self.model_path + ".tmp"
+        joblib.dump({"model": model, "vectorizer_digest": digest,
+                     "feedback_rows": len(feedback)}, tmp)
+        os.replace(tmp, self.model_path)
+
+        if self.cache.swap_classifier(model, digest):
+            self._model = model
+        self._since_compaction = 0
+        self._stored = 0          # feedback rows on disk
+        self._last_compaction = time.monotonic()
+        self.compactions += 1
+        print(f"[AI] Online model compacted ({len(feedback)} feedback rows).", file=sys.stderr)
+        return True
@@ -0,0 +1,375 @@
+"""
+Headless replay benchmark for the ticket pipeline.
+
+Pushes a corpus through the same steps ``TicketBotApp.submit_ticket`` runs —
+classify (keyword fast path, prediction cache, model), ``calculate_priority``,
+the telemetry summary, ticket formatting, the local ticket store — plus
+``system_utils.run_fix`` for every ``--fix-every``-th ticket, with the fix
+commands swapped for a harmless stand-in (``python -c pass``) so nothing on
+the machine changes.  Tickets are replayed on ``--concurrency`` threads.
+
+Besides the synchronous stages, "persist" is the time from ``submit`` until
+the writer thread has committed the ticket to SQLite, and "model" times an
+uncached ``transform`` + ``predict_proba`` for every ``--model-every``-th
+ticket after the replay, so a slower model shows up even though the
+prediction cache answers almost every replayed ticket.
+
+Reports throughput, per-stage latency percentiles, peak RSS and (for
+labelled corpora) agreement with the labels.  ``--baseline FILE`` compares
+the run against a stored report and exits 1 if anything regressed by more
+than ``--tolerance``; ``--save-baseline FILE`` records one.  A baseline is
+only compared under the same settings and on the same machine (Python,
+platform, CPU count).
+
+The keyword fast path answers every synthetic ticket, so the stored
+baseline is recorded with ``--no-fast-path`` to keep the prediction cache
+on the measured path.  The "model" stage has its own ``--model-tolerance``.
+
+    python pipeline_replay.py --rows 20000 --concurrency 4
+    python pipeline_replay.py --no-fast-path --baseline ../data_engine/pipeline_baseline.json
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+if _HERE not in sys.path:
+    sys.path.insert(0, _HERE)
+_DATA_ENGINE = os.path.abspath(os.path.join(_HERE, "..", "data_engine"))
+
+import model_cache
+import system_utils
+import telemetry
+import ticket_pipeline
+import ticket_store
+
+warnings.filterwarnings("ignore")
+
+MODEL_PATH = os.path.join(_DATA_ENGINE, "ticket_classifier.pkl")
+VEC_PATH = os.path.join(_DATA_ENGINE, "vectorizer.pkl")
+BASELINE_PATH = os.path.join(_DATA_ENGINE, "pipeline_baseline.json")
+
+STAGES = ("classify", "prioritize", "telemetry", "format", "store", "fix", "total",
+          "persist", "model")
+# Settings that must match for a baseline comparison to mean anything.
+_CONFIG_KEYS = ("rows", "concurrency", "fix_every", "fast_path", "cache", "corpus",
+                "model_every")
+
+
+# ----------------------------------------------------------------------
+# CORPUS
+# ----------------------------------------------------------------------
+
+def load_corpus(source, rows, seed):
+    """``[(description, level or None), ...]`` from synthetic data or a CSV/JSONL file."""
+    if source == "synthetic":
+        if _DATA_ENGINE not in sys.path:
+            sys.path.insert(0, _DATA_ENGINE)
+        from train_model import synthesize_arrays
+
+        descriptions, levels = synthesize_arrays(rows, np.random.default_rng(seed))
+        return [(str(d), str(level)) for d, level in zip(descriptions, levels)]
+
+    corpus = []
+    with open(source, newline="", encoding="utf-8") as f:
+        if source.lower().endswith(".csv"):
+            for row in csv.DictReader(f):
+                corpus.append((row.get("Description") or row.get("description") or "",
+                               row.get("Support_Level") or row.get("level")))
+        else:
+            for line in f:
+                if line.strip():
+                    obj = json.loads(line)
+                    corpus.append((obj.get("description", ""), obj.get("level")))
+    if not corpus:
+        raise SystemExit(f"No tickets in {source}")
+    # Replay a recorded file as many times as needed to reach --rows.
+    return [corpus[i % len(corpus)] for i in range(rows or len(corpus))]
+
+
+@contextmanager
+def stubbed_fixes():
+    """Swap every fix command for ``python -c pass`` (same number of steps)."""
+    original = system_utils.FIX_SCRIPTS
+    stub = [sys.executable, "-S", "-c", "pass"]
+    system_utils.FIX_SCRIPTS = {
+        key: [system_utils.FixStep(stub, step.ok_message) for step in steps]
+        for key, steps in original.items()
+    }
+    try:
+        yield sorted(system_utils.FIX_SCRIPTS)
+    finally:
+        system_utils.FIX_SCRIPTS = original
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+    except ImportError:             # Windows
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 2**20
+
+
+# ----------------------------------------------------------------------
+# REPLAY
+# ----------------------------------------------------------------------
+
+def _time_model(classifier, corpus, every, timings):
+    """Uncached transform + predict_proba for every ``every``-th ticket."""
+    clf, vec = classifier.get()
+    for i in range(0, len(corpus), every):
+        t = time.perf_counter()
+        clf.predict_proba(vec.transform([corpus[i][0]]))
+        timings["model"][i] = time.perf_counter() - t
+
+
+def replay(corpus, concurrency=1, fix_every=50, fast_path=True, cache=True, model_every=20):
+    classifier = model_cache.get_cache(MODEL_PATH, VEC_PATH)
+    if not cache:
+        classifier.predictions.max_entries = 0
+
+    t0 = time.perf_counter()
+    classifier.get()
+    load_s = time.perf_counter() - t0
+    rss_loaded = _peak_rss_mb()
+
+    tmp = tempfile.TemporaryDirectory(prefix="pipeline-replay-")
+    store = ticket_store.TicketStore(os.path.join(tmp.name, "tickets.sqlite3"))
+    sys_info = system_utils.get_system_info()
+    sampler = telemetry.get_sampler().start()     # as main.py does at startup
+    sampler.sample()
+    timings = {stage: np.full(len(corpus), np.nan) for stage in STAGES}
+    predicted = [None] * len(corpus)
+    errors = []
+
+    with stubbed_fixes() as fix_keys:
+        def one(i):
+            description, _ = corpus[i]
+            urgency, impact = i % 3 + 1, (i // 3) % 3 + 1
+            ticket_log = []
+            try:
+                t_start = t = time.perf_counter()
+                level = ticket_pipeline.classify(classifier, [description], fast_path)[0]
+                now = time.perf_counter()
+                timings["classify"][i], t = now - t, now
+
+                priority = ticket_pipeline.prioritize(urgency, impact)
+                now = time.perf_counter()
+                timings["prioritize"][i], t = now - t, now
+
+                if fix_every and i % fix_every == 0:
+                    key = fix_keys[(i // fix_every) % len(fix_keys)]
+                    result = system_utils.run_fix(key)
+                    ticket_log.append(f"AutoFix: {key} → {result.splitlines()[-1] if result else ''}")
+                    now = time.perf_counter()
+                    timings["fix"][i], t = now - t, now
+
+                machine = sampler.summary(telemetry.SUMMARY_MINUTES)
+                now = time.perf_counter()
+                timings["telemetry"][i], t = now - t, now
+
+                ticket_pipeline.format_ticket(sys_info, description, ticket_log, level, priority,
+                                              machine)
+                now = time.perf_counter()
+                timings["format"][i], t = now - t, now
+
+                def saved(_ticket_id, i=i, submitted=time.perf_counter()):
+                    timings["persist"][i] = time.perf_counter() - submitted
+
+                store.submit(ticket_store.make_record(sys_info, description, level, priority,
+                                                      urgency, impact, ticket_log, machine),
+                             on_saved=saved)
+                now = time.perf_counter()
+                timings["store"][i] = now - t
+                timings["total"][i] = now - t_start
+                predicted[i] = level
+            except Exception as exc:  # noqa: BLE001 — counted, not fatal
+                errors.append(f"#{i}: {exc}")
+
+        # A few untimed tickets first: imports, fast path, first predict.
+        for i in range(min(10, len(corpus))):
+            one(i)
+        started = time.perf_counter()
+        if concurrency <= 1:
+            for i in range(len(corpus)):
+                one(i)
+        else:
+            with ThreadPoolExecutor(concurrency, thread_name_prefix="replay") as pool:
+                list(pool.map(one, range(len(corpus)), chunksize=64))
+        elapsed = time.perf_counter() - started
+        t0 = time.perf_counter()
+        store.flush()
+        flush_s = time.perf_counter() - t0
+
+    if model_every:
+        _time_model(classifier, corpus, model_every, timings)
+    written = store.written
+    store.close()
+    tmp.cleanup()
+
+    def pct(values):
+        values = values[~np.isnan(values)] * 1000
+        if not len(values):
+            return None
+        return {"count": int(len(values)),
+                "p50_ms": float(np.percentile(values, 50)), "p90_ms": float(np.percentile(values, 90)),
+                "p99_ms": float(np.percentile(values, 99)), "max_ms": float(values.max())}
+
+    labelled = [(p, level) for p, (_, level) in zip(predicted, corpus) if level and p]
+    fp = ticket_pipeline.fast_path() if fast_path else None
+    return {
+        "tickets": len(corpus),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "seconds": elapsed,
+        "tickets_per_sec": len(corpus) / elapsed,
+        "store_flush_s": flush_s,
+        "tickets_written": written,
+        "model_load_s": load_s,
+        "stages": {stage: pct(values) for stage, values in timings.items()},
+        "peak_rss_mb": _peak_rss_mb(),
+        "rss_after_model_load_mb": rss_loaded,
+        "accuracy": (sum(p == level for p, level in labelled) / len(labelled)) if labelled else None,
+        "prediction_cache": classifier.predictions.stats(),
+        "fast_path": fp.stats() if fp else None,
+    }
+
+
+# ----------------------------------------------------------------------
+# BASELINE
+# ----------------------------------------------------------------------
+
+def compare(report, baseline, tolerance, model_tolerance=None):
+    """Human-readable regressions of ``report`` against ``baseline`` (empty = none).
+
+    The "model" stage uses ``model_tolerance`` (default: ``tolerance``).
+    """
+    problems = []
+    slack = 1 + tolerance
+    if report["errors"] > baseline["errors"]:
+        problems.append(f"errors: {report['errors']} (baseline {baseline['errors']})")
+    if report["tickets_per_sec"] * slack < baseline["tickets_per_sec"]:
+        problems.append(f"throughput: {report['tickets_per_sec']:,.0f} tickets/s "
+                        f"(baseline {baseline['tickets_per_sec']:,.0f})")
+    for stage in STAGES:
+        now, then = report["stages"].get(stage), baseline["stages"].get(stage)
+        if not now or not then:
+            continue
+        limit = 1 + model_tolerance if stage == "model" and model_tolerance is not None else slack
+        for key in ("p50_ms", "p99_ms"):
+            # Differences under 50 µs are scheduler/timer noise.
+            if now[key] > then[key] * limit and now[key] - then[key] > 0.05:
+                problems.append(f"{stage} {key[:3]}: {now[key]:.3f} ms (baseline {then[key]:.3f} ms)")
+    if report["peak_rss_mb"] > baseline["peak_rss_mb"] * slack:
+        problems.append(f"peak RSS: {report['peak_rss_mb']:.0f} MiB "
+                        f"(baseline {baseline['peak_rss_mb']:.0f} MiB)")
+    if baseline.get("accuracy") is not None and report.get("accuracy") is not None \
+            and report["accuracy"] < baseline["accuracy"] - 0.005:
+        problems.append(f"accuracy: {report['accuracy']:.2%} (baseline {baseline['accuracy']:.2%})")
+    return problems
+
+
+def print_report(report):
+    print(f"{report['tickets']:,} tickets at concurrency {report['config']['concurrency']}: "
+          f"{report['tickets_per_sec']:,.0f} tickets/s, {report['errors']} errors, "
+          f"peak RSS {report['peak_rss_mb']:.0f} MiB "
+          f"({report['rss_after_model_load_mb']:.0f} MiB after model load)")
+    print(f"{'stage':12}{'count':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for stage in STAGES:
+        s = report["stages"][stage]
+        if s:
+            print(f"{stage:12}{s['count']:>8}{s['p50_ms']:>10.3f}{s['p90_ms']:>10.3f}"
+                  f"{s['p99_ms']:>10.3f}{s['max_ms']:>10.2f}")
+    if report["accuracy"] is not None:
+        print(f"agreement with corpus labels: {report['accuracy']:.2%}")
+    cached, fast = report["prediction_cache"], report["fast_path"]
+    print(f"prediction cache hit rate {cached['hit_rate']:.1%}"
+          + (f", keyword fast path hit rate {fast['hit_rate']:.1%}" if fast else ""))
+
+
+def main():
+    p = argparse.ArgumentParser(description="Replay tickets through the submit pipeline.")
+    p.add_argument("--corpus", default="synthetic",
+                   help="'synthetic' (train_model's generator) or a CSV/JSONL file")
+    p.add_argument("--rows", type=int, default=20_000,
+                   help="Tickets to replay (a recorded corpus is repeated or cut to fit)")
+    p.add_argument("--seed", type=int, default=7)
+    p.add_argument("--concurrency", type=int, default=1)
+    p.add_argument("--fix-every", type=int, default=50,
+                   help="Run a (stubbed) fix script for every Nth ticket; 0 = never")
+    p.add_argument("--no-fast-path", action="store_true")
+    p.add_argument("--no-cache", action="store_true", help="Disable the prediction LRU")
+    p.add_argument("--model-every", type=int, default=20,
+                   help="Time an uncached model call for every Nth ticket; 0 = never")
+    p.add_argument("--baseline", help="Compare against this report; exit 1 on regression")
+    p.add_argument("--tolerance", type=float, default=0.25,
+                   help="Allowed slowdown/growth vs the baseline (0.25 = 25%%)")
+    p.add_argument("--model-tolerance", type=float, default=0.25,
+                   help="Allowed slowdown of the uncached model stage")
+    p.add_argument("--other-machine", action="store_true",
+                   help="Compare against a baseline from another machine (warn instead of refusing)")
+    p.add_argument("--save-baseline", nargs="?", const=BASELINE_PATH, metavar="FILE",
+                   help=f"Write this run as the baseline (default {os.path.relpath(BASELINE_PATH)})")
+    p.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = p.parse_args()
+
+    config = {"rows": args.rows, "concurrency": max(1, args.concurrency),
+              "fix_every": args.fix_every, "fast_path": not args.no_fast_path,
+              "cache": not args.no_cache, "corpus": os.path.basename(args.corpus),
+              "model_every": max(0, args.model_every)}
+    corpus = load_corpus(args.corpus, args.rows, args.seed)
+    report = replay(corpus, config["concurrency"], args.fix_every,
+                    config["fast_path"], config["cache"], config["model_every"])
+    report["config"] = config
+    report["machine"] = {"python": platform.python_version(), "platform": platform.platform(),
+                         "cpus": os.cpu_count()}
+    report["recorded_at"] = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"   -> Baseline saved: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        mismatched = {k: (config[k], baseline["config"].get(k)) for k in _CONFIG_KEYS
+                      if config[k] != baseline["config"].get(k)}
+        if mismatched:
+            raise SystemExit(f"Baseline was recorded with different settings "
+                             f"(now, baseline): {mismatched}")
+        machine = baseline.get("machine") or {}
+        other = {k: (v, machine.get(k)) for k, v in report["machine"].items() if v != machine.get(k)}
+        if other:
+            note = f"Baseline was recorded on a different machine (now, baseline): {other}"
+            if not args.other_machine:
+                raise SystemExit(note + "; re-record it here or pass --other-machine")
+            print(f"⚠ {note}; timings are not comparable.", file=sys.stderr)
+        problems = compare(report, baseline, args.tolerance, args.model_tolerance)
+        if problems:
+            print(f"\n❌ Regressed against {args.baseline} (tolerance {args.tolerance:.0%}):")
+            for line in problems:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"\n✅ No regression against {args.baseline} (tolerance {args.tolerance:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+In-memory LRU of classifier results, keyed by normalised ticket text.
+
+Real tickets repeat a handful of phrases with noise around them ("printer
+paper jam - ticket ID 4821"), so most submissions have been classified
+before.  ``normalize_description`` reduces a description to its cache key:
+case-folded, punctuation and whitespace collapsed, ticket references and
+long numbers (4+ digits) removed.  Short numbers stay ("server 500 error").
+
+Entries carry the model generation they were computed with
+(``ClassifierCache.generation``), so a reloaded pickle or a classifier
+swapped in by the online learner invalidates every older entry without a
+lock-step clear.
+"""
+import re
+import sys
+import threading
+from collections import OrderedDict
+
+_TICKET_REF = re.compile(r"\b(?:ticket|ref|req|inc)\s*(?:id|no|number|#)?\s*[:#-]?\s*\d+\b")
+_LONG_NUMBER = re.compile(r"\b\d{4,}\b")
+_NON_WORD = re.compile(r"[^\w']+")
+
+
+def normalize_description(text):
+    """Cache key for a description: 'Printer jam - Ticket ID 4821' -> 'printer jam'."""
+    text = _LONG_NUMBER.sub(" ", _TICKET_REF.sub(" ", str(text).casefold()))
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+class PredictionCache:
+    """Bounded LRU of ``key -> (generation, level, probabilities)``."""
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self.hits = self.misses = self.evictions = self.stale = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size(key, value):
+        _, level, proba = value
+        return (sys.getsizeof(key) + sys.getsizeof(level) + sys.getsizeof(proba)
+                + sum(sys.getsizeof(p) for p in proba))
+
+    def get(self, key, generation):
+        """``(level, probabilities)`` cached for ``key`` under ``generation``, else None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] != generation:
+                self._bytes -= self._size(key, self._entries.pop(key))
+                self.stale += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key, generation, level, proba):
+        value = (generation, str(level), tuple(float(p) for p in proba))
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= self._size(key, old)
+            self._entries[key] = value
+            self._bytes += self._size(key, value)
+            while len(self._entries) > self.max_entries:
+                old_key, old = self._entries.popitem(last=False)
+                self._bytes -= self._size(old_key, old)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries":   len(self._entries),
+                "hits":      self.hits,
+                "misses":    self.misses,
+                "stale":     self.stale,
+                "evictions": self.evictions,
+                "hit_rate":  self.hits / lookups if lookups else 0.0,
+                # Keys and values only; the OrderedDict's own overhead is ~100 B/entry more.
+                "bytes":     self._bytes,
+            }
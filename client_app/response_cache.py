@@ -0,0 +1,183 @@
+"""
+On-disk LRU/TTL cache of Ollama answers.
+
+Answers are keyed by a normalised form of the user's question and stored in a
+small SQLite file, so they survive restarts.  On an exact miss the cache can
+optionally fall back to a near-duplicate lookup.  The TF-IDF vocabulary of
+``vectorizer.pkl`` only knows ticket keywords (and ticket-ID numbers), so
+its cosine cannot tell "outlook not opening" from "set an out-of-office in
+Outlook"; only the vectorizer's analyzer (tokenizer + English stop words)
+is reused.  Each question is reduced to its content terms — stop words and
+contraction stubs ("won't" → "won") dropped, light suffix stemming
+("opening" → "open") — and the cached question with the highest Jaccard
+similarity is served if it reaches ``similarity``:
+
+    "Outlook won't open"       vs "outlook not opening"  {outlook, open}        1.0  hit
+    "how do I reset password"  vs "reset password"       {reset, password}      1.0  hit
+    "outlook deleted my email" vs "outlook not opening"  {outlook, delet, email} 0.25 miss
+"""
+import re
+import sqlite3
+import threading
+import time
+
+from app_paths import data_path
+
+_NON_WORD = re.compile(r"[^\w']+")
+# What the analyzer leaves of "won't", "doesn't", ... ("not" is a stop word).
+_CONTRACTION_STUBS = frozenset({"won", "don", "doesn", "didn", "isn", "aren", "wasn",
+                                "weren", "can", "couldn", "wouldn", "shouldn", "haven"})
+_SUFFIXES = ("ing", "ed", "es", "s")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case-fold, drop punctuation and collapse whitespace."""
+    return " ".join(_NON_WORD.sub(" ", prompt.casefold()).split())
+
+
+def _stem(word):
+    """Crude suffix stripping, enough to match "opening"/"open", "emails"/"email"."""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    return word[:-1] if word.endswith("e") and len(word) > 3 else word
+
+
+def content_terms(analyzer, text):
+    """Stemmed content words of ``text`` (``analyzer`` drops stop words)."""
+    return frozenset(_stem(t) for t in analyzer(text) if t not in _CONTRACTION_STUBS)
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+class ResponseCache:
+    """Size-bounded, TTL-expiring answer cache with hit/miss counters."""
+
+    def __init__(self, path=None, max_entries=500, ttl=7 * 24 * 3600,
+                 vectorizer_loader=None, similarity=0.6):
+        self.path        = path or data_path("ollama_cache.sqlite3")
+        self.max_entries = max_entries
+        self.ttl         = ttl
+        self.similarity  = similarity   # minimum Jaccard of content terms
+        # Callable returning the fitted TF-IDF vectorizer (its analyzer is
+        # used), or None to disable near-duplicate lookups.
+        self.vectorizer_loader = vectorizer_loader
+
+        self.hits = self.near_hits = self.misses = self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._db   = None
+        self._index = None          # [(key, content terms)] of the cached questions
+
+    # ------------------------------------------------------------------
+    # STORAGE
+    # ------------------------------------------------------------------
+
+    def _conn(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                " key TEXT PRIMARY KEY, prompt TEXT, answer TEXT,"
+                " created REAL, last_used REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS answers_lru ON answers(last_used)")
+            self._db.commit()
+        return self._db
+
+    def _evict(self, db, now):
+        expired = db.execute("DELETE FROM answers WHERE created < ?", (now - self.ttl,)).rowcount
+        over = db.execute("SELECT COUNT(*) FROM answers").fetchone()[0] - self.max_entries
+        evicted = 0
+        if over > 0:
+            evicted = db.execute(
+                "DELETE FROM answers WHERE key IN "
+                "(SELECT key FROM answers ORDER BY last_used ASC LIMIT ?)", (over,)
+            ).rowcount
+        if expired or evicted:
+            self.evictions += expired + evicted
+            self._index = None
+
+    # ------------------------------------------------------------------
+    # NEAR-DUPLICATE LOOKUP
+    # ------------------------------------------------------------------
+
+    def _near_lookup(self, db, key):
+        analyzer = self.vectorizer_loader().build_analyzer()
+        if self._index is None:
+            self._index = [(k, content_terms(analyzer, k))
+                           for (k,) in db.execute("SELECT key FROM answers")]
+        terms = content_terms(analyzer, key)
+        if not terms:
+            return None
+        best, best_score = None, 0.0
+        for cached_key, cached_terms in self._index:
+            score = jaccard(terms, cached_terms)
+            if score > best_score:
+                best, best_score = cached_key, score
+        return best if best_score >= self.similarity else None
+
+    # ------------------------------------------------------------------
+    # PUBLIC API
+    # ------------------------------------------------------------------
+
+    def get(self, prompt: str):
+        """Return a cached answer for ``prompt`` (or a near-duplicate), else None."""
+        key = normalize_prompt(prompt)
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            row = db.execute("SELECT key, answer, created FROM answers WHERE key = ?",
+                             (key,)).fetchone()
+            near = False
+            if row is None and self.vectorizer_loader is not None:
+                try:
+                    match = self._near_lookup(db, key)
+                except Exception as exc:  # noqa: BLE001 — cache must never break the chat
+                    print(f"[AI] Near-duplicate lookup skipped: {exc}")
+                    match = None
+                if match is not None:
+                    row = db.execute("SELECT key, answer, created FROM answers WHERE key = ?",
+                                     (match,)).fetchone()
+                    near = True
+
+            if row is None or now - row[2] > self.ttl:
+                self.misses += 1
+                return None
+
+            db.execute("UPDATE answers SET last_used = ? WHERE key = ?", (now, row[0]))
+            db.commit()
+            if near:
+                self.near_hits += 1
+            else:
+                self.hits += 1
+            return row[1]
+
+    def put(self, prompt: str, answer: str):
+        key = normalize_prompt(prompt)
+        if not key or not answer:
+            return
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            db.execute("INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?)",
+                       (key, prompt, answer, now, now))
+            self._evict(db, now)
+            db.commit()
+            self._index = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn().execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        lookups = self.hits + self.near_hits + self.misses
+        return {
+            "entries":   entries,
+            "hits":      self.hits,
+            "near_hits": self.near_hits,
+            "misses":    self.misses,
+            "evictions": self.evictions,
+            "hit_rate":  (self.hits + self.near_hits) / lookups if lookups else 0.0,
+        }
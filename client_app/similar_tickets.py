@@ -0,0 +1,164 @@
+"""
+"Looks like ticket #1234" — nearest past tickets by TF-IDF cosine similarity.
+
+Past tickets are vectorised with the classifier's own ``vectorizer.pkl``
+(rows are L2-normalised, so cosine similarity is a plain dot product) and
+kept in a sparse inverted index: one posting list of (ticket row, weight)
+per vocabulary term, stored in growable numpy arrays.  A query only touches
+the posting lists of its own terms, accumulates scores with ``bincount``
+and picks the top k with ``argpartition``.
+
+New tickets are appended incrementally (``add``); ``build_from`` fills the
+index from the local ticket store in the background at start-up.
+"""
+import sys
+import threading
+
+import numpy as np
+
+
+class _Postings:
+    """Growable (row, weight) arrays for one term."""
+
+    __slots__ = ("rows", "weights", "size")
+
+    def __init__(self):
+        self.rows = np.empty(8, dtype=np.int32)
+        self.weights = np.empty(8, dtype=np.float32)
+        self.size = 0
+
+    def extend(self, rows, weights):
+        end = self.size + len(rows)
+        if end > len(self.rows):
+            cap = max(end, 2 * len(self.rows))
+            self.rows = np.resize(self.rows, cap)
+            self.weights = np.resize(self.weights, cap)
+        self.rows[self.size:end] = rows
+        self.weights[self.size:end] = weights
+        self.size = end
+
+    def view(self):
+        # Later appends only write past ``size``, so this stays consistent.
+        return self.rows[:self.size], self.weights[:self.size]
+
+
+class SimilarTicketIndex:
+    def __init__(self, vectorizer, min_score=0.35):
+        self.vectorizer = vectorizer
+        self.min_score = min_score
+
+        self._postings = {}            # term id -> _Postings
+        self._ticket_ids = np.empty(1024, dtype=np.int64)
+        self._meta = []                # row -> (fix_action, predicted_level)
+        self._lock = threading.Lock()
+        self._pending = None           # tickets added while build_from is scanning
+
+    def __len__(self):
+        return len(self._meta)
+
+    @property
+    def last_ticket_id(self):
+        with self._lock:
+            return int(self._ticket_ids[len(self._meta) - 1]) if self._meta else 0
+
+    # ------------------------------------------------------------------
+    # UPDATES
+    # ------------------------------------------------------------------
+
+    def add(self, ticket_id, description, fix_action=None, level=None):
+        ticket = (ticket_id, description, fix_action, level)
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(ticket)
+                return
+        self.add_many([ticket])
+
+    def add_many(self, tickets):
+        """Index ``(ticket_id, description, fix_action, level)`` tuples."""
+        tickets = list(tickets)
+        if not tickets:
+            return
+        # Transform outside the lock; group the new rows by term (CSC).
+        X = self.vectorizer.transform([t[1] or "" for t in tickets]).tocsc()
+
+        with self._lock:
+            base = len(self._meta)
+            end = base + len(tickets)
+            if end > len(self._ticket_ids):
+                self._ticket_ids = np.resize(self._ticket_ids, max(end, 2 * len(self._ticket_ids)))
+            self._ticket_ids[base:end] = [t[0] for t in tickets]
+
+            for term in np.flatnonzero(np.diff(X.indptr)):
+                lo, hi = X.indptr[term], X.indptr[term + 1]
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = _Postings()
+                postings.extend(X.indices[lo:hi] + base, X.data[lo:hi])
+
+            self._meta.extend((t[2], t[3]) for t in tickets)
+
+    def build_from(self, store, batch_size=5000):
+        """Index every stored ticket newer than the ones already indexed.
+
+        ``add`` calls made meanwhile are held back and applied afterwards,
+        skipping tickets the scan already picked up.
+        """
+        with self._lock:
+            self._pending = []
+        try:
+            for rows in store.scan(("id", "description", "fix_action", "predicted_level"),
+                                   after_id=self.last_ticket_id, batch_size=batch_size):
+                self.add_many(rows)
+        finally:
+            with self._lock:
+                pending, self._pending = self._pending, None
+            last = self.last_ticket_id
+            self.add_many(t for t in pending if t[0] > last)
+        print(f"[AI] Similar-ticket index ready ({len(self)} tickets).", file=sys.stderr)
+        return self
+
+    # ------------------------------------------------------------------
+    # QUERIES
+    # ------------------------------------------------------------------
+
+    def query(self, text, k=3, min_score=None):
+        """Up to ``k`` most similar past tickets, best first.
+
+        Each match is ``{"ticket_id", "score", "fix_action", "level"}``;
+        matches scoring below ``min_score`` are dropped.
+        """
+        min_score = self.min_score if min_score is None else min_score
+        q = self.vectorizer.transform([text or ""])
+        if q.nnz == 0:
+            return []
+
+        with self._lock:
+            n = len(self._meta)
+            lists = [(self._postings[t].view(), w)
+                     for t, w in zip(q.indices, q.data) if t in self._postings]
+            ticket_ids = self._ticket_ids[:n]
+            meta = self._meta
+        if not lists:
+            return []
+
+        rows = np.concatenate([r for (r, _), _ in lists])
+        weights = np.concatenate([pw * np.float32(w) for (_, pw), w in lists])
+        scores = np.bincount(rows, weights=weights, minlength=n)
+
+        candidates = np.flatnonzero(scores >= min_score)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(scores[candidates], -k)[-k:]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        return [{"ticket_id": int(ticket_ids[r]), "score": float(scores[r]),
+                 "fix_action": meta[r][0], "level": meta[r][1]} for r in candidates]
+
+
+def describe_match(match):
+    """One-line hint for the UI, e.g. "Looks like ticket #1234 (auto-fix: flush_dns)"."""
+    details = [f"{match['score']:.0%} similar"]
+    if match.get("fix_action"):
+        details.append(f"auto-fix: {match['fix_action']}")
+    if match.get("level"):
+        details.append(match["level"])
+    return f"🔎 Looks like ticket #{match['ticket_id']} ({', '.join(details)})"
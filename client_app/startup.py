@@ -0,0 +1,170 @@
+"""
+Cold-start helpers for the client app.
+
+* ``lazy(name)`` returns a stand-in that imports the real module on first
+  attribute access, so ``main.py`` can name its dependencies at the top
+  without paying for them before the first window is drawn.
+* ``ImportProfiler`` times every module import (self and cumulative time,
+  per thread) for ``main.py --profile-startup``.
+
+Only lightweight stdlib modules are imported here.
+"""
+import importlib
+import sys
+import threading
+import time
+
+
+class _LazyModule:
+    """Module proxy that imports ``name`` the first time it is used."""
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+
+    def _load(self):
+        # import_module holds the per-module import lock, so concurrent
+        # first uses from several threads are safe.
+        return importlib.import_module(self.__dict__["_name"])
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        loaded = self.__dict__["_name"] in sys.modules
+        return f"<lazy module {self.__dict__['_name']!r} ({'loaded' if loaded else 'pending'})>"
+
+
+def lazy(name):
+    return _LazyModule(name)
+
+
+def warm_up(names):
+    """Import ``names`` now (call from a background thread)."""
+    for name in names:
+        importlib.import_module(name)
+
+
+# ----------------------------------------------------------------------
+# IMPORT PROFILING
+# ----------------------------------------------------------------------
+
+class _TimedLoader:
+    """Wraps a real loader and reports create/exec time to the profiler."""
+
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        create = getattr(self._loader, "create_module", None)
+        if create is None:
+            return None
+        with self._profiler.timing(spec.name):
+            return create(spec)
+
+    def exec_module(self, module):
+        # Put the real loader back so nothing downstream sees the wrapper.
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        with self._profiler.timing(module.__name__):
+            self._loader.exec_module(module)
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+
+class _Timing:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        stack = self.profiler._local.__dict__.setdefault("stack", [])
+        stack.append([self.name, time.perf_counter(), 0.0])
+
+    def __exit__(self, *exc):
+        stack = self.profiler._local.stack
+        name, start, children = stack.pop()
+        total = time.perf_counter() - start
+        if stack:
+            stack[-1][2] += total
+        self.profiler._record(name, total, total - children)
+        return False
+
+
+class ImportProfiler:
+    """Meta-path hook recording how long each import takes.
+
+    Install it before the imports you want to measure; ``mark(label)`` tags
+    every later import with a phase (e.g. "before first window").
+    """
+
+    def __init__(self):
+        self.records = {}          # name -> [cumulative_s, self_s, phase, thread]
+        self.phase = "startup"
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def mark(self, phase):
+        self.phase = phase
+
+    def timing(self, name):
+        return _Timing(self, name)
+
+    def _record(self, name, cumulative, self_time):
+        with self._lock:
+            rec = self.records.get(name)
+            if rec is None:
+                self.records[name] = [cumulative, self_time, self.phase,
+                                      threading.current_thread().name]
+            else:  # create_module + exec_module of the same module
+                rec[0] += cumulative
+                rec[1] += self_time
+
+    # importlib.abc.MetaPathFinder protocol
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, "finding", False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.finding = False
+
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self)
+        return spec
+
+    def invalidate_caches(self):
+        pass
+
+    def report(self, phase=None, top=25, file=None):
+        """Print the slowest imports of ``phase`` (all phases if None)."""
+        file = file or sys.stderr
+        with self._lock:
+            rows = [(name, *rec) for name, rec in self.records.items()
+                    if phase is None or rec[2] == phase]
+        total_self = sum(r[2] for r in rows)
+        print(f"[startup] {len(rows)} modules imported"
+              f"{f' ({phase})' if phase else ''}, {total_self * 1000:.1f} ms total", file=file)
+        print(f"   {'self ms':>9} {'cumul ms':>9}  module", file=file)
+        for name, cumulative, self_time, _, thread in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+            where = "" if thread == "MainThread" else f"  [{thread}]"
+            print(f"   {self_time * 1000:9.1f} {cumulative * 1000:9.1f}  {name}{where}", file=file)
@@ -1,51 +1,171 @@
 import os
+import getpass
 import subprocess
 import socket
 import platform
 import psutil
 import time
+import threading
 from datetime import datetime
 
-def get_system_info():
-    """Collects system info for the ticket"""
+import tracing
+
+# Each potentially slow lookup (DNS!) gets at most this long.
+SYSINFO_STEP_TIMEOUT = 1.0
+# Background snapshot is considered fresh for this many seconds.
+SYSINFO_TTL = 300
+
+
+def _bounded(fn, timeout, default):
+    """Runs fn on a daemon thread; returns default if it fails or overruns."""
+    box = {}
+
+    def _run():
+        try:
+            box["value"] = fn()
+        except Exception:
+            pass
+
+    t = threading.Thread(target=_run, daemon=True)
+    t.start()
+    t.join(timeout)
+    return box.get("value", default)
+
+
+def _username():
+    try:
+        return os.getlogin()
+    except OSError:
+        return getpass.getuser()
+
+
+def _ip_address():
+    try:
+        return socket.gethostbyname(socket.gethostname())
+    except OSError:
+        # Broken local DNS: ask the routing table instead (no packet is sent).
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.connect(("10.255.255.255", 1))
+            return s.getsockname()[0]
+
+
+def _last_boot():
+    return datetime.fromtimestamp(psutil.boot_time()).strftime("%Y-%m-%d %H:%M:%S")
+
+
+@tracing.traced("sysinfo.collect")
+def get_system_info(step_timeout=SYSINFO_STEP_TIMEOUT):
+    """Collects system info for the ticket; each lookup is time-bounded"""
     try:
-        boot_time_timestamp = psutil.boot_time()
-        bt = datetime.fromtimestamp(boot_time_timestamp)
-        
         info = {
-            "Username": os.getlogin(),
+            "Username": _bounded(_username, step_timeout, "Unavailable"),
             "Computer Name": platform.node(),
             "OS": f"{platform.system()} {platform.release()}",
-            "IP Address": socket.gethostbyname(socket.gethostname()),
-            "Last Boot": bt.strftime("%Y-%m-%d %H:%M:%S")
+            "IP Address": _bounded(_ip_address, step_timeout, "Unavailable"),
+            "Last Boot": _bounded(_last_boot, step_timeout, "Unavailable"),
         }
     except Exception as e:
         info = {"Error": str(e)}
     return info
 
-def run_fix(action_type):
-    """Executes the specific fix script"""
-    log = []
-    
-    if action_type == "flush_dns":
-        try:
-            # Silently run command
-            subprocess.run(["ipconfig", "/flushdns"], shell=True, check=True)
-            log.append("✅ Executed: ipconfig /flushdns")
-            log.append("✅ DNS Resolver Cache Flushed.")
-        except Exception as e:
-            log.append(f"❌ Failed: {str(e)}")
 
-    elif action_type == "restart_explorer":
-        try:
-            subprocess.run(["taskkill", "/f", "/im", "explorer.exe"], shell=True)
-            subprocess.Popen(["explorer.exe"], shell=True)
-            log.append("✅ Restarted Windows Explorer")
-        except Exception as e:
-            log.append(f"❌ Failed: {str(e)}")
-            
+class SystemInfoCache:
+    """get_system_info() collected in the background and cached with a TTL.
+
+    get() never blocks on the network: it returns the last snapshot (or a
+    quick partial one if none exists yet) and kicks off a refresh when stale.
+    """
+
+    def __init__(self, ttl=SYSINFO_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._info = None
+        self._fetched_at = 0.0
+        self._refreshing = False
+
+    def refresh_async(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _worker():
+            info = get_system_info()
+            with self._lock:
+                self._info = info
+                self._fetched_at = time.monotonic()
+                self._refreshing = False
+
+        threading.Thread(target=_worker, name="sysinfo-refresh", daemon=True).start()
+
+    def get(self):
+        with self._lock:
+            info, age = self._info, time.monotonic() - self._fetched_at
+        if info is None or age > self.ttl:
+            self.refresh_async()
+        if info is None:
+            # Nothing collected yet: only the instant fields, IP still pending.
+            info = get_system_info(step_timeout=0.05)
+        return dict(info)
+
+
+SYSTEM_INFO = SystemInfoCache()
+
+class FixStep:
+    """One command of a fix script.
+
+    ``detach`` steps are launched and left running (e.g. restarting
+    explorer.exe); all others are waited on, subject to FIX_TIMEOUT.
+    """
+    def __init__(self, cmd, ok_message=None, detach=False, check=True):
+        self.cmd = cmd
+        self.ok_message = ok_message
+        self.detach = detach
+        self.check = check
+
+    @property
+    def label(self):
+        return " ".join(self.cmd)
+
+
+# Per-command timeout (seconds); anything slower is killed.
+FIX_TIMEOUT = 20
+
+FIX_SCRIPTS = {
+    "flush_dns": [
+        FixStep(["ipconfig", "/flushdns"], "DNS Resolver Cache Flushed."),
+    ],
+    "restart_explorer": [
+        FixStep(["taskkill", "/f", "/im", "explorer.exe"], check=False),
+        FixStep(["explorer.exe"], "Restarted Windows Explorer", detach=True),
+    ],
     # Add more scripts here
-    
+}
+
+
+def run_fix(action_type, timeout=FIX_TIMEOUT):
+    """Executes the specific fix script (blocking; see fix_runner for the GUI path)"""
+    log = []
+
+    with tracing.span("fix.run", action=action_type):
+        for step in FIX_SCRIPTS.get(action_type, []):
+            try:
+                if step.detach:
+                    subprocess.Popen(step.cmd)
+                else:
+                    # Silently run command
+                    subprocess.run(step.cmd, check=step.check, timeout=timeout,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                log.append(f"✅ Executed: {step.label}")
+                if step.ok_message:
+                    log.append(f"✅ {step.ok_message}")
+            except subprocess.TimeoutExpired:
+                log.append(f"❌ Timed out after {timeout}s: {step.label}")
+                break
+            except Exception as e:
+                log.append(f"❌ Failed: {str(e)}")
+                break
+
     return "\n".join(log)
 
 def calculate_priority(urgency, impact):
@@ -56,4 +176,212 @@ def calculate_priority(urgency, impact):
         (1, 2): "High",   (2, 2): "Medium", (3, 2): "Low",
         (1, 3): "Medium", (2, 3): "Low",    (3, 3): "Low"
     }
-    return matrix.get((urgency, impact), "Medium")
\ No newline at end of file
+    return matrix.get((urgency, impact), "Medium")
+
+# ----------------------------------------------------------------------
+# DIAGNOSTICS
+# ----------------------------------------------------------------------
+
+# Whole sweep must finish inside this many seconds; slower probes are
+# reported as "timeout" and left to finish on their daemon threads.
+DIAG_BUDGET = 0.8
+
+DNS_PROBE_HOSTS = ("www.microsoft.com", "www.google.com")
+
+# Local stand-in for the default gateway (no portable way to look it up);
+# point this at the real gateway/DNS server on managed machines.
+GATEWAY_PROBE = ("127.0.0.1", 53)
+
+WATCHED_SERVICES = {
+    "Windows": ("Spooler", "Dnscache", "Audiosrv", "WlanSvc"),
+    "Linux":   ("NetworkManager", "systemd-resolved", "cups"),
+}
+
+
+def _probe_dns(host):
+    start = time.perf_counter()
+    addrs = socket.getaddrinfo(host, 443, proto=socket.IPPROTO_TCP)
+    return {
+        "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+        "address": addrs[0][4][0] if addrs else None,
+    }
+
+
+def _probe_gateway(budget):
+    host, port = GATEWAY_PROBE
+    start = time.perf_counter()
+    try:
+        with socket.create_connection((host, port), timeout=budget):
+            pass
+        reachable = True
+    except ConnectionRefusedError:
+        reachable = True     # host answered, port just closed
+    except OSError:
+        reachable = False
+    return {
+        "target": f"{host}:{port}",
+        "reachable": reachable,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def _probe_top_processes(count=5, interval=0.25):
+    procs = list(psutil.process_iter(["pid", "name", "memory_info"]))
+    for p in procs:
+        try:
+            p.cpu_percent(None)          # prime the counter
+        except psutil.Error:
+            pass
+    time.sleep(interval)
+    rows = []
+    for p in procs:
+        try:
+            mem = p.info["memory_info"]
+            rows.append({
+                "pid": p.info["pid"],
+                "name": p.info["name"],
+                "cpu_percent": p.cpu_percent(None),
+                "rss_mb": round(mem.rss / 2**20, 1) if mem else 0.0,
+            })
+        except psutil.Error:
+            continue
+    return {
+        "top_cpu": sorted(rows, key=lambda r: r["cpu_percent"], reverse=True)[:count],
+        "top_memory": sorted(rows, key=lambda r: r["rss_mb"], reverse=True)[:count],
+        "memory_percent": psutil.virtual_memory().percent,
+    }
+
+
+def _probe_disks():
+    disks = []
+    for part in psutil.disk_partitions(all=False):
+        try:
+            usage = psutil.disk_usage(part.mountpoint)
+        except (PermissionError, OSError):
+            continue
+        disks.append({
+            "mount": part.mountpoint,
+            "percent": usage.percent,
+            "free_gb": round(usage.free / 2**30, 1),
+            "pressure": usage.percent >= 90,
+        })
+    return {"disks": disks}
+
+
+def _probe_services(budget):
+    system = platform.system()
+    names = WATCHED_SERVICES.get(system, ())
+    states = {}
+    for name in names:
+        try:
+            if system == "Windows":
+                states[name] = psutil.win_service_get(name).status()
+            else:
+                out = subprocess.run(["systemctl", "is-active", name], capture_output=True,
+                                     text=True, timeout=budget)
+                states[name] = out.stdout.strip() or "unknown"
+        except Exception as e:
+            states[name] = f"error: {e}"
+    return {"services": states}
+
+
+def _diagnostic_probes(budget):
+    probes = {f"dns:{host}": (lambda h=host: _probe_dns(h)) for host in DNS_PROBE_HOSTS}
+    probes["gateway"]   = lambda: _probe_gateway(budget)
+    probes["processes"] = _probe_top_processes
+    probes["disk"]      = _probe_disks
+    probes["services"]  = lambda: _probe_services(budget)
+    return probes
+
+
+@tracing.traced("diagnostics.run")
+def run_diagnostics(budget=DIAG_BUDGET):
+    """Runs every probe concurrently and returns whatever finished in time.
+
+    Each entry in ``probes`` has ``status`` ("ok" / "error" / "timeout"),
+    ``ms`` and either ``result`` or ``error``.
+    """
+    start = time.perf_counter()
+    deadline = start + budget
+    results = {}
+    lock = threading.Lock()
+
+    def _runner(name, fn):
+        t0 = time.perf_counter()
+        try:
+            entry = {"status": "ok", "result": fn()}
+        except Exception as e:
+            entry = {"status": "error", "error": str(e)}
+        entry["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        with lock:
+            results[name] = entry
+
+    threads = []
+    for name, fn in _diagnostic_probes(budget).items():
+        t = threading.Thread(target=_runner, args=(name, fn), name=f"diag-{name}", daemon=True)
+        t.start()
+        threads.append((name, t))
+
+    for _, t in threads:
+        t.join(max(0.0, deadline - time.perf_counter()))
+
+    with lock:
+        probes = dict(results)
+    for name, t in threads:
+        if name not in probes:
+            probes[name] = {"status": "timeout", "ms": round(budget * 1000, 1)}
+
+    return {
+        "collected_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        "budget_ms": round(budget * 1000, 1),
+        "probes": probes,
+    }
+
+
+def format_diagnostics(report):
+    """One human-readable line per probe, for the fix log box."""
+    lines = []
+    for name, entry in sorted(report["probes"].items()):
+        if entry["status"] == "ok":
+            lines.append(f"✅ {name} ({entry['ms']:.0f} ms)")
+        elif entry["status"] == "timeout":
+            lines.append(f"⏱ {name} did not finish in time")
+        else:
+            lines.append(f"❌ {name}: {entry['error']}")
+    lines.append(f"Diagnostics finished in {report['elapsed_ms']:.0f} ms.")
+    return lines
+
+
+def summarize_diagnostics(report):
+    """One short line for the ticket text, e.g.
+    ``Diagnostics: dns ok, gateway ok, disk 82%, mem 61%, services ok``.
+
+    The full report stays in the stored ticket record.
+    """
+    probes = report["probes"]
+    parts = []
+    dns = sorted(name for name in probes if name.startswith("dns:"))
+    if dns:
+        failed = [name[4:] for name in dns if probes[name]["status"] != "ok"]
+        parts.append("dns ok" if not failed else "dns failed: " + "/".join(failed))
+    for name in ("gateway", "disk", "processes", "services"):
+        entry = probes.get(name)
+        if entry is None:
+            continue
+        if entry["status"] != "ok":
+            parts.append(f"{name} {entry['status']}")
+            continue
+        result = entry["result"]
+        if name == "gateway":
+            parts.append("gateway ok" if result["reachable"] else "gateway unreachable")
+        elif name == "disk":
+            fullest = max(result["disks"], key=lambda d: d["percent"], default=None)
+            parts.append(f"disk {fullest['percent']:.0f}%" if fullest else "disk n/a")
+        elif name == "processes":
+            parts.append(f"mem {result['memory_percent']:.0f}%")
+        else:
+            down = [f"{svc} {state.split(':')[0]}" for svc, state in sorted(result["services"].items())
+                    if state not in ("active", "running")]
+            parts.append("services ok" if not down else "services: " + "/".join(down))
+    return "Diagnostics: " + ", ".join(parts)
@@ -0,0 +1,269 @@
+"""
+Rolling machine telemetry for escalated tickets.
+
+``get_system_info`` only says who and where; for "Computer running slow"
+L2/L3 want to know what the machine was doing before the ticket was filed.
+``TelemetrySampler`` records, every ``interval`` seconds on a daemon thread:
+
+* CPU %, memory %, swap %,
+* disk read/write and network sent/received rates (bytes/s, from counter
+  deltas),
+* every ``proc_every``-th sample, the ``TOP_N`` processes by CPU (pid,
+  CPU %, RSS MiB).
+
+Samples live in preallocated ``array('d')`` ring buffers sized for
+``window`` seconds, so memory stays constant (~50 KB for 30 minutes at
+5 s) no matter how long the app runs.  ``summary(minutes)`` reduces the
+last few minutes to a small dict that is attached to the ticket, and
+``format_summary`` renders it for the ticket text.
+
+    python telemetry.py --interval 1 --minutes 1     # sample for a minute, print the summary
+"""
+import os
+import sys
+import threading
+import time
+from array import array
+
+import psutil
+
+INTERVAL = 5.0          # seconds between samples
+WINDOW = 30 * 60        # seconds kept in the ring buffer
+SUMMARY_MINUTES = 10    # what submit_ticket attaches
+TOP_N = 3
+
+# Columns of the system ring buffer.
+_FIELDS = ("ts", "cpu", "mem", "swap", "read_bps", "write_bps", "sent_bps", "recv_bps")
+_F = len(_FIELDS)
+_P = 3                  # pid, cpu %, rss MiB per top process
+
+
+class TelemetrySampler:
+    def __init__(self, interval=INTERVAL, window=WINDOW, proc_every=3, top_n=TOP_N):
+        self.interval = interval
+        self.proc_every = max(1, proc_every)
+        self.top_n = top_n
+        self.capacity = max(2, int(window / interval))
+
+        self._samples = array("d", bytes(8 * self.capacity * _F))
+        self._procs = array("d", bytes(8 * self.capacity * top_n * _P))   # pid -1 = empty
+        self._names = {}            # pid -> process name, pruned to pids still in the buffer
+        self._head = 0              # next slot to write
+        self._count = 0
+        self._ticks = 0
+        self._prev = None           # (monotonic, disk counters, net counters)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._busy_s = 0.0          # sampler CPU time, for stats()
+        self._started = None
+
+    # ------------------------------------------------------------------
+    # SAMPLING
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start sampling on a daemon thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None:
+                return self
+            self._started = time.monotonic()
+            psutil.cpu_percent(None)        # prime: the first call always returns 0.0
+            self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            t0 = time.thread_time()
+            try:
+                self.sample()
+            except Exception as exc:  # noqa: BLE001 — telemetry must never take the app down
+                print(f"[Telemetry] Sample skipped: {exc}", file=sys.stderr)
+            self._busy_s += time.thread_time() - t0
+
+    @staticmethod
+    def _counters():
+        disk = psutil.disk_io_counters()
+        net = psutil.net_io_counters()
+        return (time.monotonic(),
+                (disk.read_bytes, disk.write_bytes) if disk else (0, 0),
+                (net.bytes_sent, net.bytes_recv) if net else (0, 0))
+
+    def _top_processes(self):
+        rows = []
+        for p in psutil.process_iter(["name"]):
+            try:
+                # process_iter reuses Process objects, so this is CPU since
+                # the previous call (0.0 the first time a process is seen).
+                cpu = p.cpu_percent(None)
+                if cpu > 0:
+                    rows.append((cpu, p))
+            except psutil.Error:
+                continue
+        rows.sort(key=lambda r: r[0], reverse=True)
+        top = []
+        for cpu, p in rows[:self.top_n]:
+            try:
+                rss = p.memory_info().rss / 2**20
+            except psutil.Error:
+                rss = 0.0
+            top.append((p.pid, p.info["name"] or "?", cpu, rss))
+        return top
+
+    def sample(self):
+        """Take one sample now (the background thread calls this every ``interval``)."""
+        now = time.time()
+        counters = self._counters()
+        rates = (0.0, 0.0, 0.0, 0.0)
+        if self._prev is not None:
+            dt = max(1e-6, counters[0] - self._prev[0])
+            rates = tuple(max(0.0, (new - old) / dt) for new, old in
+                          zip(counters[1] + counters[2], self._prev[1] + self._prev[2]))
+        self._prev = counters
+        row = (now, psutil.cpu_percent(None), psutil.virtual_memory().percent,
+               psutil.swap_memory().percent) + rates
+
+        top = self._top_processes() if self._ticks % self.proc_every == 0 else None
+        self._ticks += 1
+
+        with self._lock:
+            base = self._head * _F
+            self._samples[base:base + _F] = array("d", row)
+            pbase = self._head * self.top_n * _P
+            for i in range(self.top_n):
+                slot = pbase + i * _P
+                if top is not None and i < len(top):
+                    pid, name, cpu, rss = top[i]
+                    self._procs[slot:slot + _P] = array("d", (pid, cpu, rss))
+                    self._names[pid] = name
+                else:
+                    self._procs[slot] = -1.0
+            self._head = (self._head + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+            if len(self._names) > 4 * self.capacity * self.top_n:
+                live = {int(self._procs[i]) for i in range(0, len(self._procs), _P)}
+                self._names = {pid: n for pid, n in self._names.items() if pid in live}
+
+    # ------------------------------------------------------------------
+    # READING
+    # ------------------------------------------------------------------
+
+    def samples(self, seconds=None):
+        """Samples (oldest first) from the last ``seconds`` as
+        ``(row dict, [(name, cpu, rss), ...] or None)``."""
+        cutoff = time.time() - seconds if seconds else float("-inf")
+        with self._lock:
+            out = []
+            for k in range(self._count):
+                idx = (self._head - self._count + k) % self.capacity
+                row = self._samples[idx * _F:(idx + 1) * _F]
+                if row[0] < cutoff:
+                    continue
+                procs = self._procs[idx * self.top_n * _P:(idx + 1) * self.top_n * _P]
+                top = [(self._names.get(int(procs[i]), "?"), procs[i + 1], procs[i + 2])
+                       for i in range(0, len(procs), _P) if procs[i] >= 0]
+                out.append((dict(zip(_FIELDS, row)), top if procs[0] >= 0 else None))
+            return out
+
+    def summary(self, minutes=SUMMARY_MINUTES):
+        """Compact view of the last ``minutes``; None before the first sample."""
+        rows = self.samples(minutes * 60)
+        if not rows:
+            return None
+
+        def avg_max(field, scale=1.0, digits=1):
+            values = [r[field] / scale for r, _ in rows]
+            return [round(sum(values) / len(values), digits), round(max(values), digits)]
+
+        by_name = {}
+        proc_samples = 0
+        for _, top in rows:
+            if top is None:
+                continue
+            proc_samples += 1
+            for name, cpu, rss in top:
+                total, peak = by_name.get(name, (0.0, 0.0))
+                by_name[name] = (total + cpu, max(peak, rss))
+        top = sorted(by_name.items(), key=lambda item: item[1][0], reverse=True)[:self.top_n]
+
+        return {
+            "minutes": minutes,
+            "samples": len(rows),
+            "from": time.strftime("%H:%M:%S", time.localtime(rows[0][0]["ts"])),
+            "cpu": avg_max("cpu"),                 # [avg, max] %
+            "mem": avg_max("mem"),
+            "swap": avg_max("swap"),
+            "disk_read_mb_s": avg_max("read_bps", 2**20, 2),
+            "disk_write_mb_s": avg_max("write_bps", 2**20, 2),
+            "net_down_kb_s": avg_max("recv_bps", 2**10),
+            "net_up_kb_s": avg_max("sent_bps", 2**10),
+            "top": [{"name": name, "avg_cpu": round(total / max(1, proc_samples), 1),
+                     "max_rss_mb": round(peak)} for name, (total, peak) in top],
+        }
+
+    def stats(self):
+        """Sampler footprint: buffer bytes and CPU share of one core."""
+        elapsed = time.monotonic() - self._started if self._started else 0.0
+        return {
+            "samples": self._count,
+            "capacity": self.capacity,
+            "buffer_bytes": (self._samples.itemsize * len(self._samples)
+                             + self._procs.itemsize * len(self._procs)),
+            "cpu_percent": 100 * self._busy_s / elapsed if elapsed else 0.0,
+        }
+
+
+def format_summary(summary):
+    """A few lines for the ticket text."""
+    if not summary:
+        return ["(no telemetry collected yet)"]
+    lines = [
+        f"CPU  avg {summary['cpu'][0]:.0f}% / max {summary['cpu'][1]:.0f}%  ·  "
+        f"RAM avg {summary['mem'][0]:.0f}% / max {summary['mem'][1]:.0f}%  ·  "
+        f"swap max {summary['swap'][1]:.0f}%",
+        f"Disk read {summary['disk_read_mb_s'][0]:.1f}/{summary['disk_read_mb_s'][1]:.1f} MB/s, "
+        f"write {summary['disk_write_mb_s'][0]:.1f}/{summary['disk_write_mb_s'][1]:.1f} MB/s  ·  "
+        f"Net down {summary['net_down_kb_s'][0]:.0f}/{summary['net_down_kb_s'][1]:.0f} KB/s, "
+        f"up {summary['net_up_kb_s'][0]:.0f}/{summary['net_up_kb_s'][1]:.0f} KB/s (avg/max)",
+    ]
+    if summary["top"]:
+        lines.append("Top  " + ", ".join(f"{p['name']} {p['avg_cpu']:.0f}% ({p['max_rss_mb']} MB)"
+                                         for p in summary["top"]))
+    return lines
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler():
+    """The process-wide sampler (not started until ``start()``)."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            interval = float(os.environ.get("SYSTEMSS_TELEMETRY_INTERVAL", INTERVAL))
+            _sampler = TelemetrySampler(interval=interval)
+        return _sampler
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    p = argparse.ArgumentParser(description="Sample machine telemetry and print a summary.")
+    p.add_argument("--interval", type=float, default=1.0)
+    p.add_argument("--minutes", type=float, default=1.0)
+    p.add_argument("--json", action="store_true")
+    args = p.parse_args()
+
+    sampler = TelemetrySampler(interval=args.interval, proc_every=1).start()
+    time.sleep(args.minutes * 60)
+    summary = sampler.summary(args.minutes)
+    print(json.dumps(summary, indent=2) if args.json else "\n".join(format_summary(summary)))
+    stats = sampler.stats()
+    print(f"[Telemetry] {stats['samples']} samples, {stats['buffer_bytes'] / 1024:.0f} KiB buffer, "
+          f"sampler used {stats['cpu_percent']:.3f}% of one core")
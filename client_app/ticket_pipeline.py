@@ -0,0 +1,123 @@
+"""
+The classify → prioritize → ticket steps, shared by the GUI (main.py) and
+the headless intake service (intake_service.py).
+
+Classification tries the keyword fast path (keyword_matcher.py) first and
+only sends ambiguous or unmatched descriptions to the model, whose results
+are cached by normalised text (model_cache.ClassifierCache.classify).  The
+lexicon is mined from the training corpus, so once the online learner has
+fed confirmed levels into the cache (corrections or a retrained classifier)
+the fast path is skipped and every description goes to the model cache.
+"""
+import sys
+import threading
+
+import keyword_matcher
+import system_utils
+import telemetry
+import tracing
+
+_fast_path = None
+_fast_path_lock = threading.Lock()
+
+
+def fast_path():
+    """The process-wide ``keyword_matcher.FastPath``, or None without a lexicon."""
+    global _fast_path
+    with _fast_path_lock:
+        if _fast_path is None:
+            try:
+                _fast_path = keyword_matcher.FastPath(keyword_matcher.KeywordMatcher.load())
+            except (OSError, ValueError, KeyError) as exc:
+                print(f"[AI] Keyword fast path disabled: {exc}", file=sys.stderr)
+                _fast_path = False
+        return _fast_path or None
+
+
+def parse_scale(value, default=2):
+    """Urgency/impact as 1–3 (1=High); anything unparsable falls back to ``default``."""
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return default
+    return value if value in (1, 2, 3) else default
+
+
+def classify(cache, descriptions, use_fast_path=True):
+    """Support levels for a batch of descriptions.
+
+    Fast-path misses (plus a sample of hits, to check agreement) go to the
+    model cache in one call.  No fast path while ``cache`` serves online
+    corrections or a swapped-in model, so feedback applies to lexicon
+    phrases too.
+    """
+    descriptions = list(descriptions)
+    fp = fast_path() if use_fast_path and not cache.is_overridden() else None
+    if fp:
+        with tracing.span("classify.fast_path", rows=len(descriptions)):
+            levels = [fp.classify(d) for d in descriptions]
+    else:
+        levels = [None] * len(descriptions)
+
+    todo = [i for i, level in enumerate(levels) if level is None or fp.should_check()]
+    if todo:
+        _, predicted, _ = cache.classify([descriptions[i] for i in todo])
+        for i, model_level in zip(todo, predicted):
+            if levels[i] is not None:
+                fp.record_check(descriptions[i], levels[i], model_level)
+            else:
+                levels[i] = model_level
+    return levels
+
+
+def prioritize(urgency, impact):
+    return system_utils.calculate_priority(parse_scale(urgency), parse_scale(impact))
+
+
+# Impact implied by the support level (L3 is infrastructure, L1 one person's
+# peripheral), for questions asked without a ticket form.
+LEVEL_IMPACT = {"L1": 3, "L2": 2, "L3": 1}
+
+
+def question_priority(cache, question):
+    """Scheduler priority of an AI question: its level's impact at medium urgency."""
+    try:
+        level = classify(cache, [question])[0]
+    except Exception as exc:  # noqa: BLE001 — no model: queue it in the middle
+        print(f"[AI] Question priority defaulted: {exc}", file=sys.stderr)
+        level = None
+    return system_utils.calculate_priority(2, LEVEL_IMPACT.get(level, 2))
+
+
+def _log_entry(entry):
+    """Ticket-log entries are strings, or ``{"diagnostics": report}`` dicts."""
+    if isinstance(entry, dict) and "diagnostics" in entry:
+        return system_utils.summarize_diagnostics(entry["diagnostics"])
+    return entry
+
+
+def format_ticket(sys_info, description, ticket_log, predicted_level, priority,
+                  machine=None):
+    """The plain-text ticket that is shown and copied to the clipboard.
+
+    Diagnostics reports in ``ticket_log`` are reduced to one summary line;
+    ``machine`` is a telemetry summary of the minutes before submission.
+    """
+    ticket_log = [_log_entry(entry) for entry in ticket_log]
+    text = (
+        "\n*** SYSTEMSS PLUS TICKET ***\n"
+        "---------------------------\n"
+        f"User : {sys_info.get('Username')}  |  IP: {sys_info.get('IP Address')}\n"
+        f"Desc : {description}\n"
+        f"Logs : {ticket_log}\n"
+        "---------------------------\n"
+        "[AI ANALYSIS]\n"
+        f"Predicted Level : {predicted_level}\n"
+        f"Priority        : {priority}\n"
+        "---------------------------\n"
+    )
+    if machine:
+        text += (f"[MACHINE — last {machine['minutes']} min, {machine['samples']} samples]\n"
+                 + "".join(line + "\n" for line in telemetry.format_summary(machine))
+                 + "---------------------------\n")
+    return text
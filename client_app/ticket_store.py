@@ -0,0 +1,238 @@
+"""
+Local embedded ticket store.
+
+Tickets are persisted to SQLite (WAL mode) through a single background
+writer thread that batches inserts into one transaction, so ``submit`` never
+waits on disk.  Indexes on timestamp, predicted level, priority and user
+(plus a composite for the common "priority + level + time range" query)
+keep lookups such as "all Urgent L3 tickets this week" to an index range
+scan, even with millions of rows.
+"""
+import json
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+from app_paths import data_path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickets (
+    id              INTEGER PRIMARY KEY,
+    created_at      REAL NOT NULL,
+    username        TEXT,
+    computer        TEXT,
+    ip              TEXT,
+    description     TEXT,
+    predicted_level TEXT,
+    priority        TEXT,
+    urgency         INTEGER,
+    impact          INTEGER,
+    fix_action      TEXT,
+    logs            TEXT,
+    telemetry       TEXT
+);
+CREATE INDEX IF NOT EXISTS tickets_created  ON tickets(created_at);
+CREATE INDEX IF NOT EXISTS tickets_level    ON tickets(predicted_level, created_at);
+CREATE INDEX IF NOT EXISTS tickets_priority ON tickets(priority, created_at);
+CREATE INDEX IF NOT EXISTS tickets_user     ON tickets(username, created_at);
+CREATE INDEX IF NOT EXISTS tickets_prio_lvl ON tickets(priority, predicted_level, created_at);
+"""
+
+_COLUMNS = ("created_at", "username", "computer", "ip", "description", "predicted_level",
+            "priority", "urgency", "impact", "fix_action", "logs", "telemetry")
+
+_INSERT = f"INSERT INTO tickets ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+
+
+def fix_action_from_log(ticket_log):
+    """The auto-fix script key recorded in a ticket log ("AutoFix: <key> → …"), if any."""
+    for entry in ticket_log:
+        if isinstance(entry, str) and entry.startswith("AutoFix: "):
+            return entry[len("AutoFix: "):].split(" → ", 1)[0].strip()
+    return None
+
+
+def make_record(sys_info, description, predicted_level, priority, urgency, impact, ticket_log,
+                telemetry=None):
+    """Flatten what submit_ticket knows about a ticket into a store row.
+
+    ``telemetry`` is a ``telemetry.TelemetrySampler.summary()`` dict.
+    """
+    return {
+        "created_at": time.time(),
+        "username": sys_info.get("Username"),
+        "computer": sys_info.get("Computer Name"),
+        "ip": sys_info.get("IP Address"),
+        "description": description,
+        "predicted_level": str(predicted_level),
+        "priority": priority,
+        "urgency": urgency,
+        "impact": impact,
+        "fix_action": fix_action_from_log(ticket_log),
+        "logs": json.dumps(ticket_log, default=str),
+        "telemetry": json.dumps(telemetry) if telemetry else None,
+    }
+
+
+class TicketStore:
+    def __init__(self, path=None, batch_size=500, flush_interval=0.05):
+        self.path = path or data_path("tickets.sqlite3")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        self._closed = False
+
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(_SCHEMA)
+        if "telemetry" not in {row[1] for row in db.execute("PRAGMA table_info(tickets)")}:
+            db.execute("ALTER TABLE tickets ADD COLUMN telemetry TEXT")   # stores from before telemetry
+        db.commit()
+        db.close()
+
+        self._writer = threading.Thread(target=self._write_loop, name="ticket-writer", daemon=True)
+        self._writer.start()
+
+    # ------------------------------------------------------------------
+    # WRITES
+    # ------------------------------------------------------------------
+
+    def submit(self, record, on_saved=None, on_error=None):
+        """Queue a ticket for insertion.
+
+        ``on_saved(ticket_id)`` or, if the ticket could not be written,
+        ``on_error(exc)`` runs on the writer thread.
+        """
+        if self._closed:
+            raise RuntimeError("TicketStore is closed")
+        self._queue.put((record, on_saved, on_error))
+
+    def flush(self, timeout=None):
+        """Block until everything submitted so far is on disk.
+
+        Returns False if ``timeout`` seconds passed first.
+        """
+        q = self._queue
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with q.all_tasks_done:
+            while q.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                q.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self):
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+
+    def _write_loop(self):
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("PRAGMA cache_size=-65536")   # 64 MiB: keeps index pages hot
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while item is not None and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            stop = batch[-1] is None
+            rows = [b for b in batch if b is not None]
+            try:
+                callbacks = self._insert(db, rows) if rows else []
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            for callback, arg in callbacks:
+                if callback is not None:
+                    try:
+                        callback(arg)
+                    except Exception as exc:  # noqa: BLE001
+                        print(f"[Store] Ticket callback failed: {exc}", file=sys.stderr)
+            if stop:
+                db.close()
+                return
+
+    def _insert(self, db, rows):
+        """Insert ``rows`` in one transaction, falling back to one at a time.
+
+        Returns ``(on_saved, ticket_id)`` / ``(on_error, exc)`` pairs.
+        """
+        try:
+            with db:
+                ids = [db.execute(_INSERT, [record.get(c) for c in _COLUMNS]).lastrowid
+                       for record, _, _ in rows]
+        except Exception as exc:  # noqa: BLE001 — a bad record must not kill the writer
+            if len(rows) == 1:
+                print(f"[Store] Failed to write a ticket: {exc}", file=sys.stderr)
+                return [(rows[0][2], exc)]
+            # The whole batch was rolled back; retry so only the bad rows fail.
+            return [pair for row in rows for pair in self._insert(db, [row])]
+        self.written += len(rows)
+        return [(on_saved, ticket_id) for (_, on_saved, _), ticket_id in zip(rows, ids)]
+
+    # ------------------------------------------------------------------
+    # READS
+    # ------------------------------------------------------------------
+
+    def _reader(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            db.row_factory = sqlite3.Row
+        return db
+
+    @staticmethod
+    def _where(level, priority, user, since, until):
+        clauses, params = [], []
+        for column, value in (("priority", priority), ("predicted_level", level),
+                              ("username", user)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, level=None, priority=None, user=None, since=None, until=None, limit=100):
+        """Newest-first tickets matching every given filter (timestamps are epoch seconds)."""
+        where, params = self._where(level, priority, user, since, until)
+        rows = self._reader().execute(
+            f"SELECT * FROM tickets{where} ORDER BY created_at DESC LIMIT ?", params + [limit]
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def count(self, level=None, priority=None, user=None, since=None, until=None):
+        where, params = self._where(level, priority, user, since, until)
+        return self._reader().execute(f"SELECT COUNT(*) FROM tickets{where}", params).fetchone()[0]
+
+    def scan(self, columns=("id", "description"), after_id=0, batch_size=5000):
+        """Yield lists of row tuples in id order (for rebuilding derived indexes)."""
+        sql = f"SELECT {', '.join(columns)} FROM tickets WHERE id > ? ORDER BY id LIMIT ?"
+        id_pos = list(columns).index("id")
+        while True:
+            rows = self._reader().execute(sql, (after_id, batch_size)).fetchall()
+            if not rows:
+                return
+            yield [tuple(r) for r in rows]
+            after_id = rows[-1][id_pos]
+
+    def get(self, ticket_id):
+        row = self._reader().execute("SELECT * FROM tickets WHERE id = ?", (ticket_id,)).fetchone()
+        return dict(row) if row else None
@@ -0,0 +1,233 @@
+"""
+Lightweight hot-path tracing.
+
+    with tracing.span("model.predict", rows=len(batch)):
+        ...
+
+Off by default: ``span`` then returns one shared no-op object, so a traced
+block costs a global lookup and two trivial method calls.  Enable with
+``SYSTEMSS_TRACE=1`` (or ``tracing.enable()``).  When enabled every span is
+
+* added to a per-stage histogram (fixed log-spaced buckets, Prometheus
+  style), and
+* buffered as one JSON line ``{"ts", "stage", "ms", "thread", "build", ...}``.
+
+The buffer is appended to ``traces.jsonl`` and the histograms are rewritten
+to ``metrics.prom`` (Prometheus text format) every ``FLUSH_EVERY`` spans,
+on ``flush()`` and at exit.  Both live in the app data dir unless
+``SYSTEMSS_TRACE_DIR`` says otherwise.  Every record carries the client
+build (``SYSTEMSS_BUILD`` or the pyproject version) so builds can be
+compared.
+"""
+import atexit
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+
+# Upper bounds in seconds; the last bucket is +Inf.
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+FLUSH_EVERY = 256
+
+_enabled = os.environ.get("SYSTEMSS_TRACE") == "1"
+_lock = threading.Lock()
+_histograms = {}     # stage -> [bucket counts..., +Inf count], sum, count
+_buffer = []
+_paths = None
+_build = None
+
+
+def _project_build():
+    build = os.environ.get("SYSTEMSS_BUILD")
+    if build:
+        return build
+    try:
+        import tomllib
+        here = os.path.dirname(os.path.abspath(__file__))
+        with open(os.path.join(here, "..", "pyproject.toml"), "rb") as f:
+            return tomllib.load(f)["project"]["version"]
+    except (OSError, KeyError, ImportError, ValueError):
+        return "unknown"
+
+
+def _output_paths():
+    global _paths
+    if _paths is None:
+        directory = os.environ.get("SYSTEMSS_TRACE_DIR")
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            _paths = (os.path.join(directory, "traces.jsonl"),
+                      os.path.join(directory, "metrics.prom"))
+        else:
+            from app_paths import data_path
+            _paths = (data_path("traces.jsonl"), data_path("metrics.prom"))
+    return _paths
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = on
+
+
+def is_enabled():
+    return _enabled
+
+
+# ----------------------------------------------------------------------
+# SPANS
+# ----------------------------------------------------------------------
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("stage", "attrs", "start")
+
+    def __init__(self, stage, attrs):
+        self.stage = stage
+        self.attrs = attrs
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        record(self.stage, time.perf_counter() - self.start, **self.attrs)
+        return False
+
+    def set(self, **attrs):
+        """Attach attributes discovered inside the span (e.g. row counts)."""
+        self.attrs.update(attrs)
+
+
+def span(stage, **attrs):
+    """Time a block as ``stage`` (no-op unless tracing is enabled)."""
+    if not _enabled:
+        return _NOOP
+    return _Span(stage, attrs)
+
+
+def traced(stage):
+    """Decorator form of ``span``."""
+    def wrap(fn):
+        def inner(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(stage, {}):
+                return fn(*args, **kwargs)
+        inner.__name__, inner.__doc__, inner.__wrapped__ = fn.__name__, fn.__doc__, fn
+        return inner
+    return wrap
+
+
+def record(stage, seconds, **attrs):
+    """Record a duration measured elsewhere (e.g. Ollama time to first token)."""
+    global _build
+    if not _enabled:
+        return
+    if _build is None:
+        _build = _project_build()
+    line = {"ts": time.time(), "stage": stage, "ms": round(seconds * 1000, 3),
+            "thread": threading.current_thread().name, "build": _build, **attrs}
+    with _lock:
+        hist = _histograms.get(stage)
+        if hist is None:
+            hist = _histograms[stage] = [[0] * (len(BUCKETS) + 1), 0.0, 0]
+        hist[0][bisect.bisect_left(BUCKETS, seconds)] += 1
+        hist[1] += seconds
+        hist[2] += 1
+        _buffer.append(line)
+        full = len(_buffer) >= FLUSH_EVERY
+    if full:
+        flush()
+
+
+# ----------------------------------------------------------------------
+# EXPORT
+# ----------------------------------------------------------------------
+
+def snapshot():
+    """``{stage: {"count", "sum_s", "buckets": [(le, cumulative count), ...]}}``."""
+    with _lock:
+        items = [(stage, list(h[0]), h[1], h[2]) for stage, h in _histograms.items()]
+    out = {}
+    for stage, counts, total, count in items:
+        cumulative, running = [], 0
+        for le, c in zip(BUCKETS + (float("inf"),), counts):
+            running += c
+            cumulative.append((le, running))
+        out[stage] = {"count": count, "sum_s": total, "buckets": cumulative}
+    return out
+
+
+def quantile(stage, q):
+    """Approximate quantile (upper bucket bound) of ``stage`` in seconds, or None."""
+    hist = snapshot().get(stage)
+    if not hist or not hist["count"]:
+        return None
+    target = q * hist["count"]
+    for le, cumulative in hist["buckets"]:
+        if cumulative >= target:
+            return le
+    return None
+
+
+def prometheus_text():
+    build = _build or _project_build()
+    lines = ["# HELP systemss_stage_duration_seconds Time spent in each client stage.",
+             "# TYPE systemss_stage_duration_seconds histogram"]
+    for stage, hist in sorted(snapshot().items()):
+        labels = f'stage="{stage}",build="{build}"'
+        for le, cumulative in hist["buckets"]:
+            le_text = "+Inf" if le == float("inf") else repr(le)
+            lines.append(f'systemss_stage_duration_seconds_bucket{{{labels},le="{le_text}"}} {cumulative}')
+        lines.append(f"systemss_stage_duration_seconds_sum{{{labels}}} {hist['sum_s']:.6f}")
+        lines.append(f"systemss_stage_duration_seconds_count{{{labels}}} {hist['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def flush():
+    """Append buffered spans to the JSONL file and rewrite the Prometheus file."""
+    with _lock:
+        pending, _buffer[:] = list(_buffer), []
+    if not pending and not _histograms:
+        return
+    try:
+        jsonl_path, prom_path = _output_paths()
+        if pending:
+            with open(jsonl_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(line, default=str) + "\n" for line in pending))
+        tmp = prom_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(prometheus_text())
+        os.replace(tmp, prom_path)
+    except OSError as exc:
+        print(f"[Trace] Could not write traces: {exc}", file=sys.stderr)
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _buffer.clear()
+
+
+atexit.register(lambda: _enabled and flush())
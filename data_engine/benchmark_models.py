@@ -0,0 +1,198 @@
+"""
+Benchmark candidate classifier/vectorizer combos on the same ticket split.
+
+For each candidate we record accuracy, fit time, single-ticket p50/p99
+predict latency, batch throughput, cold load time (fresh interpreter:
+import + joblib.load) and on-disk artifact size.
+
+Usage (from data_engine/):
+    python benchmark_models.py                      # all candidates, 20k rows
+    python benchmark_models.py --rows 50000 --only tfidf_rf tfidf_logreg
+
+Results go to model_benchmark.json (latest run) and are appended to
+model_benchmark_history.jsonl so runs can be compared across releases.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import sklearn
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.svm import LinearSVC
+
+from train_model import generate_data_vectorized
+
+warnings.filterwarnings("ignore")
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+RESULTS_PATH = os.path.join(_HERE, "model_benchmark.json")
+HISTORY_PATH = os.path.join(_HERE, "model_benchmark_history.jsonl")
+
+
+def _tfidf():
+    # Same settings as train_model.train_and_evaluate
+    return TfidfVectorizer(stop_words='english', max_features=1000)
+
+
+# name -> (vectorizer factory, classifier factory)
+CANDIDATES = {
+    "tfidf_rf":        (_tfidf, lambda: RandomForestClassifier(n_estimators=100, random_state=42)),
+    "tfidf_logreg":    (_tfidf, lambda: LogisticRegression(max_iter=1000)),
+    "tfidf_linearsvc": (_tfidf, lambda: LinearSVC()),
+    "tfidf_nb":        (_tfidf, lambda: MultinomialNB()),
+    "hashing_sgd":     (lambda: HashingVectorizer(stop_words='english', n_features=2 ** 18,
+                                                  alternate_sign=False),
+                        lambda: SGDClassifier(loss='log_loss', random_state=42)),
+}
+
+
+def _percentile_ms(samples, q):
+    return float(np.percentile(samples, q) * 1000)
+
+
+def _cold_load_seconds(model_path, vec_path, repeats=3):
+    """Median wall time for a fresh interpreter to import joblib and load both files."""
+    code = (
+        "import time, warnings; warnings.filterwarnings('ignore'); t = time.perf_counter(); "
+        "import joblib; "
+        f"joblib.load({model_path!r}); joblib.load({vec_path!r}); "
+        "print(time.perf_counter() - t)"
+    )
+    runs = []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        runs.append(float(out.stdout.strip()))
+    return sorted(runs)[len(runs) // 2]
+
+
+def benchmark_candidate(name, X_train, X_test, y_train, y_test, single_n=500):
+    make_vec, make_clf = CANDIDATES[name]
+    vec, clf = make_vec(), make_clf()
+
+    t0 = time.perf_counter()
+    clf.fit(vec.fit_transform(X_train), y_train)
+    fit_seconds = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    y_pred = clf.predict(vec.transform(X_test))
+    batch_seconds = time.perf_counter() - t0
+
+    singles = []
+    for text in X_test[:single_n]:
+        t0 = time.perf_counter()
+        clf.predict(vec.transform([text]))
+        singles.append(time.perf_counter() - t0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, "model.pkl")
+        vec_path = os.path.join(tmp, "vectorizer.pkl")
+        joblib.dump(clf, model_path)
+        joblib.dump(vec, vec_path)
+        artifact_bytes = os.path.getsize(model_path) + os.path.getsize(vec_path)
+        cold_load = _cold_load_seconds(model_path, vec_path)
+
+    return {
+        "name": name,
+        "vectorizer": type(vec).__name__,
+        "classifier": type(clf).__name__,
+        "accuracy": float(accuracy_score(y_test, y_pred)),
+        "fit_seconds": fit_seconds,
+        "single_p50_ms": _percentile_ms(singles, 50),
+        "single_p99_ms": _percentile_ms(singles, 99),
+        "batch_rows_per_sec": len(X_test) / batch_seconds,
+        "cold_load_seconds": cold_load,
+        "artifact_bytes": artifact_bytes,
+    }
+
+
+def _project_version():
+    try:
+        import tomllib
+        with open(os.path.join(_HERE, "..", "pyproject.toml"), "rb") as f:
+            return tomllib.load(f)["project"]["version"]
+    except (OSError, KeyError, ImportError):
+        return None
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=_HERE,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmark(rows=20_000, seed=42, names=None):
+    df = generate_data_vectorized(rows, seed=seed)
+    X_train, X_test, y_train, y_test = train_test_split(
+        df['Description'].to_numpy(), df['Support_Level'].to_numpy(),
+        test_size=0.2, random_state=42,
+    )
+
+    results = []
+    for name in names or CANDIDATES:
+        print(f"⏱  Benchmarking {name}...")
+        results.append(benchmark_candidate(name, X_train, X_test, y_train, y_test))
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "version": _project_version(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "sklearn": sklearn.__version__,
+        "platform": platform.platform(),
+        "rows": rows,
+        "seed": seed,
+        "results": results,
+    }
+
+
+def print_table(report):
+    print(f"\n{'candidate':17}{'acc':>8}{'fit s':>8}{'p50 ms':>8}{'p99 ms':>8}"
+          f"{'rows/s':>11}{'load s':>8}{'size KiB':>10}")
+    for r in report["results"]:
+        print(f"{r['name']:17}{r['accuracy']:>8.2%}{r['fit_seconds']:>8.2f}"
+              f"{r['single_p50_ms']:>8.2f}{r['single_p99_ms']:>8.2f}"
+              f"{r['batch_rows_per_sec']:>11,.0f}{r['cold_load_seconds']:>8.2f}"
+              f"{r['artifact_bytes'] / 1024:>10,.0f}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark ticket classifier candidates.")
+    p.add_argument("--rows", type=int, default=20_000)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--only", nargs="+", choices=list(CANDIDATES), help="Subset of candidates")
+    p.add_argument("--output", default=RESULTS_PATH)
+    p.add_argument("--history", default=HISTORY_PATH,
+                   help="JSONL file each run is appended to ('' to skip)")
+    args = p.parse_args()
+
+    report = run_benchmark(args.rows, args.seed, args.only)
+    print_table(report)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n   -> Saved: {args.output}")
+    if args.history:
+        with open(args.history, "a") as f:
+            f.write(json.dumps(report) + "\n")
+        print(f"   -> Appended: {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Flatten the trained TF-IDF + RandomForest pickles into one compact .npz
+that ``client_app/compiled_forest.py`` can score without scikit-learn, and
+publish the same arrays as a memory-mapped, versioned bundle
+(``client_app/model_bundle.py``) once they have been verified.
+
+Usage (from data_engine/):
+    python export_forest.py                 # export + verify + bundle + benchmark
+    python export_forest.py --no-bench      # export + verify + bundle only
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import warnings
+
+import joblib
+import numpy as np
+
+warnings.filterwarnings("ignore")
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+CLIENT_APP = os.path.abspath(os.path.join(_HERE, "..", "client_app"))
+
+MODEL_PATH  = os.path.join(_HERE, "ticket_classifier.pkl")
+VEC_PATH    = os.path.join(_HERE, "vectorizer.pkl")
+EXPORT_PATH = os.path.join(_HERE, "forest_model.npz")
+BUNDLE_ROOT = os.path.join(_HERE, "bundles")
+
+
+# --- 1. Flatten ---
+def flatten_forest(clf):
+    """Concatenate every tree into global node arrays.
+
+    Leaves get ``left == right == self`` so a fixed number of traversal
+    steps is always safe.  Leaf values are stored already normalised to
+    class probabilities, the same way ``DecisionTreeClassifier.predict_proba``
+    normalises them.
+    """
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset, max_depth = 0, 0
+    for est in clf.estimators_:
+        t = est.tree_
+        n = t.node_count
+        idx = np.arange(n, dtype=np.int32) + offset
+        is_leaf = t.children_left == -1
+
+        left  = np.where(is_leaf, idx, t.children_left + offset).astype(np.int32)
+        right = np.where(is_leaf, idx, t.children_right + offset).astype(np.int32)
+        feat  = np.where(is_leaf, 0, t.feature).astype(np.int32)
+
+        val = t.value[:, 0, :].astype(np.float64)
+        normalizer = val.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        val = val / normalizer
+
+        features.append(feat)
+        thresholds.append(t.threshold.astype(np.float64))
+        lefts.append(left)
+        rights.append(right)
+        values.append(val)
+        roots.append(offset)
+        offset += n
+        max_depth = max(max_depth, t.max_depth)
+
+    return {
+        "feature":   np.concatenate(features),
+        "threshold": np.concatenate(thresholds),
+        "left":      np.concatenate(lefts),
+        "right":     np.concatenate(rights),
+        "value":     np.concatenate(values),
+        "roots":     np.asarray(roots, dtype=np.int32),
+        "max_depth": np.asarray(max_depth, dtype=np.int32),
+        "classes":   np.asarray([str(c) for c in clf.classes_]),
+    }
+
+
+def flatten_vectorizer(vectorizer):
+    """Vocabulary (ordered by column), idf and the tokenizer settings."""
+    params = vectorizer.get_params()
+    unsupported = [k for k, default in (("ngram_range", (1, 1)), ("analyzer", "word"),
+                                        ("norm", "l2"), ("sublinear_tf", False),
+                                        ("strip_accents", None), ("preprocessor", None),
+                                        ("tokenizer", None), ("binary", False))
+                   if params[k] != default]
+    if unsupported:
+        raise ValueError(f"Vectorizer settings not supported by the compiled runtime: {unsupported}")
+
+    terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    return {
+        "terms":         np.asarray(terms),
+        "idf":           vectorizer.idf_.astype(np.float64),
+        "token_pattern": np.asarray(params["token_pattern"]),
+        "lowercase":     np.asarray(bool(params["lowercase"])),
+    }
+
+
+def export_forest(clf, vectorizer, out_path=EXPORT_PATH):
+    arrays = flatten_forest(clf)
+    arrays.update(flatten_vectorizer(vectorizer))
+    np.savez_compressed(out_path, **arrays)
+    return arrays
+
+
+def export_bundle(arrays, root=BUNDLE_ROOT, model_path=MODEL_PATH, vec_path=VEC_PATH,
+                  publish=True):
+    """Write ``arrays`` as a new bundle version (and, with ``publish``, make it CURRENT)."""
+    if CLIENT_APP not in sys.path:
+        sys.path.insert(0, CLIENT_APP)
+    import model_bundle
+
+    source = {}
+    for key, path in (("ticket_classifier.pkl", model_path), ("vectorizer.pkl", vec_path)):
+        if os.path.exists(path):
+            source[key] = model_bundle._sha256(path)
+    return model_bundle.write_bundle(arrays, root, source=source, publish=publish)
+
+
+# --- 2. Verify ---
+def _load_runtime(path):
+    if CLIENT_APP not in sys.path:
+        sys.path.insert(0, CLIENT_APP)
+    from compiled_forest import CompiledForest
+    return CompiledForest.load(path)
+
+
+def verification_corpus(n):
+    from train_model import generate_data
+    texts = list(generate_data(n)["Description"])
+    texts += [
+        "My printer is out of paper",
+        "Excel freezes when I open macros",
+        "The main SQL database is down",
+        "",
+        "completely unrelated words only",
+    ]
+    return texts
+
+
+def verify(clf, vectorizer, path, texts):
+    """Return the number of rows whose prediction differs from the pickle."""
+    compiled = _load_runtime(path)
+    expected = clf.predict(vectorizer.transform(texts))
+    actual   = compiled.predict(texts)
+    mismatches = sum(1 for e, a in zip(expected, actual) if str(e) != a)
+
+    p_ref = clf.predict_proba(vectorizer.transform(texts))
+    p_new = compiled.predict_proba(texts)
+    return mismatches, float(np.abs(p_ref - p_new).max())
+
+
+# --- 3. Benchmark ---
+def _import_seconds(stmt):
+    """Wall time of a fresh interpreter running ``stmt`` (median of 3)."""
+    code = f"import sys; sys.path.insert(0, {CLIENT_APP!r}); {stmt}"
+    runs = []
+    for _ in range(3):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-W", "ignore", "-c", code], check=True)
+        runs.append(time.perf_counter() - t0)
+    return sorted(runs)[1]
+
+
+def _latency_ms(fn, texts):
+    samples = []
+    for text in texts:
+        t0 = time.perf_counter()
+        fn(text)
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.99) - 1]
+
+
+def benchmark(clf, vectorizer, path, texts):
+    compiled = _load_runtime(path)
+    base = _import_seconds("pass")
+    imp_sk = _import_seconds(f"import joblib; joblib.load({MODEL_PATH!r}); joblib.load({VEC_PATH!r})") - base
+    imp_cf = _import_seconds(f"from compiled_forest import CompiledForest; CompiledForest.load({path!r})") - base
+
+    singles = texts[:300]
+    sk_p50, sk_p99 = _latency_ms(lambda t: clf.predict(vectorizer.transform([t])), singles)
+    cf_p50, cf_p99 = _latency_ms(lambda t: compiled.predict([t]), singles)
+
+    t0 = time.perf_counter(); clf.predict(vectorizer.transform(texts)); sk_batch = time.perf_counter() - t0
+    t0 = time.perf_counter(); compiled.predict(texts);                  cf_batch = time.perf_counter() - t0
+
+    print(f"   {'':22}{'sklearn pickle':>16}{'compiled':>12}")
+    print(f"   {'import + load (s)':22}{imp_sk:>16.3f}{imp_cf:>12.3f}")
+    print(f"   {'single p50 (ms)':22}{sk_p50:>16.2f}{cf_p50:>12.2f}")
+    print(f"   {'single p99 (ms)':22}{sk_p99:>16.2f}{cf_p99:>12.2f}")
+    print(f"   {'batch rows/sec':22}{len(texts) / sk_batch:>16,.0f}{len(texts) / cf_batch:>12,.0f}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Export the RandomForest to a NumPy-only format.")
+    p.add_argument("--model", default=MODEL_PATH)
+    p.add_argument("--vectorizer", default=VEC_PATH)
+    p.add_argument("--out", default=EXPORT_PATH)
+    p.add_argument("--verify-rows", type=int, default=5000)
+    p.add_argument("--bundle-root", default=BUNDLE_ROOT,
+                   help="Where to publish the verified bundle ('' to skip)")
+    p.add_argument("--no-bench", action="store_true")
+    args = p.parse_args()
+
+    clf = joblib.load(args.model)
+    vectorizer = joblib.load(args.vectorizer)
+
+    print("1️⃣  Exporting compiled forest...")
+    arrays = export_forest(clf, vectorizer, args.out)
+    print(f"   -> Saved: {args.out} ({os.path.getsize(args.out) / 1024:.0f} KiB, "
+          f"{len(arrays['feature'])} nodes, {len(arrays['roots'])} trees)")
+
+    print("2️⃣  Verifying against the pickle...")
+    texts = verification_corpus(args.verify_rows)
+    mismatches, max_diff = verify(clf, vectorizer, args.out, texts)
+    print(f"   -> {len(texts)} rows, {mismatches} prediction mismatches, "
+          f"max |Δproba| = {max_diff:.2e}")
+    if mismatches:
+        sys.exit("❌ Compiled forest disagrees with the pickle.")
+
+    if args.bundle_root:
+        path = export_bundle(arrays, args.bundle_root, args.model, args.vectorizer)
+        print(f"   -> Published bundle: {os.path.relpath(path, _HERE)} (now CURRENT)")
+
+    if not args.no_bench:
+        print("3️⃣  Benchmarking...")
+        benchmark(clf, vectorizer, args.out, texts)
+
+
+if __name__ == "__main__":
+    main()
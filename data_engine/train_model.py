@@ -1,56 +1,79 @@
+import os
+import sys
+import json
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 import random
 import joblib
-import matplotlib.pyplot as plt
-import seaborn as sns
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
 
+# Outputs land next to this script, whatever the working directory.
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
 # --- 1. Synthesize High-Quality Data ---
+
+# L1: Hardware, Basic Auth, Peripherals (The "Plug it in" layer)
+L1_KEYWORDS = [
+    "mouse broken", "keyboard not typing", "monitor black screen", "printer paper jam",
+    "forgot password", "reset password", "login failed", "wifi icon missing",
+    "headset no sound", "docking station not working", "screen flickering",
+    "cannot turn on pc", "battery not charging", "cable loose"
+]
+
+# L2: Software, Office 365, Teams, specific apps (The "Application" layer)
+L2_KEYWORDS = [
+    "excel crashing", "teams microphone not working", "outlook not indexing",
+    "vpn connection drop", "adobe reader error", "blue screen of death",
+    "computer running slow", "install python", "license expired",
+    "sharepoint access denied", "onedrive sync issue", "zoom update required",
+    "sap login error", "browser cache issue"
+]
+
+# L3: Infrastructure, Server, Network Security (The "Deep Tech" layer)
+L3_KEYWORDS = [
+    "server 500 error", "firewall blocking port", "database connection refused",
+    "active directory sync failure", "potential security breach",
+    "switch port dead", "router config error", "api gateway timeout",
+    "sql injection alert", "ssl certificate expired", "dns resolution failure",
+    "subnet masking error", "virtual machine unresponsive", "aws instance down"
+]
+
+LEVELS = ['L1', 'L2', 'L3']
+MODEL_PATH   = os.path.join(_HERE, 'ticket_classifier.pkl')
+VEC_PATH     = os.path.join(_HERE, 'vectorizer.pkl')
+LEXICON_PATH = os.path.join(_HERE, 'keyword_lexicon.json')
+
+
+def export_lexicon(path=LEXICON_PATH):
+    """Write the keyword lists for the client's fast path (client_app/keyword_matcher.py)."""
+    lexicon = {"levels": dict(zip(LEVELS, (L1_KEYWORDS, L2_KEYWORDS, L3_KEYWORDS)))}
+    with open(path, 'w') as f:
+        json.dump(lexicon, f, indent=2)
+
+
 def generate_data(n=2000):
     """
     Generates a dataset with distinct keywords for L1/L2/L3 
     to ensure the model learns specific patterns.
     """
     data = []
-    
-    # L1: Hardware, Basic Auth, Peripherals (The "Plug it in" layer)
-    l1_keywords = [
-        "mouse broken", "keyboard not typing", "monitor black screen", "printer paper jam",
-        "forgot password", "reset password", "login failed", "wifi icon missing",
-        "headset no sound", "docking station not working", "screen flickering",
-        "cannot turn on pc", "battery not charging", "cable loose"
-    ]
-    
-    # L2: Software, Office 365, Teams, specific apps (The "Application" layer)
-    l2_keywords = [
-        "excel crashing", "teams microphone not working", "outlook not indexing",
-        "vpn connection drop", "adobe reader error", "blue screen of death",
-        "computer running slow", "install python", "license expired",
-        "sharepoint access denied", "onedrive sync issue", "zoom update required",
-        "sap login error", "browser cache issue"
-    ]
-    
-    # L3: Infrastructure, Server, Network Security (The "Deep Tech" layer)
-    l3_keywords = [
-        "server 500 error", "firewall blocking port", "database connection refused",
-        "active directory sync failure", "potential security breach",
-        "switch port dead", "router config error", "api gateway timeout",
-        "sql injection alert", "ssl certificate expired", "dns resolution failure",
-        "subnet masking error", "virtual machine unresponsive", "aws instance down"
-    ]
 
     for _ in range(n):
         cat = random.choice(['L1', 'L2', 'L3'])
         
         if cat == 'L1':
-            base = random.choice(l1_keywords)
+            base = random.choice(L1_KEYWORDS)
         elif cat == 'L2':
-            base = random.choice(l2_keywords)
+            base = random.choice(L2_KEYWORDS)
         else:
-            base = random.choice(l3_keywords)
+            base = random.choice(L3_KEYWORDS)
             
         # Add some random noise/numbers to make it realistic
         desc = f"{base} - ticket ID {random.randint(1000,9999)}"
@@ -58,8 +81,37 @@ def generate_data(n=2000):
     
     return pd.DataFrame(data)
 
+
+_ALL_KEYWORDS = np.array(L1_KEYWORDS + L2_KEYWORDS + L3_KEYWORDS)
+_KW_OFFSET    = np.array([0, len(L1_KEYWORDS), len(L1_KEYWORDS) + len(L2_KEYWORDS)])
+_KW_COUNT     = np.array([len(L1_KEYWORDS), len(L2_KEYWORDS), len(L3_KEYWORDS)])
+
+
+def synthesize_arrays(n, rng):
+    """Same distribution as generate_data, built with whole-array NumPy ops.
+
+    Returns ``(descriptions, levels)`` as NumPy string arrays.
+    """
+    cat  = rng.integers(0, 3, n)
+    pick = (rng.random(n) * _KW_COUNT[cat]).astype(np.int64)
+    base = _ALL_KEYWORDS[_KW_OFFSET[cat] + pick]
+    ids  = rng.integers(1000, 10000, n).astype(str)
+    desc = np.char.add(np.char.add(base, " - ticket ID "), ids)
+    return desc, np.array(LEVELS)[cat]
+
+
+def generate_data_vectorized(n=2000, seed=None):
+    """Vectorized drop-in for generate_data (orders of magnitude faster at scale)."""
+    desc, levels = synthesize_arrays(n, np.random.default_rng(seed))
+    return pd.DataFrame({"Description": desc, "Support_Level": levels})
+
 # --- 2. Train and Evaluate ---
 def train_and_evaluate():
+    # Pulls in the exporter (and, for verification, the NumPy-only runtime);
+    # the online learner and benchmarks import this module for synthesize_arrays.
+    from export_forest import (BUNDLE_ROOT, CLIENT_APP, EXPORT_PATH, export_bundle,
+                               export_forest, verification_corpus, verify)
+
     print("--------------------------------------------------")
     print("🚀 STARTING AI MODEL TRAINING PIPELINE")
     print("--------------------------------------------------")
@@ -103,10 +155,38 @@ def train_and_evaluate():
     
     # F. Save Model
     print("\n6️⃣  Saving Model to Disk for Edge Computing...")
-    joblib.dump(clf, 'ticket_classifier.pkl')
-    joblib.dump(vectorizer, 'vectorizer.pkl')
-    print("   -> Saved: ticket_classifier.pkl")
-    print("   -> Saved: vectorizer.pkl")
+    # Everything is written next to its final name first and only swapped in
+    # once the compiled forest matches the pickle, so the pickles (GUI,
+    # intake), forest_model.npz and the CURRENT bundle always agree.
+    staged = {MODEL_PATH: MODEL_PATH + '.tmp', VEC_PATH: VEC_PATH + '.tmp',
+              EXPORT_PATH: EXPORT_PATH[:-len('.npz')] + '.tmp.npz'}
+    try:
+        joblib.dump(clf, staged[MODEL_PATH])
+        joblib.dump(vectorizer, staged[VEC_PATH])
+        arrays = export_forest(clf, vectorizer, staged[EXPORT_PATH])
+        mismatches, max_diff = verify(clf, vectorizer, staged[EXPORT_PATH],
+                                      verification_corpus(2000))
+        print(f"   -> Compiled forest verified against the pickle: {mismatches} mismatches, "
+              f"max |Δproba| = {max_diff:.2e}")
+        if mismatches:
+            sys.exit("❌ Compiled forest disagrees with the pickle; nothing was replaced.")
+        bundle = export_bundle(arrays, model_path=staged[MODEL_PATH],
+                               vec_path=staged[VEC_PATH], publish=False)
+        for final, tmp in staged.items():
+            os.replace(tmp, final)
+            print(f"   -> Saved: {final}")
+    finally:
+        for tmp in staged.values():
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    if CLIENT_APP not in sys.path:
+        sys.path.insert(0, CLIENT_APP)
+    import model_bundle
+    model_bundle.publish_version(os.path.basename(bundle), BUNDLE_ROOT)
+    print(f"   -> Published bundle: bundles/{os.path.basename(bundle)} (memory-mapped, versioned)")
+    export_lexicon()
+    print(f"   -> Saved: {LEXICON_PATH} (keyword fast path, see client_app/keyword_matcher.py)")
 
     # G. Sanity Check (Test it right now)
     print("\n🤖 SANITY CHECK (Live Test):")
@@ -125,5 +205,104 @@ def train_and_evaluate():
     print("🎉 PIPELINE COMPLETE. READY FOR CLIENT APP.")
     print("--------------------------------------------------")
 
+# --- 3. Out-of-Core Training (millions of rows, flat memory) ---
+HASH_FEATURES = 2 ** 18
+
+
+def make_hashing_vectorizer():
+    """Stateless, so every worker process builds an identical one."""
+    from sklearn.feature_extraction.text import HashingVectorizer
+    return HashingVectorizer(stop_words='english', n_features=HASH_FEATURES,
+                             alternate_sign=False, norm='l2')
+
+
+def _make_chunk(args):
+    """Worker: synthesize one chunk and hash it into a sparse matrix."""
+    seed, n = args
+    desc, levels = synthesize_arrays(n, np.random.default_rng(seed))
+    return make_hashing_vectorizer().transform(desc), levels
+
+
+def _iter_chunks(total_rows, chunk_size, seed, jobs):
+    """Yield (X, y) chunks produced on ``jobs`` processes, at most 2*jobs in flight."""
+    specs = ((seed + i, min(chunk_size, total_rows - start))
+             for i, start in enumerate(range(0, total_rows, chunk_size)))
+    if jobs <= 1:
+        for spec in specs:
+            yield _make_chunk(spec)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for spec in specs:
+            pending.append(pool.submit(_make_chunk, spec))
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _rss_mb():
+    import psutil
+    return psutil.Process().memory_info().rss / 2**20
+
+
+def train_streaming(total_rows=1_000_000, chunk_size=50_000, jobs=None, seed=42,
+                    out_model=os.path.join(_HERE, 'ticket_classifier_stream.pkl'),
+                    out_vectorizer=os.path.join(_HERE, 'hashing_vectorizer.pkl')):
+    """Train an SGD classifier incrementally over hashed chunks.
+
+    Data generation + hashing runs on all cores; the main process only
+    holds a couple of chunks at a time, so peak memory does not grow with
+    ``total_rows``.
+    """
+    from sklearn.linear_model import SGDClassifier
+
+    jobs = jobs or os.cpu_count() or 1
+    print("--------------------------------------------------")
+    print("🚀 STARTING OUT-OF-CORE TRAINING PIPELINE")
+    print("--------------------------------------------------")
+    print(f"1️⃣  Streaming {total_rows:,} rows in chunks of {chunk_size:,} on {jobs} process(es)...")
+
+    clf = SGDClassifier(loss='log_loss', alpha=1e-6, random_state=seed)
+    start = time.perf_counter()
+    rows, peak_rss = 0, _rss_mb()
+    for X, y in _iter_chunks(total_rows, chunk_size, seed, jobs):
+        clf.partial_fit(X, y, classes=LEVELS)
+        rows += X.shape[0]
+        peak_rss = max(peak_rss, _rss_mb())
+    elapsed = time.perf_counter() - start
+
+    print("2️⃣  Evaluating on a held-out chunk...")
+    X_test, y_test = _make_chunk((seed - 1, min(chunk_size, 20_000)))
+    accuracy = accuracy_score(y_test, clf.predict(X_test))
+
+    print("\n" + "="*40)
+    print(f"✅ FINAL MODEL ACCURACY: {accuracy:.2%}")
+    print(f"⚡ THROUGHPUT: {rows / elapsed:,.0f} rows/sec ({rows:,} rows in {elapsed:.1f}s)")
+    print(f"🧠 PEAK RSS (main process): {peak_rss:.0f} MB")
+    print("="*40)
+
+    print("\n3️⃣  Saving Model to Disk...")
+    joblib.dump(clf, out_model)
+    joblib.dump(make_hashing_vectorizer(), out_vectorizer)
+    print(f"   -> Saved: {out_model}")
+    print(f"   -> Saved: {out_vectorizer}")
+    return {"rows": rows, "seconds": elapsed, "rows_per_sec": rows / elapsed,
+            "peak_rss_mb": peak_rss, "accuracy": accuracy}
+
+
 if __name__ == "__main__":
-    train_and_evaluate()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the ticket classifier.")
+    parser.add_argument("--mode", choices=["batch", "stream"], default="batch",
+                        help="batch: TF-IDF + RandomForest in memory (default); "
+                             "stream: hashing + SGD, out-of-core")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="stream mode: total rows")
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--jobs", type=int, default=None, help="stream mode: worker processes")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.mode == "stream":
+        train_streaming(args.rows, args.chunk_size, args.jobs, args.seed)
+    else:
+        train_and_evaluate()
\ No newline at end of file
@@ -0,0 +1,31 @@
+"""
+Shared fixtures.  The client modules are flat scripts imported by bare name
+(main.py puts its own directory on ``sys.path``), so the tests do the same.
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLIENT_DIR = os.path.join(ROOT, "client_app")
+DATA_DIR = os.path.join(ROOT, "data_engine")
+
+for _path in (CLIENT_DIR, DATA_DIR):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+# Keep caches and ticket stores out of the real ~/.systemss_plus.
+os.environ.setdefault("SYSTEMSS_DATA_DIR", tempfile.mkdtemp(prefix="systemss-tests-"))
+
+import pytest  # noqa: E402
+
+MODEL_PATH = os.path.join(DATA_DIR, "ticket_classifier.pkl")
+VEC_PATH = os.path.join(DATA_DIR, "vectorizer.pkl")
+
+
+@pytest.fixture
+def classifier():
+    """A fresh ClassifierCache over the trained pickles."""
+    import model_cache
+
+    return model_cache.ClassifierCache(MODEL_PATH, VEC_PATH)
@@ -0,0 +1,40 @@
+import asyncio
+import json
+import sqlite3
+
+import pytest
+
+import intake_service
+import ticket_store
+
+TICKET = json.dumps({"description": "printer offline", "urgency": 2, "impact": 2}).encode()
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ticket_store.TicketStore(str(tmp_path / "tickets.sqlite3"))
+    yield store
+    store.close()
+
+
+def _submit(service):
+    return asyncio.run(asyncio.wait_for(service._dispatch("POST", "/submit", TICKET), 10))
+
+
+def test_submit_saves_ticket(classifier, store):
+    status, payload = _submit(intake_service.IntakeService(classifier, store))
+
+    assert status == 200
+    assert store.get(payload["id"])["description"] == "printer offline"
+
+
+def test_submit_reports_store_failure(classifier, store):
+    db = sqlite3.connect(store.path)
+    db.execute("DROP TABLE tickets")
+    db.commit()
+    db.close()
+
+    status, payload = _submit(intake_service.IntakeService(classifier, store))
+
+    assert status == 500
+    assert payload == {"error": "ticket could not be saved"}
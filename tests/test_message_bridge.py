@@ -0,0 +1,35 @@
+import message_bridge
+
+
+class _Widget:
+    def __init__(self):
+        self.events = []
+
+    def bind(self, *_args):
+        pass
+
+    def after_idle(self, *_args):
+        pass
+
+    def event_generate(self, event, when=None):
+        self.events.append(event)
+
+
+def test_post_wakes_tk_once_per_drain():
+    widget = _Widget()
+    bridge = message_bridge.MessageBridge(widget, handler=lambda batch: None)
+
+    bridge.post({"action": "fix_line", "content": "a"})
+    bridge.post({"action": "fix_line", "content": "b"})
+
+    assert widget.events == [message_bridge.EVENT]
+
+
+def test_post_after_close_never_calls_tk():
+    widget = _Widget()
+    bridge = message_bridge.MessageBridge(widget, handler=lambda batch: None)
+
+    bridge.close()
+    bridge.post({"action": "ticket_saved", "content": 1})
+
+    assert widget.events == []
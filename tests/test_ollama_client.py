@@ -0,0 +1,27 @@
+import threading
+import time
+
+import pytest
+
+import ollama_client
+import ollama_stub
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    # Headers only after a 0.5 s "model load"; then one token every 2 s.
+    stub = ollama_stub.StubOllama(token_delay=2.0, load_delay=0.5, tokens=5).start()
+    monkeypatch.setattr(ollama_client, "OLLAMA_URL", stub.url)
+    yield stub
+    stub.stop()
+
+
+def test_cancel_while_connecting_closes_immediately(stub):
+    generation = ollama_client.Generation()
+    threading.Timer(0.1, generation.cancel).start()     # still inside requests.post
+
+    started = time.perf_counter()
+    with pytest.raises(ollama_client.GenerationCancelled):
+        ollama_client.stream_generate("printer offline", lambda token: None, generation)
+
+    assert time.perf_counter() - started < 1.5      # not after the first 2 s token
@@ -0,0 +1,30 @@
+import threading
+
+import ollama_scheduler
+import ticket_pipeline
+
+
+def test_questions_dispatched_by_predicted_priority(classifier):
+    started, release = threading.Event(), threading.Event()
+    served = []
+
+    def generate(prompt, on_token, generation):
+        served.append(prompt)
+        started.set()
+        release.wait(5)
+        return f"answer to {prompt}", 0.0
+
+    scheduler = ollama_scheduler.OllamaScheduler(max_concurrent=1, generate=generate)
+    busy = scheduler.submit("warm-up question", priority="Low")
+    assert started.wait(5)
+
+    # Queued behind the running generation, as the GUI's ollama_worker does.
+    questions = ["my mouse broken again", "aws instance down for the whole team"]
+    priorities = [ticket_pipeline.question_priority(classifier, q) for q in questions]
+    requests = [scheduler.submit(q, priority=p) for q, p in zip(questions, priorities)]
+    release.set()
+    for request in [busy] + requests:
+        request.result(timeout=5)
+
+    assert priorities == ["Low", "High"]
+    assert served == ["warm-up question", questions[1], questions[0]]
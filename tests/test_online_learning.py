@@ -0,0 +1,64 @@
+import online_learning
+
+
+def _learner(tmp_path, classifier, **kwargs):
+    store = online_learning.FeedbackStore(str(tmp_path / "feedback.jsonl"))
+    return online_learning.OnlineLearner(classifier, store,
+                                         model_path=str(tmp_path / "online.pkl"),
+                                         compact_interval=0, **kwargs)
+
+
+def _row(description, confirmed):
+    return online_learning.FeedbackStore.row(description, "L1", confirmed)
+
+
+def test_idle_timeout_does_not_compact(tmp_path, classifier):
+    learner = _learner(tmp_path, classifier)
+    served = classifier.get()[0]
+
+    learner._step([])       # compact_interval elapsed without feedback
+
+    assert learner.compactions == 0
+    assert classifier.get()[0] is served
+    assert not (tmp_path / "online.pkl").exists()
+
+
+def test_compact_without_feedback_keeps_forest(tmp_path, classifier):
+    learner = _learner(tmp_path, classifier)
+    served = classifier.get()[0]
+
+    assert learner.compact() is False
+    assert classifier.get()[0] is served
+
+
+def test_first_feedback_keeps_forest_with_correction(tmp_path, classifier):
+    learner = _learner(tmp_path, classifier)
+    forest = classifier.get()[0]
+
+    learner._step([_row("printer paper jam - ticket ID 4821", "L3")])
+
+    assert learner.compactions == 0
+    assert classifier.get()[0] is forest
+    assert classifier.predict("Printer paper jam, ticket id 99") == "L3"
+    assert classifier.predict("mouse broken") == "L1"
+    assert len(learner.store.read_all()) == 1
+
+
+def test_compacts_once_enough_feedback(tmp_path, classifier):
+    learner = _learner(tmp_path, classifier, min_feedback=3)
+
+    learner._step([_row("vpn not connecting from home", "L2")] * 2)
+    assert learner.compactions == 0
+    learner._step([_row("vpn not connecting from home", "L2")])
+
+    assert learner.compactions == 1
+    assert classifier.get()[0] is learner._model
+
+
+def test_submit_feedback_does_not_write(tmp_path, classifier):
+    learner = _learner(tmp_path, classifier)
+
+    learner.submit_feedback("outlook not indexing", "L2", "L2")
+
+    assert not (tmp_path / "feedback.jsonl").exists()
+    assert learner._queue.qsize() == 1
@@ -0,0 +1,25 @@
+import json
+
+import pipeline_replay
+
+
+def _baseline():
+    with open(pipeline_replay.BASELINE_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_baseline_exercises_the_model():
+    baseline = _baseline()
+    assert baseline["config"]["fast_path"] is False
+    assert baseline["stages"]["model"]["count"] > 0
+    assert baseline["stages"]["persist"]["count"] == baseline["tickets"]
+
+
+def test_slower_model_fails_the_check():
+    baseline = _baseline()
+    report = json.loads(json.dumps(baseline))
+    for key in ("p50_ms", "p99_ms"):
+        report["stages"]["model"][key] *= 2
+
+    assert pipeline_replay.compare(report, baseline, 0.25) != []
+    assert pipeline_replay.compare(report, baseline, 0.25, model_tolerance=1.5) == []
@@ -0,0 +1,31 @@
+import pytest
+
+import response_cache
+
+
+@pytest.fixture
+def cache(tmp_path, classifier):
+    cache = response_cache.ResponseCache(path=str(tmp_path / "answers.sqlite3"),
+                                         vectorizer_loader=lambda: classifier.get()[1])
+    cache.put("outlook not opening", "Restart Outlook in safe mode.")
+    cache.put("reset password", "Use the self-service portal.")
+    return cache
+
+
+def test_paraphrase_hits(cache):
+    assert cache.get("Outlook won't open") == "Restart Outlook in safe mode."
+    assert cache.get("How do I reset password?") == "Use the self-service portal."
+    assert cache.stats()["near_hits"] == 2
+
+
+def test_unrelated_question_misses(cache):
+    # Same keyword ("outlook") as a cached question, different problem.
+    assert cache.get("How do I set an out of office reply in Outlook?") is None
+    assert cache.get("outlook deleted all my emails") is None
+    assert cache.get("printer offline") is None
+
+
+def test_content_terms(classifier):
+    analyzer = classifier.get()[1].build_analyzer()
+    assert response_cache.content_terms(analyzer, "outlook not opening") == {"outlook", "open"}
+    assert response_cache.content_terms(analyzer, "outlook won't open") == {"outlook", "open"}
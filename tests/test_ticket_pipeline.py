@@ -0,0 +1,42 @@
+import numpy as np
+
+import ticket_pipeline
+
+LEXICON_PHRASE = "printer paper jam"      # an L1 phrase in keyword_lexicon.json
+
+
+class _AlwaysL3:
+    """Stands in for an online model that learned this phrase is L3."""
+
+    classes_ = np.array(["L1", "L2", "L3"])
+
+    def predict_proba(self, X):
+        return np.tile([0.0, 0.0, 1.0], (X.shape[0], 1))
+
+
+def test_fast_path_answers_lexicon_phrase(classifier):
+    assert ticket_pipeline.fast_path().classify(LEXICON_PHRASE) == "L1"
+    assert ticket_pipeline.classify(classifier, [LEXICON_PHRASE]) == ["L1"]
+
+
+def test_online_override_beats_fast_path(classifier):
+    classifier.get()
+    assert classifier.swap_classifier(_AlwaysL3(), classifier.vectorizer_digest)
+
+    assert ticket_pipeline.classify(classifier, [LEXICON_PHRASE, "my laptop is weird"]) == ["L3", "L3"]
+
+
+def test_ticket_text_summarizes_diagnostics():
+    report = {"elapsed_ms": 812.0, "probes": {
+        "dns:google.com": {"status": "ok", "ms": 12.0, "result": {"latency_ms": 11.0}},
+        "gateway": {"status": "ok", "ms": 1.0, "result": {"reachable": False}},
+        "disk": {"status": "ok", "ms": 2.0, "result": {"disks": [{"mount": "/", "percent": 82.4}]}},
+        "processes": {"status": "timeout", "ms": 800.0},
+    }}
+    log = ["No AutoFix available.", {"diagnostics": report}]
+
+    text = ticket_pipeline.format_ticket({"Username": "u"}, "slow pc", log, "L2", "Medium")
+
+    assert "Diagnostics: dns ok, gateway unreachable, disk 82%, processes timeout" in text
+    assert "probes" not in text
+    assert log[1] == {"diagnostics": report}      # the stored record keeps the full report
@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+import ticket_store
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ticket_store.TicketStore(str(tmp_path / "tickets.sqlite3"))
+    yield store
+    store.close()
+
+
+def _record(description):
+    return ticket_store.make_record({"Username": "u"}, description, "L1", "Low", 3, 3, [])
+
+
+def _wait_for(predicate, timeout=5):
+    """Callbacks run on the writer thread just after flush() can return."""
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_bad_record_fails_alone(store):
+    saved, failed = [], []
+    bad = _record("unbindable")
+    bad["description"] = object()
+
+    for record in (_record("first"), bad, _record("second")):
+        store.submit(record, on_saved=saved.append, on_error=failed.append)
+    assert store.flush(timeout=5)
+
+    assert _wait_for(lambda: len(saved) == 2 and len(failed) == 1)
+    assert store.count() == 2
+
+
+def test_writer_survives_non_sqlite_errors(store):
+    failed = []
+    store.submit(None, on_error=failed.append)      # not even a dict
+    store.submit(_record("after"))
+
+    assert store.flush(timeout=5)
+    assert _wait_for(lambda: failed)
+    assert isinstance(failed[0], AttributeError)
+    assert store.count() == 1
+
+
+def test_flush_times_out(store):
+    store._queue.unfinished_tasks += 1    # a ticket the writer never finishes
+    try:
+        assert store.flush(timeout=0.05) is False
+    finally:
+        store._queue.unfinished_tasks -= 1